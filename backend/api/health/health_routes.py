@@ -0,0 +1,74 @@
+"""Flask Blueprint exposing liveness and readiness probes.
+
+Routes:
+- GET /healthz -> 200 while the process can serve requests (no DB call);
+                  includes connection-pool and per-command statistics
+- GET /readyz  -> 200 when MongoDB answers a ping, 503 otherwise
+
+Load balancers and orchestrators should use ``/readyz`` to decide whether
+to route traffic to a worker and ``/healthz`` to decide whether to restart
+it.
+"""
+
+import os
+
+from flask import Blueprint
+
+from api.utils.db import database_stats, ping_database
+
+
+health_bp = Blueprint("health", __name__)
+
+# How long /readyz waits for the database before reporting not ready.
+READY_TIMEOUT_MS = int(os.getenv("READY_TIMEOUT_MS", "1000"))
+
+
+@health_bp.route("/healthz", methods=["GET"])
+def healthz():
+    """
+    @api {get} /healthz Liveness Probe
+    @apiName Healthz
+    @apiGroup Health
+    @apiVersion 1.0.0
+
+    @apiSuccess {String} status Always "ok"
+    @apiSuccess {Object} database Pool usage (in_use, checkout_wait, ...) and per-command latency
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        {
+            "status": "ok",
+            "database": {
+                "pool": {"in_use": 1, "max_in_use": 4, "open_connections": 4,
+                         "checkout_wait": {"count": 812, "mean_ms": 0.02, "p95_ms": 0.05, ...}, ...},
+                "commands": {"find": {"count": 120, "mean_ms": 1.4, "p95_ms": 3.1, "failures": 0, ...}}
+            }
+        }
+    """
+    return {"status": "ok", "database": database_stats()},200
+
+
+@health_bp.route("/readyz", methods=["GET"])
+def readyz():
+    """
+    @api {get} /readyz Readiness Probe
+    @apiName Readyz
+    @apiGroup Health
+    @apiVersion 1.0.0
+
+    @apiSuccess {String} status "ready"
+    @apiSuccess {Number} ping_ms Database ping round trip
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        {"status": "ready", "ping_ms": 0.8, "database": {...}}
+
+    @apiError NotReady The database did not answer in time
+    @apiErrorExample Error-Response:
+        HTTP/1.1 503 Service Unavailable
+        {"status": "not ready", "error": "...", "database": {...}}
+    """
+    ok, ping_ms, error = ping_database(READY_TIMEOUT_MS)
+    if not ok:
+        return {"status": "not ready", "error": error, "database": database_stats()},503
+    return {"status": "ready", "ping_ms": ping_ms, "database": database_stats()},200
@@ -0,0 +1,351 @@
+"""Resized, recompressed derivatives of the menu photos.
+
+The source photos in ``frontend/static/assets`` are 1-3 MB each. This
+module turns them into variants at a fixed set of widths (``WIDTHS``) in
+WebP, AVIF (when Pillow supports it) and JPEG, and stores them in a
+content-addressed cache directory:
+
+- The cache key is a hash of the source file's content, the width, the
+  format and the encoder settings, so an edited photo or a changed
+  quality setting never serves a stale variant, and identical photos
+  share their variants.
+- Files are written to a temporary name and renamed into place, so
+  several workers/processes can generate the same variant concurrently.
+- The directory is bounded (``MEDIA_CACHE_MAX_MB``); the least recently
+  used variants are evicted first (serving a variant refreshes its mtime).
+
+Variants are produced on demand by ``GET /media/<name>?w=`` (see
+``media_routes.py``) or ahead of time for every photo with the CLI, which
+spreads the work over a process pool (from the ``backend`` folder)::
+
+    python -m api.media.image_pipeline [--widths 320 640] [--formats webp jpeg] [--workers 8]
+
+Settings (environment variables):
+
+- ``MEDIA_SOURCE_DIR``    (default ``frontend/static/assets``)
+- ``MEDIA_CACHE_DIR``     (default ``backend/media_cache``)
+- ``MEDIA_CACHE_MAX_MB``  (default 512)
+"""
+
+import hashlib
+import io
+import os
+import threading
+import time
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # optional: /media then redirects to the original file
+    Image = None
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SOURCE_DIR = os.path.abspath(os.getenv(
+    "MEDIA_SOURCE_DIR", os.path.join(BACKEND_DIR, "..", "frontend", "static", "assets")
+))
+CACHE_DIR = os.path.abspath(os.getenv("MEDIA_CACHE_DIR", os.path.join(BACKEND_DIR, "media_cache")))
+CACHE_MAX_BYTES = int(float(os.getenv("MEDIA_CACHE_MAX_MB", "512")) * (1 << 20))
+
+# Keep in sync with MEDIA_WIDTHS in frontend/static/js/utils/image-resolver.js.
+WIDTHS = (320, 480, 640, 960, 1280)
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+# format -> (file extension, mimetype, Pillow save options)
+FORMATS = {
+    "avif": ("avif", "image/avif", {"quality": 50, "speed": 6}),
+    "webp": ("webp", "image/webp", {"quality": 75, "method": 4}),
+    "jpeg": ("jpg", "image/jpeg", {"quality": 78, "optimize": True, "progressive": True}),
+}
+# Seconds between LRU timestamp refreshes of a cached variant.
+TOUCH_INTERVAL = 3600
+# Bump to invalidate every cached variant after changing the resize code.
+PIPELINE_VERSION = 1
+
+
+def available_formats():
+    """Return the output formats the installed Pillow can encode, best first."""
+    if Image is None:
+        return []
+    return [name for name in FORMATS if name != "avif" or features.check("avif")]
+
+
+def snap_width(requested):
+    """Return the smallest configured width >= ``requested`` (or the largest)."""
+    for width in WIDTHS:
+        if width >= requested:
+            return width
+    return WIDTHS[-1]
+
+
+def source_path(name):
+    """
+    Resolve a photo name to a file inside ``SOURCE_DIR``.
+
+    Returns:
+        str | None: The absolute path, or None for unknown names and
+                    anything that would escape the source directory.
+    """
+    path = os.path.abspath(os.path.join(SOURCE_DIR, name))
+    if os.path.dirname(path) != SOURCE_DIR or not path.lower().endswith(SOURCE_EXTENSIONS):
+        return None
+    return path if os.path.isfile(path) else None
+
+
+_digest_lock = threading.Lock()
+_source_digests = {}
+
+
+def source_digest(path):
+    """Content hash of a source photo, memoized per (path, mtime, size)."""
+    stat = os.stat(path)
+    signature = (path, stat.st_mtime_ns, stat.st_size)
+    digest = _source_digests.get(signature)
+    if digest is None:
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        with _digest_lock:
+            _source_digests[signature] = digest
+    return digest
+
+
+def variant_key(digest, width, fmt):
+    """Cache key of one variant (also used as its ETag)."""
+    settings = repr((PIPELINE_VERSION, width, fmt, sorted(FORMATS[fmt][2].items())))
+    return hashlib.blake2b(f"{digest}:{settings}".encode(), digest_size=16).hexdigest()
+
+
+def variant_path(key, fmt, cache_dir=CACHE_DIR):
+    """Location of a variant in the cache, sharded by the first key byte."""
+    return os.path.join(cache_dir, key[:2], f"{key}.{FORMATS[fmt][0]}")
+
+
+def render_variant(image, width, fmt):
+    """
+    Resize an opened image to ``width`` (never upscaling) and encode it.
+
+    Returns:
+        bytes: The encoded variant.
+    """
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+    if fmt == "jpeg" and image.mode != "RGB":
+        # JPEG has no alpha: flatten transparent PNGs onto white.
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        image = background
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), **FORMATS[fmt][2])
+    return buffer.getvalue()
+
+
+def _open_source(path):
+    image = Image.open(path)
+    image.load()
+    # Photos straight from a phone store their rotation in EXIF.
+    return ImageOps.exif_transpose(image)
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+class VariantCache:
+    """
+    Content-addressed, size-bounded directory of image variants.
+
+    ``get_variant`` is safe to call from many threads; each missing variant
+    is generated only once per process (single flight per key).
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_variant(self, path, width, fmt):
+        """
+        Return the cached variant of ``path``, generating it if needed.
+
+        Returns:
+            tuple: (variant file path, cache key)
+        """
+        key = variant_key(source_digest(path), width, fmt)
+        target = variant_path(key, fmt, self.cache_dir)
+        if self._touch(target):
+            self.hits += 1
+            return target, key
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if not self._touch(target):
+                self.misses += 1
+                data = render_variant(_open_source(path), width, fmt)
+                _write_atomic(target, data)
+                self._grow(len(data))
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return target, key
+
+    @staticmethod
+    def _touch(path):
+        """Refresh a variant's mtime (its LRU timestamp); False if missing.
+
+        The mtime is only rewritten when it is older than ``TOUCH_INTERVAL``,
+        so a hot variant costs one ``stat`` per request, not a write.
+        """
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return False
+        now = time.time()
+        if now - mtime > TOUCH_INTERVAL:
+            try:
+                os.utime(path, (now, now))
+            except FileNotFoundError:
+                return False
+        return True
+
+    def _grow(self, added):
+        with self._lock:
+            if self._size is None:
+                self._size = self.disk_usage()
+            else:
+                self._size += added
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                full = os.path.join(root, name)
+                try:
+                    stat = os.stat(full)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, full))
+        return entries
+
+    def disk_usage(self):
+        """Total bytes of all cached variants."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, target_ratio=0.9):
+        """
+        If the cache is over ``max_bytes``, delete least recently used
+        variants until it is at most ``target_ratio`` of ``max_bytes``.
+
+        Returns:
+            int: Number of files removed.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        limit = self.max_bytes * target_ratio if total > self.max_bytes else total
+        removed = 0
+        for _, size, full in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(full)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        with self._lock:
+            self._size = total
+        return removed
+
+    def stats(self):
+        return {
+            "cache_dir": self.cache_dir,
+            "max_bytes": self.max_bytes,
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+variant_cache = VariantCache()
+
+
+def generate_all_variants(path, widths, formats):
+    """
+    Process-pool task: write every missing variant of one source photo.
+
+    The source is decoded once and resized for each width/format.
+
+    Returns:
+        tuple: (photo name, variants written, bytes written)
+    """
+    digest = source_digest(path)
+    image = None
+    written = total = 0
+    for width in widths:
+        for fmt in formats:
+            target = variant_path(variant_key(digest, width, fmt), fmt)
+            if os.path.exists(target):
+                continue
+            if image is None:
+                image = _open_source(path)
+            data = render_variant(image, width, fmt)
+            _write_atomic(target, data)
+            written += 1
+            total += len(data)
+    return os.path.basename(path), written, total
+
+
+def main():
+    import argparse
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    parser = argparse.ArgumentParser(description="Generate resized variants of every menu photo.")
+    parser.add_argument("--widths", type=int, nargs="+", default=list(WIDTHS))
+    parser.add_argument("--formats", nargs="+", default=available_formats(), choices=list(FORMATS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if Image is None:
+        parser.error("Pillow is not installed (pip install Pillow)")
+    unknown = sorted(set(args.widths) - set(WIDTHS))
+    if unknown:
+        parser.error(f"widths must be among {list(WIDTHS)} (got {unknown})")
+
+    sources = [
+        os.path.join(SOURCE_DIR, name) for name in sorted(os.listdir(SOURCE_DIR))
+        if name.lower().endswith(SOURCE_EXTENSIONS)
+    ]
+    print(f"{len(sources)} photos x {len(args.widths)} widths x {len(args.formats)} formats "
+          f"-> {CACHE_DIR} ({args.workers} workers)")
+    written_total = bytes_total = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(generate_all_variants, path, args.widths, args.formats) for path in sources]
+        for future in as_completed(futures):
+            name, written, size = future.result()
+            written_total += written
+            bytes_total += size
+            print(f"  {name}: {written} new variants, {size / 1024:.0f} KB")
+    removed = variant_cache.evict()
+    print(f"{written_total} variants written ({bytes_total / (1 << 20):.1f} MB), {removed} evicted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Flask Blueprint serving resized menu photos.
+
+Routes:
+- GET /media/<name>?w=<width>[&fmt=webp|avif|jpeg]
+
+``w`` is rounded up to the nearest width in ``WIDTHS``, so arbitrary
+client values cannot fill the cache with one variant per pixel. Without
+``fmt`` the format is negotiated from the ``Accept`` header (AVIF, then
+WebP, then JPEG). Variants come from the content-addressed cache in
+``image_pipeline.py`` and are generated on the first request.
+"""
+
+import os
+
+from flask import Blueprint, redirect, request, send_file
+from urllib.parse import quote
+
+from .image_pipeline import (
+    FORMATS, WIDTHS, available_formats, snap_width, source_path, variant_cache,
+)
+
+
+media_bp = Blueprint("media", __name__)
+
+# Browser cache lifetime for variants; revalidated with the ETag afterwards.
+MEDIA_MAX_AGE = int(os.getenv("MEDIA_MAX_AGE", "86400"))
+
+
+def _negotiate_format():
+    """Pick the best format the client accepts and Pillow can encode."""
+    accept = request.headers.get("Accept", "")
+    for fmt in available_formats():
+        if fmt == "jpeg" or FORMATS[fmt][1] in accept:
+            return fmt
+    return "jpeg"
+
+
+@media_bp.route("/media/<name>", methods=["GET"])
+def get_media(name):
+    """
+    @api {get} /media/:name Get a resized menu photo
+    @apiName GetMedia
+    @apiGroup Media
+    @apiVersion 1.0.0
+
+    @apiParam {String} name Photo file name in frontend/static/assets
+    @apiQuery {Number} [w=1280] Wanted width in CSS pixels x DPR; rounded up to 320/480/640/960/1280
+    @apiQuery {String="webp","avif","jpeg"} [fmt] Output format (default: negotiated from Accept)
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        Content-Type: image/webp
+        ETag: "5f1c..."
+        Cache-Control: public, max-age=86400
+        Vary: Accept
+
+    @apiError NotFound Unknown photo
+    @apiErrorExample Error-Response:
+        HTTP/1.1 404 Not Found
+        {"error": "Image not found"}
+    """
+    path = source_path(name)
+    if path is None:
+        return {"error": "Image not found"},404
+
+    if not available_formats():
+        # Pillow missing: fall back to the original photo.
+        return redirect(f"/static/assets/{quote(name)}")
+
+    try:
+        width = snap_width(int(request.args.get("w", WIDTHS[-1])))
+    except ValueError:
+        return {"error": "w must be an integer"},400
+
+    fmt = request.args.get("fmt")
+    negotiated = fmt is None
+    if negotiated:
+        fmt = _negotiate_format()
+    elif fmt not in available_formats():
+        return {"error": f"fmt must be one of: {', '.join(available_formats())}"},400
+
+    # Eviction (in this or another worker) can delete the variant between
+    # get_variant and send_file opening it: generate it again, and if it
+    # is gone a second time, fall back to the original photo.
+    for _ in range(2):
+        variant, key = variant_cache.get_variant(path, width, fmt)
+        try:
+            response = send_file(
+                variant,
+                mimetype=FORMATS[fmt][1],
+                etag=key,
+                conditional=True,
+                max_age=MEDIA_MAX_AGE,
+            )
+            break
+        except FileNotFoundError:
+            continue
+    else:
+        return redirect(f"/static/assets/{quote(name)}")
+    response.cache_control.public = True
+    # The variant file's mtime is its LRU timestamp, not a content date;
+    # the content-addressed ETag is the validator.
+    response.headers.pop("Last-Modified", None)
+    if negotiated:
+        response.vary.add("Accept")
+    return response
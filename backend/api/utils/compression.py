@@ -0,0 +1,307 @@
+"""Negotiated gzip/brotli response compression (WSGI middleware).
+
+``CompressionMiddleware`` wraps ``app.wsgi_app`` and compresses text-like
+responses (JSON, HTML, CSS, JS, SVG, ...) for clients that send a matching
+``Accept-Encoding``. Brotli is preferred when the optional ``brotli``
+package is installed, gzip is used otherwise.
+
+Compressed bodies of GET responses that carry a strong ``ETag`` are kept
+in a bounded in-memory LRU keyed by ``(resource, etag, encoding)``, the
+resource being the path and query string: an ETag only identifies a
+representation of one resource, and two resources may well share one.
+The menu snapshot and static files both have strong ETags, so a hot
+response is compressed once and afterwards served as stored bytes; a new
+menu snapshot or an edited file gets a new ETag and thus a new cache
+entry.
+
+Each encoding is a different representation, so its ETag gets a suffix
+(``"<etag>-br"`` / ``"<etag>-gzip"``). The suffix is removed again from
+incoming ``If-None-Match`` / ``If-Match`` headers so the application's own
+conditional request handling keeps working, and 304 answers carry the
+ETag the client knows.
+
+Left untouched: responses below the size threshold or above the size
+limit, non-200 responses (so 206 ranges and 304s are never altered),
+already encoded bodies, ``Cache-Control: no-transform``, HEAD requests
+and non-compressible types (images, video).
+
+Settings (environment variables):
+
+- ``COMPRESS_MIN_SIZE``   (default 1024)  bytes below which nothing is compressed
+- ``COMPRESS_MAX_SIZE``   (default 8 MiB) bytes above which nothing is compressed
+- ``COMPRESS_CACHE_MB``   (default 32)    size of the compressed-variant cache
+"""
+
+import gzip
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/manifest+json",
+    "image/svg+xml",
+)
+
+# Cached variants are compressed once, so they can afford a slower level.
+LEVELS = {
+    "br": {"cached": 9, "uncached": 4},
+    "gzip": {"cached": 9, "uncached": 6},
+}
+
+
+def parse_accept_encoding(header):
+    """
+    Return the preferred supported encoding for an Accept-Encoding value.
+
+    Args:
+        header (str): e.g. ``"gzip, deflate, br;q=0.9"``.
+
+    Returns:
+        str | None: ``"br"``, ``"gzip"`` or None (send uncompressed).
+    """
+    weights = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for name in candidates:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(body, encoding, cached):
+    """Compress ``body`` with ``encoding`` at the cached/uncached level."""
+    level = LEVELS[encoding]["cached" if cached else "uncached"]
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class CompressedVariantCache:
+    """Byte-bounded LRU of compressed bodies keyed by ``(resource, etag, encoding)``."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _no_write(data):
+    raise RuntimeError("CompressionMiddleware does not support the WSGI write() callable")
+
+
+def _resource(environ):
+    """The requested resource as a cache key part: script root, path and query string."""
+    resource = environ.get("SCRIPT_NAME", "") + environ.get("PATH_INFO", "")
+    query = environ.get("QUERY_STRING")
+    return f"{resource}?{query}" if query else resource
+
+
+def _strip_suffix(header_value):
+    """Remove our ``-br``/``-gzip`` ETag suffixes from a conditional header."""
+    for encoding in ("br", "gzip"):
+        header_value = header_value.replace(f'-{encoding}"', '"')
+    return header_value
+
+
+class CompressionMiddleware:
+    """
+    WSGI middleware that compresses eligible responses.
+
+    Args:
+        app: The wrapped WSGI application (``app.wsgi_app``).
+        min_size (int): Smallest body (bytes) worth compressing.
+        max_size (int): Largest body that is buffered and compressed.
+        cache_bytes (int): Capacity of the compressed-variant cache.
+
+    Example:
+        app.wsgi_app = CompressionMiddleware(app.wsgi_app)
+    """
+
+    def __init__(self, app, min_size=None, max_size=None, cache_bytes=None):
+        self.app = app
+        self.min_size = min_size if min_size is not None else int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+        self.max_size = max_size if max_size is not None else int(os.getenv("COMPRESS_MAX_SIZE", str(8 << 20)))
+        if cache_bytes is None:
+            cache_bytes = int(float(os.getenv("COMPRESS_CACHE_MB", "32")) * (1 << 20))
+        self.cache = CompressedVariantCache(cache_bytes)
+
+    def __call__(self, environ, start_response):
+        encoding = None
+        method = environ.get("REQUEST_METHOD")
+        if method != "HEAD":
+            encoding = parse_accept_encoding(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return self.app(environ, start_response)
+
+        # Read before the app runs: ProxyFix & co. may rewrite the paths.
+        resource = _resource(environ)
+        # Did the client revalidate the compressed representation?
+        revalidating = f'-{encoding}"' in environ.get("HTTP_IF_NONE_MATCH", "")
+        for header in ("HTTP_IF_NONE_MATCH", "HTTP_IF_MATCH"):
+            if header in environ:
+                environ[header] = _strip_suffix(environ[header])
+
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return _no_write
+
+        # Flask/Werkzeug call start_response before returning the body.
+        app_iter = self.app(environ, capture)
+        status, headers, exc_info = captured
+        plan = self._plan(status, headers)
+
+        if plan is None:
+            start_response(status, self._vary(status, headers, headers_only=True), exc_info)
+            return app_iter
+        if plan == "not-modified":
+            if revalidating:
+                headers = self._suffix_etag(headers, encoding)
+            start_response(status, headers, exc_info)
+            return app_iter
+
+        try:
+            body = b"".join(app_iter)
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+        etag = plan
+        compressed = None
+        key = (resource, etag, encoding) if etag and method == "GET" else None
+        if key is not None:
+            compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = compress(body, encoding, cached=key is not None)
+            if key is not None:
+                self.cache.put(key, compressed)
+        if len(compressed) >= len(body):
+            start_response(status, self._with_length(self._vary(status, headers), len(body)), exc_info)
+            return [body]
+
+        headers = self._suffix_etag(self._vary(status, headers), encoding)
+        headers.append(("Content-Encoding", encoding))
+        start_response(status, self._with_length(headers, len(compressed)), exc_info)
+        return [compressed]
+
+    def _plan(self, status, headers):
+        """
+        Decide what to do with a response from its status and headers.
+
+        Returns:
+            None to pass through, ``"not-modified"`` for a 304, otherwise
+            the strong ETag value (``""`` if there is none) to compress with.
+        """
+        code = status.split(" ", 1)[0]
+        values = {name.lower(): value for name, value in headers}
+        if code == "304":
+            return "not-modified"
+        if code != "200" or "content-encoding" in values:
+            return None
+        if not values.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+            return None
+        if "no-transform" in values.get("cache-control", ""):
+            return None
+        length = values.get("content-length")
+        if length is None or not length.isdigit():
+            return None
+        if not self.min_size <= int(length) <= self.max_size:
+            return None
+        etag = values.get("etag", "")
+        return etag if etag.startswith('"') else ""
+
+    def _vary(self, status, headers, headers_only=False):
+        """Add ``Vary: Accept-Encoding`` to compressible responses."""
+        values = {name.lower(): value for name, value in headers}
+        if headers_only and not values.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+            return headers
+        headers = [(name, value) for name, value in headers if name.lower() != "vary"]
+        vary = values.get("vary")
+        if vary is None:
+            vary = "Accept-Encoding"
+        elif "accept-encoding" not in vary.lower():
+            vary = f"{vary}, Accept-Encoding"
+        headers.append(("Vary", vary))
+        return headers
+
+    @staticmethod
+    def _suffix_etag(headers, encoding):
+        result = []
+        for name, value in headers:
+            if name.lower() == "etag" and value.startswith('"'):
+                value = f'{value[:-1]}-{encoding}"'
+            result.append((name, value))
+        return result
+
+    @staticmethod
+    def _with_length(headers, length):
+        headers = [(name, value) for name, value in headers if name.lower() != "content-length"]
+        headers.append(("Content-Length", str(length)))
+        return headers
+
+    def stats(self):
+        """Return compressed-variant cache statistics."""
+        return {
+            "encodings": ["br", "gzip"] if brotli is not None else ["gzip"],
+            "min_size": self.min_size,
+            **self.cache.stats(),
+        }
@@ -1,13 +1,309 @@
-from mongoengine import connect
+"""MongoDB connection setup and driver instrumentation.
+
+``mongo_connect()`` registers the MongoEngine default connection with an
+explicit connection-pool configuration and PyMongo monitoring listeners.
+It is safe to call from any WSGI server (gunicorn, waitress, ``flask
+run``): the client is created with ``connect=False`` so no socket is
+opened until the first query, which keeps it fork-safe when the app is
+imported before workers are forked.
+
+Pool and timeout settings are read from environment variables:
+
+- ``MONGO_MAX_POOL_SIZE``                (default 50)
+- ``MONGO_MIN_POOL_SIZE``                (default 0)
+- ``MONGO_WAIT_QUEUE_TIMEOUT_MS``        (default 2000)  max wait for a free connection
+- ``MONGO_SERVER_SELECTION_TIMEOUT_MS``  (default 5000)
+- ``MONGO_CONNECT_TIMEOUT_MS``           (default 5000)
+- ``MONGO_SOCKET_TIMEOUT_MS``            (default 10000)
+
+The listeners feed ``pool_stats`` (checkout wait times, connections in
+use) and ``command_stats`` (per-command latency), which the health
+endpoints in ``api/health`` expose, and the per-request database timer
+used by the request metrics in ``api/utils/metrics.py``.
+
+Every request passes through those metrics, so this module does not
+import PyMongo or MongoEngine itself: they are loaded when the first
+client is created (``mongo_connect``, ``event_listeners``).
+"""
+
 import os
+import threading
+import time
+from collections import deque
+
+
+class _LatencyStats:
+    """Count/mean/max plus p50/p95 over the most recent samples (milliseconds)."""
+
+    def __init__(self, window=1024):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent = deque(maxlen=window)
+
+    def add(self, value_ms):
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+        self._recent.append(value_ms)
+
+    def as_dict(self):
+        recent = sorted(self._recent)
+
+        def pick(pct):
+            return round(recent[min(len(recent) - 1, int(len(recent) * pct))], 3) if recent else None
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": pick(0.50),
+            "p95_ms": pick(0.95),
+        }
+
+
+class PoolStats:
+    """Tracks connection-pool usage: checkout waits, connections in use, failures."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkout_wait = _LatencyStats()
+        self.in_use = 0
+        self.max_in_use = 0
+        self.open_connections = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            if event.duration is not None:
+                self.checkout_wait.add(event.duration * 1000)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+            if event.duration is not None:
+                self.checkout_wait.add(event.duration * 1000)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "open_connections": self.open_connections,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+                "checkout_wait": self.checkout_wait.as_dict(),
+            }
+
+
+class CommandStats:
+    """Tracks latency and failures per MongoDB command name (find, insert, ...)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands = {}
+        self.failures = {}
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event.command_name, event.duration_micros / 1000)
+
+    def failed(self, event):
+        self._record(event.command_name, event.duration_micros / 1000)
+        with self._lock:
+            self.failures[event.command_name] = self.failures.get(event.command_name, 0) + 1
+
+    def _record(self, name, duration_ms):
+        # Listeners run on the thread that issued the command, so this is
+        # attributed to the request that thread is serving (if tracked).
+        if getattr(request_db_time, "active", False):
+            request_db_time.ms += duration_ms
+            request_db_time.commands += 1
+        with self._lock:
+            stats = self.commands.get(name)
+            if stats is None:
+                stats = self.commands[name] = _LatencyStats()
+            stats.add(duration_ms)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                name: {**stats.as_dict(), "failures": self.failures.get(name, 0)}
+                for name, stats in sorted(self.commands.items())
+            }
+
+
+pool_stats = PoolStats()
+command_stats = CommandStats()
+
+_listeners = None
+
+
+def event_listeners():
+    """
+    Return ``pool_stats`` and ``command_stats`` as PyMongo event listeners.
+
+    PyMongo only accepts instances of its own listener classes; these
+    forward every event method of the listener class to the stats object.
+    """
+    global _listeners
+    if _listeners is None:
+        from pymongo import monitoring
+
+        _listeners = [
+            _listener(monitoring.ConnectionPoolListener, pool_stats),
+            _listener(monitoring.CommandListener, command_stats),
+        ]
+    return _listeners
+
+
+def _listener(base, stats):
+    methods = {name: staticmethod(getattr(stats, name)) for name in dir(base) if not name.startswith("_")}
+    return type(f"{type(stats).__name__}Listener", (base,), methods)()
+
+# Per-thread accumulator of MongoDB time spent inside the current request;
+# see start_request_db_timer() / stop_request_db_timer().
+request_db_time = threading.local()
+
+
+def start_request_db_timer():
+    """Start attributing MongoDB command time on this thread to one request."""
+    request_db_time.active = True
+    request_db_time.ms = 0.0
+    request_db_time.commands = 0
+
+
+def stop_request_db_timer():
+    """
+    Stop the per-request timer started by ``start_request_db_timer``.
+
+    Returns:
+        tuple: (milliseconds spent in MongoDB commands, number of commands)
+    """
+    if not getattr(request_db_time, "active", False):
+        return 0.0, 0
+    request_db_time.active = False
+    return request_db_time.ms, request_db_time.commands
+
+
+_connect_lock = threading.Lock()
+_client = None
+
+
+def pool_settings():
+    """Return the MongoClient pool/timeout keyword arguments from the environment."""
+    return {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+        "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+        "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "10000")),
+    }
+
 
 def mongo_connect():
+    """
+    Register the default MongoEngine connection (once per process).
+
+    Safe to call repeatedly and from several threads; later calls return
+    the same client. If a default connection was already registered
+    elsewhere (e.g. a benchmark using a mongomock stand-in), that one is
+    reused.
+
+    Returns:
+        MongoClient | None: The client, or None if the settings were invalid.
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _connect_lock:
+        if _client is not None:
+            return _client
+        from mongoengine import connect, get_connection
+        from mongoengine.connection import ConnectionFailure
+
+        try:
+            _client = connect(
+                db=os.getenv("DB_NAME"),
+                host=os.getenv("DATABASE_URL"),
+                connect=False,
+                event_listeners=event_listeners(),
+                **pool_settings(),
+            )
+            print("DB connection configured")
+        except ConnectionFailure:
+            _client = get_connection()
+        except Exception as e:
+            print("Connection to db failed:", str(e))
+        return _client
+
+
+def ping_database(timeout_ms=1000):
+    """
+    Check that the database answers a ``ping`` within ``timeout_ms``.
+
+    Returns:
+        tuple: (ok (bool), round trip in ms or None, error message or None)
+    """
+    import pymongo
+
+    client = mongo_connect()
+    if client is None:
+        return False, None, "database is not configured"
+    start = time.perf_counter()
     try:
-        connection = connect(
-            db=os.getenv("DB_NAME"),
-            host=os.getenv("DATABASE_URL")
-        )
-        print("DB connected successfully")
-        return connection
+        # pymongo.timeout() also bounds server selection, so a down
+        # database fails the check quickly instead of after 5 seconds.
+        with pymongo.timeout(timeout_ms / 1000):
+            reply = client.admin.command("ping")
     except Exception as e:
-        print("Connection to db failed:", str(e))
\ No newline at end of file
+        return False, None, str(e)
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+    ok = bool(reply.get("ok"))
+    return ok, elapsed_ms, None if ok else "ping failed"
+
+
+def database_stats():
+    """Return pool and per-command statistics as a JSON-serialisable dict."""
+    return {
+        "pool": {"settings": pool_settings(), **pool_stats.as_dict()},
+        "commands": command_stats.as_dict(),
+    }
@@ -0,0 +1,192 @@
+"""Request-level metrics in Prometheus text format.
+
+``init_metrics(app)`` installs ``before_request``/``after_request`` hooks
+that record, for every Flask endpoint (template pages, the menu API and
+static files alike):
+
+- ``http_requests_total``            counter by endpoint, method and status
+- ``http_request_duration_seconds``  latency histogram by endpoint and method
+- ``http_response_size_bytes``       response size histogram
+- ``http_request_mongo_seconds``     MongoDB time spent inside the request
+- ``http_request_mongo_commands_total``  MongoDB commands issued by requests
+
+and serves them, plus any registered collectors (connection pool, menu
+cache, ...), at ``GET /metrics``.
+
+Recording is cheap on purpose: fixed buckets, a ``bisect`` per value and
+one short lock per request; rendering cost is paid only by the scraper.
+Metrics are per process: with several workers, scrape each one (or run
+a single-worker sidecar) as usual for in-process Prometheus exporters.
+Requests that matched no route are grouped under ``endpoint="unmatched"``
+to keep label cardinality bounded.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+from api.utils.db import pool_stats, start_request_db_timer, stop_request_db_timer
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """Fixed-bucket histogram (bucket upper bounds, Prometheus semantics)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class _RouteMetrics:
+    __slots__ = ("latency", "size", "mongo", "mongo_commands", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.mongo = Histogram(LATENCY_BUCKETS)
+        self.mongo_commands = 0
+        self.statuses = {}
+
+
+class RequestMetrics:
+    """Thread-safe store of per-(endpoint, method) request metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._collectors = []
+
+    def record(self, endpoint, method, status, seconds, size, mongo_seconds, mongo_commands):
+        key = (endpoint, method)
+        with self._lock:
+            route = self._routes.get(key)
+            if route is None:
+                route = self._routes[key] = _RouteMetrics()
+            route.latency.observe(seconds)
+            route.size.observe(size)
+            route.mongo.observe(mongo_seconds)
+            route.mongo_commands += mongo_commands
+            route.statuses[status] = route.statuses.get(status, 0) + 1
+
+    def register_collector(self, collector):
+        """Add a callable returning extra exposition lines for /metrics."""
+        self._collectors.append(collector)
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = [
+                "# HELP http_requests_total Requests by endpoint, method and status.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (endpoint, method), route in routes:
+                for status, count in sorted(route.statuses.items()):
+                    lines.append(
+                        f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}'
+                    )
+            for name, attr, help_text in (
+                ("http_request_duration_seconds", "latency", "Request latency."),
+                ("http_response_size_bytes", "size", "Response body size."),
+                ("http_request_mongo_seconds", "mongo", "MongoDB command time spent inside a request."),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (endpoint, method), route in routes:
+                    labels = f'endpoint="{endpoint}",method="{method}"'
+                    lines.extend(getattr(route, attr).render(name, labels))
+            lines.append("# HELP http_request_mongo_commands_total MongoDB commands issued while serving requests.")
+            lines.append("# TYPE http_request_mongo_commands_total counter")
+            for (endpoint, method), route in routes:
+                lines.append(
+                    f'http_request_mongo_commands_total{{endpoint="{endpoint}",method="{method}"}} {route.mongo_commands}'
+                )
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+def metric_lines(name, kind, help_text, value):
+    """Return the exposition lines for one unlabelled counter or gauge."""
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+
+
+def _pool_metrics():
+    stats = pool_stats.as_dict()
+    return (
+        metric_lines("mongo_pool_connections_in_use", "gauge",
+                     "Pooled MongoDB connections currently checked out.", stats["in_use"])
+        + metric_lines("mongo_pool_connections_open", "gauge",
+                       "Open MongoDB connections.", stats["open_connections"])
+        + metric_lines("mongo_pool_checkout_failures_total", "counter",
+                       "Failed connection checkouts (pool exhausted or server down).",
+                       stats["checkout_failures"])
+    )
+
+
+def _start_timer():
+    g._metrics_start = time.perf_counter()
+    start_request_db_timer()
+
+
+def _record_response(response):
+    start = g.pop("_metrics_start", None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    mongo_ms, mongo_commands = stop_request_db_timer()
+    endpoint = request.endpoint or "unmatched"
+    size = response.content_length
+    if size is None and not response.is_streamed:
+        size = len(response.get_data())
+    request_metrics.record(
+        endpoint, request.method, response.status_code, elapsed,
+        size or 0, mongo_ms / 1000, mongo_commands,
+    )
+    return response
+
+
+def metrics_view():
+    """Serve the collected metrics for a Prometheus scraper."""
+    return Response(request_metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app):
+    """
+    Install the request timing hooks and the ``/metrics`` route on ``app``.
+
+    Args:
+        app (Flask): The application to instrument.
+    """
+    request_metrics.register_collector(_pool_metrics)
+    app.before_request(_start_timer)
+    app.after_request(_record_response)
+    app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
@@ -0,0 +1,330 @@
+"""Full-page output cache for template routes whose HTML only changes per deploy.
+
+Routes opt in with a decorator::
+
+    @app.get("/about")
+    @page_cache.cached()
+    def about():
+        return render_template("about.html")
+
+The first request renders the page; later ones replay the stored status,
+headers and body without running the view or Jinja. Each cached page also
+gets a content ``ETag``, so a returning visitor gets ``304 Not Modified``.
+
+Cache key: a *version* (hash of the templates and the static manifest, so
+a deploy starts a fresh namespace), the endpoint, the path, the query
+parameters the route declares in ``params=`` (others, such as
+``?utm_source=`` or random cache busters, neither change the page nor
+add entries), the URL prefix (``X-Forwarded-Prefix``) and the values of
+any headers the route declares in ``vary=``. Only ``200`` responses without ``Set-Cookie``
+and without ``Cache-Control: private/no-store`` are stored.
+
+Backends (``PAGE_CACHE_BACKEND``):
+
+- ``memory``      per-process LRU bounded by ``PAGE_CACHE_MAX_MB`` (default)
+- ``filesystem``  files in ``PAGE_CACHE_DIR`` shared by all worker processes
+                  on the host, least recently used evicted first
+- ``off``         disabled
+
+Purge and inspect from the ``backend`` folder::
+
+    flask --app app page-cache purge
+    flask --app app page-cache stats
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+import click
+from flask import make_response, request
+from werkzeug.wrappers import Response
+
+from api.utils.static_assets import MANIFEST_PATH
+
+
+class MemoryBackend:
+    """Per-process LRU of ``(status, headers, body)`` bounded in bytes."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        size = len(entry[2])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[2])
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[2])
+
+    def purge(self):
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._size = 0
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+class FileSystemBackend:
+    """
+    One file per page in ``directory``, shared by every worker process.
+
+    A file holds a JSON header line (status, headers) followed by the body.
+    Files are written under a temporary name and renamed into place; hits
+    refresh the mtime (at most once a minute), which eviction uses as LRU
+    order.
+    """
+
+    name = "filesystem"
+    TOUCH_INTERVAL = 60
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._written = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.blake2b(key.encode(), digest_size=16).hexdigest())
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                meta = json.loads(fh.readline())
+                body = fh.read()
+            if time.time() - os.stat(path).st_mtime > self.TOUCH_INTERVAL:
+                os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if meta.get("key") != key:  # hash collision
+            return None
+        return meta["status"], [tuple(header) for header in meta["headers"]], body
+
+    def set(self, key, entry):
+        status, headers, body = entry
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(json.dumps({"key": key, "status": status, "headers": headers}).encode() + b"\n")
+            fh.write(body)
+        os.replace(tmp, path)
+        with self._lock:
+            self._written += len(body)
+            check = self._written > self.max_bytes // 10
+            if check:
+                self._written = 0
+        if check:
+            self.evict()
+
+    def _files(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, name))
+        return files
+
+    def evict(self):
+        """Remove least recently used pages until the directory fits ``max_bytes``."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, name in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def purge(self):
+        removed = 0
+        for _, _, name in self._files():
+            try:
+                os.remove(os.path.join(self.directory, name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def stats(self):
+        files = self._files()
+        return {
+            "entries": len(files),
+            "bytes": sum(size for _, size, _ in files),
+            "max_bytes": self.max_bytes,
+            "directory": self.directory,
+        }
+
+
+def deploy_version(*directories, extra_files=()):
+    """Hash the contents of every file in ``directories`` plus ``extra_files``."""
+    hasher = hashlib.blake2b(digest_size=8)
+    paths = list(extra_files)
+    for directory in directories:
+        for root, _, names in os.walk(directory):
+            paths.extend(os.path.join(root, name) for name in names)
+    for path in sorted(paths):
+        try:
+            with open(path, "rb") as fh:
+                hasher.update(path.encode() + b"\0" + fh.read())
+        except OSError:
+            continue
+    return hasher.hexdigest()
+
+
+class PageCache:
+    """Opt-in response cache for rendered pages."""
+
+    def __init__(self):
+        self.backend = None
+        self.version = ""
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def init_app(self, app, version=None):
+        """
+        Configure the backend from the environment and register the
+        ``flask page-cache`` CLI commands.
+
+        Args:
+            app (Flask): The application.
+            version (str | None): Cache namespace; defaults to
+                ``PAGE_CACHE_VERSION`` or a hash of the templates and the
+                static manifest, so a deploy that changes either starts
+                with an empty cache.
+        """
+        kind = os.getenv("PAGE_CACHE_BACKEND", "memory")
+        max_bytes = int(float(os.getenv("PAGE_CACHE_MAX_MB", "64")) * (1 << 20))
+        if kind == "memory":
+            self.backend = MemoryBackend(max_bytes)
+        elif kind == "filesystem":
+            directory = os.getenv("PAGE_CACHE_DIR", os.path.join(app.instance_path, "page_cache"))
+            self.backend = FileSystemBackend(directory, max_bytes)
+        elif kind == "off":
+            self.backend = None
+        else:
+            raise ValueError(f"PAGE_CACHE_BACKEND must be memory, filesystem or off (got {kind!r})")
+        if version is None:
+            template_dir = os.path.join(app.root_path, app.template_folder)
+            version = os.getenv("PAGE_CACHE_VERSION") or deploy_version(template_dir, extra_files=(MANIFEST_PATH,))
+        self.version = version
+        app.cli.add_command(self._cli())
+
+    def _key(self, vary, params):
+        headers = "|".join(f"{name}={request.headers.get(name, '')}" for name in vary)
+        query = urlencode([(name, value) for name in sorted(params) for value in request.args.getlist(name)])
+        return f"{self.version}|{request.endpoint}|{request.script_root}|{request.path}?{query}|{headers}"
+
+    def cached(self, vary=(), params=()):
+        """
+        Decorator caching a view's full response.
+
+        Args:
+            vary (tuple[str]): Request headers the page depends on (their
+                values become part of the cache key).
+            params (tuple[str]): Query parameters the page depends on
+                (likewise); any other query parameter is ignored.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None or request.method not in ("GET", "HEAD"):
+                    return view(*args, **kwargs)
+                key = self._key(vary, params)
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    status, headers, body = entry
+                    response = Response(body, status=status, headers=headers)
+                    response.headers["X-Page-Cache"] = "HIT"
+                    return response.make_conditional(request)
+
+                self.misses += 1
+                response = make_response(view(*args, **kwargs))
+                if self._storable(response):
+                    response.add_etag()
+                    body = response.get_data()
+                    headers = [(k, v) for k, v in response.headers.items() if k.lower() != "content-length"]
+                    self.backend.set(key, (response.status_code, headers, body))
+                    self.stores += 1
+                response.headers["X-Page-Cache"] = "MISS"
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _storable(response):
+        if response.status_code != 200 or response.is_streamed or "Set-Cookie" in response.headers:
+            return False
+        cache_control = response.cache_control
+        return not (cache_control.private or cache_control.no_store)
+
+    def purge(self):
+        """Drop every cached page; returns how many were removed."""
+        return self.backend.purge() if self.backend is not None else 0
+
+    def stats(self):
+        """Return backend size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend is not None else "off",
+            "version": self.version,
+            **(self.backend.stats() if self.backend is not None else {}),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def _cli(self):
+        group = click.Group("page-cache", help="Inspect or purge the full-page cache.")
+
+        @group.command("purge")
+        def purge_command():
+            """Remove every cached page (filesystem backend: for all workers)."""
+            click.echo(f"{self.purge()} cached pages removed")
+
+        @group.command("stats")
+        def stats_command():
+            """Print cache size and settings."""
+            click.echo(json.dumps(self.stats(), indent=2))
+
+        return group
+
+
+page_cache = PageCache()
@@ -0,0 +1,136 @@
+"""Byte-range file responses that never buffer the file in worker memory.
+
+``send_file_range`` answers ``GET`` requests for large media (the hero
+videos) with:
+
+- ``206 Partial Content`` for a single ``Range: bytes=...`` request, so
+  browsers can seek and start playback without the whole file,
+- ``416 Range Not Satisfiable`` for ranges past the end of the file,
+- ``If-Range`` support: the range is only honoured if the client's copy
+  (ETag or Last-Modified) is still current, otherwise the full file is
+  sent,
+- ``304 Not Modified`` for ``If-None-Match`` / ``If-Modified-Since``.
+
+Multi-range requests are answered with the full file (allowed by RFC
+9110 and what browsers expect from media servers).
+
+The body is the file positioned at the start of the range. Under
+gunicorn or waitress it is handed over as ``wsgi.file_wrapper`` together
+with an exact ``Content-Length``; those servers then copy the range from
+the file to the socket with ``sendfile()`` (zero-copy, no Python loop).
+Other servers get a small iterator that reads the range in
+``CHUNK_SIZE`` blocks. Either way only one block per client is ever in
+memory, however many clients stream concurrently.
+"""
+
+import mimetypes
+import os
+from datetime import datetime, timezone
+
+from flask import Response, request
+from werkzeug.http import http_date, is_resource_modified, parse_date
+
+
+CHUNK_SIZE = 256 * 1024
+
+# Servers whose wsgi.file_wrapper honours Content-Length and the current
+# file offset (and can use sendfile). Others would send the file to EOF.
+FILE_WRAPPER_SERVERS = ("gunicorn", "waitress")
+
+
+class FileRange:
+    """Iterable over ``length`` bytes of an open file, closing it at the end."""
+
+    def __init__(self, fh, length, chunk_size=CHUNK_SIZE):
+        self.fh = fh
+        self.remaining = length
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        while self.remaining > 0:
+            data = self.fh.read(min(self.chunk_size, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+            yield data
+        self.close()
+
+    def close(self):
+        self.fh.close()
+
+
+def _if_range_matches(if_range, etag, last_modified):
+    """True when an ``If-Range`` validator still describes the current file."""
+    if if_range.startswith('"'):
+        return if_range == f'"{etag}"'
+    if if_range.startswith("W/"):
+        return False  # weak ETags never validate a range
+    date = parse_date(if_range)
+    return date is not None and date == last_modified
+
+
+def _body(path, start, length):
+    fh = open(path, "rb")
+    fh.seek(start)
+    file_wrapper = request.environ.get("wsgi.file_wrapper")
+    server = request.environ.get("SERVER_SOFTWARE", "").lower()
+    if file_wrapper is not None and server.startswith(FILE_WRAPPER_SERVERS):
+        return file_wrapper(fh, CHUNK_SIZE)
+    return FileRange(fh, length)
+
+
+def send_file_range(path, mimetype=None, etag=None, max_age=None):
+    """
+    Build a (possibly partial) response for a file on disk.
+
+    Args:
+        path (str): Absolute path of the file (already validated).
+        mimetype (str): Content type; guessed from the name when omitted.
+        etag (str): Strong ETag value without quotes. Defaults to one
+            derived from the file's mtime and size.
+        max_age (int): ``Cache-Control`` max-age in seconds, or None for
+            ``no-cache``.
+
+    Returns:
+        flask.Response: 200, 206, 304 or 416.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    last_modified = datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+    if etag is None:
+        etag = f"{stat.st_mtime_ns:x}-{size:x}"
+    if mimetype is None:
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{etag}"',
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": f"public, max-age={max_age}" if max_age is not None else "no-cache",
+    }
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return Response(status=304, headers=headers)
+
+    start, stop, status = 0, size, 200
+    byte_range = request.range
+    if_range = request.headers.get("If-Range")
+    if (
+        byte_range is not None
+        and byte_range.units == "bytes"
+        and len(byte_range.ranges) == 1
+        and (if_range is None or _if_range_matches(if_range, etag, last_modified))
+    ):
+        bounds = byte_range.range_for_length(size)
+        if bounds is None:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status=416, headers=headers)
+        start, stop = bounds
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+
+    length = stop - start
+    headers["Content-Length"] = str(length)
+    # HEAD: headers only, never open the file.
+    body = [] if request.method == "HEAD" else _body(path, start, length)
+    return Response(body, status=status, headers=headers, mimetype=mimetype, direct_passthrough=True)
@@ -0,0 +1,193 @@
+"""Content-hashed static asset URLs with immutable caching.
+
+A build step hashes every file under ``frontend/static`` and writes a
+manifest that maps each file to a fingerprinted name::
+
+    {"version": 1, "files": {"css/main.css": "css/main.3f9a1c2b7d4e.css", ...}}
+
+(from the ``backend`` folder)::
+
+    python -m api.utils.static_assets build
+
+``StaticAssets.init_app(app)`` loads the manifest once at startup into two
+dicts (original -> hashed, hashed -> original), so every lookup is O(1):
+
+- ``url_for('static', filename=...)`` in the templates is rewritten to the
+  hashed name through an ``url_defaults`` hook; templates keep using plain
+  file names. ``asset_url(name)`` is the same lookup as a Jinja helper.
+- ``static_importmap()`` renders an import map from the plain to the
+  hashed URL of every JS module, so the relative ``import`` statements
+  inside the modules also load fingerprinted files.
+- The ``static`` view serves a hashed name from the original file with
+  ``Cache-Control: public, max-age=31536000, immutable``; plain names keep
+  the default ``no-cache`` + ETag revalidation. Video and audio files go
+  through ``ranged_files.send_file_range`` (206 ranges, sendfile).
+
+The hashed files are not copied anywhere, so the build only writes the
+manifest. Rebuild it whenever the static files change (i.e. on every
+deploy). Without a manifest, or in debug mode, plain URLs are used.
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+
+from flask import abort, request, send_from_directory
+from markupsafe import Markup
+from werkzeug.security import safe_join
+
+from api.utils.ranged_files import send_file_range
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MANIFEST_PATH = os.getenv("STATIC_MANIFEST", os.path.join(BACKEND_DIR, "static-manifest.json"))
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+HASH_LENGTH = 12
+# Served with send_file_range (206 ranges, sendfile) instead of send_file.
+RANGED_TYPES = ("video/", "audio/")
+
+
+def file_digest(path):
+    """Return the blake2b hex digest of a file's content."""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def hashed_name(relpath, digest):
+    """``css/main.css`` -> ``css/main.<hash>.css``."""
+    root, ext = os.path.splitext(relpath)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def build_manifest(static_dir):
+    """
+    Hash every (non-hidden) file under ``static_dir``.
+
+    Returns:
+        dict: ``{"version": 1, "files": {<relative path>: <hashed path>}}``
+              with ``/`` separators on every platform.
+    """
+    files = {}
+    for root, dirs, names in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(names):
+            if name.startswith("."):
+                continue
+            full = os.path.join(root, name)
+            relpath = os.path.relpath(full, static_dir).replace(os.sep, "/")
+            files[relpath] = hashed_name(relpath, file_digest(full))
+    return {"version": 1, "files": files}
+
+
+class StaticAssets:
+    """Fingerprinted URLs and immutable caching for ``app.static_folder``."""
+
+    def __init__(self):
+        self.files = {}
+        self.originals = {}
+        self._importmaps = {}
+
+    def load(self, manifest_path):
+        """Load a manifest file; a missing file leaves plain URLs in place."""
+        try:
+            with open(manifest_path, encoding="utf-8") as fh:
+                manifest = json.load(fh)
+        except FileNotFoundError:
+            print(f"No static manifest at {manifest_path}; serving unversioned asset URLs")
+            return
+        self.files = manifest["files"]
+        # hashed name -> (original name, content hash used as the ETag)
+        self.originals = {
+            hashed: (original, hashed[len(os.path.splitext(original)[0]) + 1:][:HASH_LENGTH])
+            for original, hashed in self.files.items()
+        }
+        self._importmaps = {}
+
+    def init_app(self, app, manifest_path=MANIFEST_PATH):
+        """Load the manifest and install the URL rewriting and static view."""
+        self.load(manifest_path)
+        self.app = app
+        app.url_defaults(self._rewrite_static_url)
+        app.jinja_env.globals["asset_url"] = self.asset_url
+        app.jinja_env.globals["static_importmap"] = self.importmap
+        app.view_functions["static"] = self.static_view
+
+    def _enabled(self):
+        return bool(self.files) and not self.app.debug
+
+    def _rewrite_static_url(self, endpoint, values):
+        if endpoint == "static" and self._enabled():
+            hashed = self.files.get(values.get("filename"))
+            if hashed is not None:
+                values["filename"] = hashed
+
+    def asset_url(self, filename):
+        """Jinja helper: URL of a static file, fingerprinted when known."""
+        if self._enabled():
+            filename = self.files.get(filename, filename)
+        return f"{request.script_root}{self.app.static_url_path}/{filename}"
+
+    def importmap(self):
+        """Jinja helper: ``<script type="importmap">`` for the JS modules."""
+        if not self._enabled():
+            return ""
+        prefix = f"{request.script_root}{self.app.static_url_path}/"
+        markup = self._importmaps.get(prefix)
+        if markup is None:
+            imports = {
+                prefix + original: prefix + hashed
+                for original, hashed in self.files.items()
+                if original.endswith(".js")
+            }
+            # "</" cannot appear inside a <script> element.
+            body = json.dumps({"imports": imports}, separators=(",", ":")).replace("</", "<\\/")
+            markup = self._importmaps[prefix] = Markup(f'<script type="importmap">{body}</script>')
+        return markup
+
+    def static_view(self, filename):
+        """Serve ``/static/<filename>``; hashed names are cached for a year."""
+        entry = self.originals.get(filename)
+        if (mimetypes.guess_type(entry[0] if entry else filename)[0] or "").startswith(RANGED_TYPES):
+            return self._ranged_view(filename, entry)
+        if entry is None:
+            return self.app.send_static_file(filename)
+        original, digest = entry
+        response = send_from_directory(
+            self.app.static_folder, original, etag=digest, max_age=IMMUTABLE_MAX_AGE,
+        )
+        response.cache_control.immutable = True
+        return response
+
+    def _ranged_view(self, filename, entry):
+        """Video/audio: byte ranges and zero-copy streaming."""
+        original, digest = entry or (filename, None)
+        path = safe_join(self.app.static_folder, original)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        if digest is None:
+            return send_file_range(path)
+        response = send_file_range(path, etag=digest, max_age=IMMUTABLE_MAX_AGE)
+        response.cache_control.immutable = True
+        return response
+
+
+static_assets = StaticAssets()
+
+
+def main():
+    if sys.argv[1:] != ["build"]:
+        sys.exit("usage: python -m api.utils.static_assets build")
+    static_dir = os.path.normpath(os.path.join(BACKEND_DIR, "..", "frontend", "static"))
+    manifest = build_manifest(static_dir)
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    print(f"{len(manifest['files'])} files hashed -> {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Async read path of the menu API, used by the ASGI entry point (``asgi.py``).
+
+``GET /api/v1/menu`` and ``GET /api/v1/menu/<item_id>`` are answered here
+on the event loop, with the same parameters, validation messages, headers
+and ETags as the Flask controllers (``menu_controller.py``):
+
+- The menu snapshot (``menu_cache``) is the one the Flask routes use in the
+  same process, so writes made through Flask invalidate it as usual. When
+  it has to be rebuilt the items are read with PyMongo's
+  ``AsyncMongoClient`` instead of MongoEngine, so a rebuild does not hold
+  a thread, and the result is installed with ``menu_cache.publish``.
+- Filtered / paginated list queries (``?category=``, ``?limit=`` ...) run
+  the same filter document (``menu_filter``) through the async client.
+- ``?day=`` lookups come from the in-memory weekday index, as in Flask.
+
+The async client is created on first use, inside the running event loop,
+with the database and pool settings of the MongoEngine connection
+(``DATABASE_URL`` and ``pool_settings()`` in ``api/utils/db.py``).
+
+Handlers return unconditional Werkzeug responses; ``asgi.py`` answers
+``304 Not Modified`` and compresses them like the Flask app does.
+"""
+
+import asyncio
+import os
+
+from bson import ObjectId
+from flask import Response
+from pymongo import AsyncMongoClient
+
+from api.utils.db import event_listeners, pool_settings
+from .menu_cache import content_etag
+from .menu_controller import (
+    LIST_QUERY_PARAMS, json_response, parse_list_query, set_next_cursor, uses_weekday_index,
+)
+from .menu_model import MenuItem, WIRE_FIELDS, menu_cache, menu_filter
+from .menu_serializer import encode_json, project_item
+from .menu_weekdays import weekday_index
+
+
+class AsyncMenuReader:
+    """Reads menu documents through ``AsyncMongoClient``.
+
+    Attributes:
+        collection: The async menu collection; created on first use and
+            may be replaced by any object with the same ``find`` API
+            (the ASGI benchmark does).
+    """
+
+    def __init__(self):
+        self.collection = None
+        self._client = None
+        self._rebuild_lock = None
+
+    def _collection(self):
+        if self.collection is None:
+            self._client = AsyncMongoClient(
+                os.getenv("DATABASE_URL"),
+                event_listeners=event_listeners(),
+                **pool_settings(),
+            )
+            # Same database and collection names MongoEngine resolved.
+            database = self._client[MenuItem._get_db().name]
+            self.collection = database[MenuItem._get_collection_name()]
+        return self.collection
+
+    async def snapshot(self):
+        """
+        Return the current menu snapshot, reloading it asynchronously on a miss.
+
+        Only one task reloads at a time; others that missed wait for it.
+
+        Returns:
+            MenuSnapshot: The current menu snapshot.
+        """
+        snapshot = menu_cache.peek()
+        if snapshot is not None:
+            return snapshot
+        if self._rebuild_lock is None:
+            self._rebuild_lock = asyncio.Lock()
+        async with self._rebuild_lock:
+            snapshot = menu_cache.peek()
+            if snapshot is not None:
+                return snapshot
+            generation = menu_cache.generation
+            items = [project_item(raw, WIRE_FIELDS) async for raw in self._collection().find({})]
+            return menu_cache.publish(items, generation)
+
+    async def query(self, category=None, day=None, dietary=None, exclude_allergens=None,
+                    active=None, fields=None, after=None, limit=None):
+        """
+        Async ``query_menu_items``: same arguments, same ``(items, next_cursor)`` result.
+        """
+        next_cursor = None
+        projected = WIRE_FIELDS
+        projection = None
+        if fields:
+            projected = tuple(name for name in WIRE_FIELDS if name in fields)
+            projection = dict.fromkeys(projected, 1)
+        cursor = self._collection().find(
+            menu_filter(category, day, dietary, exclude_allergens, active, after), projection,
+        ).sort("_id", 1)
+        if limit:
+            # Fetch one extra document to know whether another page exists.
+            cursor = cursor.limit(limit + 1)
+
+        items = [project_item(raw, projected) async for raw in cursor]
+        if limit and len(items) > limit:
+            items = items[:limit]
+            next_cursor = items[-1]["id"]
+        return items, next_cursor
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self.collection = None
+
+
+menu_reader = AsyncMenuReader()
+
+
+def _error(message, status):
+    """The ``{"error": ...},status`` answer of the Flask controllers (jsonify ends it with a newline)."""
+    return Response(encode_json({"error": message}) + b"\n", status=status, mimetype="application/json")
+
+
+async def get_menu(request):
+    """
+    Async ``GET /api/v1/menu`` (see ``menu_controller.get_menu``).
+
+    Args:
+        request (werkzeug.wrappers.Request): The request.
+
+    Returns:
+        Response: JSON list of items (200), or a JSON error (400).
+    """
+    if any(name in request.args for name in LIST_QUERY_PARAMS):
+        try:
+            query = parse_list_query(request.args)
+        except ValueError as e:
+            return _error(str(e), 400)
+
+        if uses_weekday_index(query, request.args):
+            await menu_reader.snapshot()  # the index rebuilds from it when expired
+            payload, etag = weekday_index.payload(query["day"], active_only=bool(query["active"]))
+            return json_response(payload, etag, None)
+
+        items, next_cursor = await menu_reader.query(**query)
+        payload = encode_json(items)
+        response = json_response(payload, content_etag(payload), None)
+        set_next_cursor(response, request, next_cursor)
+        return response
+
+    snapshot = await menu_reader.snapshot()
+    return json_response(snapshot.payload, snapshot.etag, snapshot.last_modified)
+
+
+async def get_menu_item(request, item_id):
+    """
+    Async ``GET /api/v1/menu/<item_id>`` (see ``menu_controller.get_menu_item_controller``).
+
+    Returns:
+        Response: The JSON item (200), or a JSON error (400) for a
+               malformed or unknown id.
+    """
+    if not ObjectId.is_valid(item_id):
+        return _error("malformed input", 400)
+
+    snapshot = await menu_reader.snapshot()
+    entry = snapshot.item_payload(item_id)
+    if entry is None:
+        return _error("Item not found", 400)
+
+    payload, etag = entry
+    return json_response(payload, etag, snapshot.last_modified)
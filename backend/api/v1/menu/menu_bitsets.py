@@ -0,0 +1,274 @@
+"""Bitset index for dietary / allergen filtering (``GET /api/v1/menu/filter``).
+
+Every item carries two small bitmasks, ``dietary_mask`` and
+``allergen_mask`` (see ``dietary_mask`` / ``allergen_mask`` in
+``menu_model.py``), stored on the document and mirrored here.
+
+The index keeps the items in a list, position ``i`` being one item, with:
+
+- ``dietary_masks`` / ``allergen_masks``: ``array('I')`` of the per-item
+  masks, and
+- one *column* per label: a Python int whose bit ``i`` is set when item
+  ``i`` has that label (plus ``alive`` and ``active`` columns).
+
+A filter such as "vegan AND no nuts AND no gluten" is then::
+
+    alive & column[vegan] & ~column[nuts] & ~column[gluten]
+
+Each ``&`` processes the whole catalog 30 bits per machine word inside
+CPython's int implementation, with no per-item Python code. The matching
+items are picked with ``itertools.compress`` from the result's bits.
+
+The index is built from the menu snapshot on first use, patched per item
+from ``menu_events`` (a deleted item only clears its ``alive`` bit) and
+rebuilt, compacting those holes, once older than ``MENU_CACHE_TTL``.
+
+Stored masks of documents written before the fields existed can be filled
+in from the ``backend`` folder with::
+
+    python -m api.v1.menu.menu_bitsets backfill
+"""
+
+import sys
+import threading
+import time
+from array import array
+from itertools import compress
+
+from pymongo import UpdateOne
+
+from .menu_events import subscribe
+from .menu_model import (
+    MenuItem, menu_cache, DIETARY_BITS, ALLERGEN_BITS, dietary_mask, allergen_mask,
+)
+
+
+# "0"/"1" characters of a bin() string -> 0/1 bytes, for itertools.compress.
+_BIT_BYTES = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def select_positions(bits, values):
+    """Return ``values[i]`` for every set bit ``i`` of the int ``bits``."""
+    if not bits:
+        return []
+    selectors = bin(bits)[:1:-1].encode().translate(_BIT_BYTES)
+    return list(compress(values, selectors))
+
+
+class BitsetColumns:
+    """Per-item mask arrays and per-label bit columns for one list of items."""
+
+    def __init__(self, items=()):
+        self.items = []
+        self.positions = {}
+        self.dietary_masks = array("I")
+        self.allergen_masks = array("I")
+        self.dietary = dict.fromkeys(DIETARY_BITS.values(), 0)
+        self.allergens = dict.fromkeys(ALLERGEN_BITS.values(), 0)
+        self.alive = 0
+        self.active = 0
+        self._load(items)
+
+    def _load(self, items):
+        """Bulk build: one "0"/"1" flag string per column, turned into an int at the end.
+
+        Setting bits one by one would copy a growing int per item (quadratic).
+        """
+        count = len(items)
+        flags = {
+            key: bytearray(b"0" * count)
+            for key in [("d", bit) for bit in self.dietary] + [("a", bit) for bit in self.allergens] + ["active"]
+        }
+        for position, item in enumerate(items):
+            dietary = dietary_mask(item.get("dietary"))
+            allergens = allergen_mask(item.get("allergens"))
+            self.items.append(item)
+            self.positions[item["id"]] = position
+            self.dietary_masks.append(dietary)
+            self.allergen_masks.append(allergens)
+            for bit in self.dietary:
+                if dietary & bit:
+                    flags["d", bit][position] = 0x31
+            for bit in self.allergens:
+                if allergens & bit:
+                    flags["a", bit][position] = 0x31
+            if item.get("active"):
+                flags["active"][position] = 0x31
+
+        def column(key):
+            return int(flags[key][::-1], 2) if count else 0
+
+        self.dietary = {bit: column(("d", bit)) for bit in self.dietary}
+        self.allergens = {bit: column(("a", bit)) for bit in self.allergens}
+        self.active = column("active")
+        self.alive = (1 << count) - 1
+
+    def append(self, item):
+        position = len(self.items)
+        self.items.append(item)
+        self.positions[item["id"]] = position
+        self.dietary_masks.append(0)
+        self.allergen_masks.append(0)
+        self.set(position, item)
+
+    def set(self, position, item):
+        """Write an item's masks at ``position`` and update every column."""
+        bit = 1 << position
+        dietary = dietary_mask(item.get("dietary"))
+        allergens = allergen_mask(item.get("allergens"))
+        self.items[position] = item
+        self.dietary_masks[position] = dietary
+        self.allergen_masks[position] = allergens
+        for columns, mask in ((self.dietary, dietary), (self.allergens, allergens)):
+            for label_bit in columns:
+                if mask & label_bit:
+                    columns[label_bit] |= bit
+                elif columns[label_bit] & bit:
+                    columns[label_bit] &= ~bit
+        self.active = self.active | bit if item.get("active") else self.active & ~bit
+        self.alive |= bit
+
+    def remove(self, item_id):
+        position = self.positions.pop(item_id, None)
+        if position is not None:
+            self.alive &= ~(1 << position)
+
+
+class BitsetIndex:
+    """Array- and bitmap-backed dietary/allergen index over the whole menu.
+
+    Args:
+        snapshot_source (callable): Returns the current ``MenuSnapshot``.
+        ttl (float): Maximum age of the index before a full rebuild.
+    """
+
+    def __init__(self, snapshot_source, ttl=300):
+        self._snapshot_source = snapshot_source
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._columns = None
+        self._built_at = 0.0
+        self.rebuilds = 0
+        self.patches = 0
+
+    def _fresh(self):
+        return self._columns is not None and self.ttl > 0 and time.monotonic() - self._built_at < self.ttl
+
+    def _current(self):
+        if not self._fresh():
+            with self._lock:
+                if not self._fresh():
+                    # Built aside and swapped in, so readers never see a half-built index.
+                    self._columns = BitsetColumns(self._snapshot_source().items)
+                    self._built_at = time.monotonic()
+                    self.rebuilds += 1
+        return self._columns
+
+    def apply(self, change):
+        """``menu_events`` listener: update one item's bits in place."""
+        with self._lock:
+            columns = self._columns
+            if columns is None:
+                return  # nothing built yet; the first read loads everything
+            position = columns.positions.get(change.item_id)
+            if change.op == "delete":
+                columns.remove(change.item_id)
+            elif position is None:
+                columns.append(change.item)
+            else:
+                columns.set(position, change.item)
+            self.patches += 1
+
+    def filter(self, dietary=(), exclude_dietary=(), allergens=(), exclude_allergens=(), active=None):
+        """
+        Return the items matching every include/exclude condition, in index order.
+
+        Args:
+            dietary (Iterable[str]): Labels the item must ALL have.
+            exclude_dietary (Iterable[str]): Labels the item must have NONE of.
+            allergens (Iterable[str]): Canonical allergens the item must ALL contain.
+            exclude_allergens (Iterable[str]): Canonical allergens it must contain NONE of.
+            active (bool | None): Keep only active (True) / inactive (False) items.
+
+        Returns:
+            list[dict]: Matching items in wire format.
+        """
+        columns = self._current()
+        bits = columns.alive
+        if active is not None:
+            bits &= columns.active if active else ~columns.active
+        for label in dietary:
+            bits &= columns.dietary[DIETARY_BITS[label]]
+        for label in exclude_dietary:
+            bits &= ~columns.dietary[DIETARY_BITS[label]]
+        for name in allergens:
+            bits &= columns.allergens[ALLERGEN_BITS[name]]
+        for name in exclude_allergens:
+            bits &= ~columns.allergens[ALLERGEN_BITS[name]]
+        return select_positions(bits, columns.items)
+
+    def scan(self, dietary=(), exclude_dietary=(), allergens=(), exclude_allergens=(), active=None):
+        """Same result as ``filter``, testing each item's masks in turn (for comparison)."""
+        columns = self._current()
+        include_d = sum(DIETARY_BITS[label] for label in dietary)
+        exclude_d = sum(DIETARY_BITS[label] for label in exclude_dietary)
+        include_a = sum(ALLERGEN_BITS[name] for name in allergens)
+        exclude_a = sum(ALLERGEN_BITS[name] for name in exclude_allergens)
+        positions = columns.positions
+        return [
+            item
+            for item, d, a in zip(columns.items, columns.dietary_masks, columns.allergen_masks)
+            if d & include_d == include_d and not d & exclude_d
+            and a & include_a == include_a and not a & exclude_a
+            and (active is None or bool(item.get("active")) == active)
+            and item["id"] in positions
+        ]
+
+    def stats(self):
+        columns = self._columns
+        return {
+            "items": bin(columns.alive).count("1") if columns is not None else 0,
+            "slots": len(columns.items) if columns is not None else 0,
+            "age_seconds": round(time.monotonic() - self._built_at, 3) if columns is not None else None,
+            "rebuilds": self.rebuilds,
+            "patches": self.patches,
+        }
+
+
+bitset_index = BitsetIndex(menu_cache.get, ttl=menu_cache.ttl)
+subscribe(bitset_index.apply)
+
+
+def backfill_masks(batch_size=1000):
+    """
+    Store ``dietary_mask`` / ``allergen_mask`` on every document whose
+    masks are missing or out of date, in ``bulk_write`` batches.
+
+    Returns:
+        int: Number of documents updated.
+    """
+    collection = MenuItem._get_collection()
+    projection = {"dietary": 1, "allergens": 1, "dietary_mask": 1, "allergen_mask": 1}
+    updated, batch = 0, []
+    for raw in collection.find({}, projection):
+        masks = {"dietary_mask": dietary_mask(raw.get("dietary")), "allergen_mask": allergen_mask(raw.get("allergens"))}
+        if all(raw.get(name) == value for name, value in masks.items()):
+            continue
+        batch.append(UpdateOne({"_id": raw["_id"]}, {"$set": masks}))
+        if len(batch) >= batch_size:
+            updated += collection.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += collection.bulk_write(batch, ordered=False).modified_count
+    return updated
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from api.utils.db import mongo_connect
+
+    if sys.argv[1:] != ["backfill"]:
+        sys.exit("usage: python -m api.v1.menu.menu_bitsets backfill")
+    load_dotenv()
+    mongo_connect()
+    print(f"{backfill_masks()} menu items updated")
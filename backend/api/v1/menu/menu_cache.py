@@ -0,0 +1,212 @@
+"""In-process snapshot cache for the menu API.
+
+The menu changes a few times a day but is read constantly, so instead of
+querying MongoDB on every request the full menu is loaded once into an
+immutable, versioned ``MenuSnapshot`` and served from memory.
+
+- Writes (see ``menu_model.py``) call ``invalidate()`` so the next read
+  rebuilds the snapshot from the database.
+- A TTL acts as a safety net for writes made by other worker processes,
+  which cannot invalidate this process' copy.
+- Hit/miss counters are kept so the cache can be observed in production.
+
+The snapshot reference is swapped in a single assignment, so readers
+always see either the old or the new snapshot, never a half-built one.
+Each snapshot also carries its pre-encoded JSON body, so hot reads are a
+plain bytes write, and HTTP validators (a strong ETag derived from the
+body and a Last-Modified time) so conditional requests can be answered
+with ``304 Not Modified`` straight from memory.
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+
+from .menu_serializer import encode_json
+
+
+class MenuSnapshot:
+    """Immutable view of the whole menu at a given version.
+
+    Attributes:
+        version (int): Monotonic number, bumped on every rebuild.
+        items (list[dict]): Menu items in API (wire) format.
+        by_id (dict): Same items keyed by their string ``id``.
+        payload (bytes): ``items`` encoded as the JSON response body.
+        etag (str): Content hash of ``payload``; identical menus produce
+            identical ETags across rebuilds and worker processes.
+        last_modified (datetime): When the menu content last changed, as
+            far as this process knows.
+        built_at (float): ``time.monotonic()`` timestamp of the build.
+    """
+
+    __slots__ = (
+        "version", "items", "by_id", "payload", "etag", "last_modified",
+        "built_at", "_item_payloads",
+    )
+
+    def __init__(self, version, items):
+        self.version = version
+        self.items = items
+        self.by_id = {item["id"]: item for item in items}
+        self.payload = encode_json(items)
+        self.etag = content_etag(self.payload)
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.built_at = time.monotonic()
+        self._item_payloads = {}
+
+    def item_payload(self, item_id):
+        """Return ``(payload, etag)`` for one item, or None if unknown.
+
+        Encoded lazily on first request and reused for the snapshot's life.
+        """
+        entry = self._item_payloads.get(item_id)
+        if entry is None:
+            item = self.by_id.get(item_id)
+            if item is None:
+                return None
+            payload = encode_json(item)
+            entry = self._item_payloads[item_id] = (payload, item_etag(item))
+        return entry
+
+
+def content_etag(payload):
+    """Return a strong ETag value (without quotes) for encoded bytes."""
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def item_etag(item):
+    """Return the ETag value (without quotes) of one item: ``<id>-<version>``.
+
+    Every write bumps ``version``, so this changes whenever the item does.
+    It is the same whether the item comes from a snapshot (GET) or straight
+    from a write (PUT), and a client can send it back in If-Match. Items
+    stored before versions existed have no ``version``: they count as 0
+    (their first update sets it to 1).
+    """
+    return f"{item['id']}-{item.get('version', 0)}"
+
+
+class MenuSnapshotCache:
+    """Lazily built, write-invalidated snapshot of the menu.
+
+    Args:
+        loader (callable): Returns the list of menu items (wire format)
+            straight from the database. Only called on a cache miss.
+        ttl (float): Maximum age of a snapshot in seconds. ``0`` disables
+            caching (every read goes to the database).
+
+    Example:
+        cache = MenuSnapshotCache(load_items, ttl=300)
+        snapshot = cache.get()
+        cache.invalidate()   # after a write
+    """
+
+    def __init__(self, loader, ttl=300):
+        self._loader = loader
+        self.ttl = ttl
+        self._snapshot = None
+        # ETag and Last-Modified of the most recent build, so a rebuild with
+        # unchanged content (e.g. TTL expiry) keeps its Last-Modified time.
+        self._last_content = (None, None)
+        self._version = 0
+        # Bumped by invalidate(); lets a rebuild that raced with a write
+        # notice that its result is already stale.
+        self._generation = 0
+        self._build_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _is_fresh(self, snapshot):
+        if snapshot is None or self.ttl <= 0:
+            return False
+        return time.monotonic() - snapshot.built_at < self.ttl
+
+    def get(self):
+        """Return the current snapshot, rebuilding it on a miss.
+
+        Only one thread rebuilds at a time; concurrent readers that missed
+        wait for that build instead of all hitting MongoDB.
+
+        Returns:
+            MenuSnapshot: The current menu snapshot.
+        """
+        snapshot = self.peek()
+        if snapshot is not None:
+            return snapshot
+
+        with self._build_lock:
+            snapshot = self.peek()
+            if snapshot is not None:
+                return snapshot
+            generation = self.generation
+            return self.publish(self._loader(), generation)
+
+    def peek(self):
+        """Return the current snapshot if it is still fresh (a hit), else None."""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            self.hits += 1
+            return snapshot
+        return None
+
+    @property
+    def generation(self):
+        """Write counter to read before loading the items for ``publish``."""
+        return self._generation
+
+    def publish(self, items, generation):
+        """Build a snapshot from freshly loaded items and make it current.
+
+        ``get()`` does this with the items from its loader; the ASGI read
+        path (``menu_async.py``) loads them with the async driver instead.
+
+        Args:
+            items (list[dict]): Every menu item in wire format.
+            generation (int): ``generation`` read before loading ``items``;
+                if a write happened since, the snapshot is returned but not
+                kept.
+
+        Returns:
+            MenuSnapshot: The new snapshot.
+        """
+        self.misses += 1
+        with self._state_lock:
+            self._version += 1
+            version = self._version
+        snapshot = MenuSnapshot(version, items)
+        last_etag, last_modified = self._last_content
+        if snapshot.etag == last_etag:
+            snapshot.last_modified = last_modified
+        self._last_content = (snapshot.etag, snapshot.last_modified)
+        with self._state_lock:
+            # Do not publish a snapshot loaded before a concurrent write.
+            if generation == self._generation:
+                self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self):
+        """Drop the current snapshot so the next read reloads the menu."""
+        with self._state_lock:
+            self._generation += 1
+            self._snapshot = None
+            self.invalidations += 1
+
+    def stats(self):
+        """Return cache counters as a JSON-serialisable dict."""
+        snapshot = self._snapshot
+        lookups = self.hits + self.misses
+        return {
+            "version": snapshot.version if snapshot else None,
+            "etag": snapshot.etag if snapshot else None,
+            "items": len(snapshot.items) if snapshot else 0,
+            "age_seconds": round(time.monotonic() - snapshot.built_at, 3) if snapshot else None,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
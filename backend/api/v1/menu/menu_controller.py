@@ -5,28 +5,192 @@ JSON responses with proper HTTP status codes. They are invoked by the
 Flask route functions in ``menu_routes.py``.
 """
 
-from flask import jsonify,request,json
-from .menu_model import list_all_menu_items, get_menu_by_id, add_menu_item, update_menu_item ,delete_menu_item
+import os
+from urllib.parse import urlencode
+
+from flask import Response,request
+from bson import ObjectId
+from .menu_model import menu_cache, serialize_menu_item, query_menu_items, add_menu_item, update_menu_item ,delete_menu_item
+from .menu_model import validate_bulk_operations, bulk_write_menu_items, MenuItem, VersionConflictError
+from mongoengine import ValidationError
+from .menu_model import CATEGORIES, DIETARY_LABELS, WEEKDAYS, WIRE_FIELDS, canonical_allergen, menu_changes_payload
+from .menu_revisions import compact_if_due, start_revision_sequencer
+from .menu_serializer import encode_json
+from .menu_cache import content_etag, item_etag
+from .menu_indexes import index_usage_report
+from .menu_weekdays import weekday_index, today_name, RESTAURANT_TIMEZONE
+from .menu_bitsets import bitset_index
+from .menu_search import search_index, MAX_QUERY_LENGTH
+from .menu_stream import (
+    menu_stream, start_menu_stream, MENU_STREAM_POLL_SECONDS, MENU_STREAM_WSGI, STREAM_HEADERS,
+)
+
+
+# Seconds browsers and proxies may reuse a menu response without
+# revalidating it. The default (0) means "always revalidate", which is
+# cheap thanks to the ETag/304 handling below.
+MENU_HTTP_MAX_AGE = int(os.getenv("MENU_HTTP_MAX_AGE", "0"))
+
+# Largest page a client may request with ?limit=.
+MENU_PAGE_MAX = int(os.getenv("MENU_PAGE_MAX", "500"))
+
+# Largest number of operations accepted by POST /api/v1/menu/bulk.
+MENU_BULK_MAX = int(os.getenv("MENU_BULK_MAX", "1000"))
+
+# Largest number of results GET /api/v1/menu/search may return.
+SEARCH_LIMIT_MAX = int(os.getenv("SEARCH_LIMIT_MAX", "50"))
+
+# Query parameters understood by GET /api/v1/menu. Any of them switches the
+# list route from the cached full snapshot to a MongoDB query.
+LIST_QUERY_PARAMS = ("category", "day", "dietary", "exclude_allergens", "active", "fields", "after", "limit")
+
+# ?day= alone (or with active=true) is answered from the weekday index.
+WEEKDAY_INDEX_PARAMS = {"day", "active"}
+
+
+def json_response(payload, etag, last_modified):
+    """
+    Build a cacheable response from pre-encoded JSON bytes.
+
+    Sets a strong ETag, Last-Modified and Cache-Control. The caller makes it
+    conditional for its request (see ``_json_response``).
+    """
+    response = Response(payload, mimetype="application/json")
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = MENU_HTTP_MAX_AGE
+    response.cache_control.must_revalidate = True
+    return response
+
+
+def _json_response(payload, etag, last_modified):
+    """
+    ``json_response`` for the current request: Werkzeug turns it into
+    ``304 Not Modified`` when the request's If-None-Match /
+    If-Modified-Since validators still match.
+    """
+    return json_response(payload, etag, last_modified).make_conditional(request)
+
+
+def _parse_list_arg(args, name, allowed=None):
+    """Parse a comma-separated query parameter into a lower-case list.
+
+    Raises:
+        ValueError: If a value is not in ``allowed``.
+    """
+    raw = args.get(name)
+    if not raw:
+        return None
+    values = [value.strip().lower() for value in raw.split(",") if value.strip()]
+    if allowed is not None:
+        unknown = [value for value in values if value not in allowed]
+        if unknown:
+            raise ValueError(f"invalid {name}: {', '.join(unknown)}")
+    return values or None
+
+
+def _parse_active(args):
+    """Parse ``?active=`` into True, False or None (absent).
+
+    Raises:
+        ValueError: If the value is not true/false/1/0.
+    """
+    active = args.get("active")
+    if active is not None:
+        if active.lower() not in ("true", "false", "1", "0"):
+            raise ValueError("invalid active: use true or false")
+        active = active.lower() in ("true", "1")
+    return active
+
+
+def parse_list_query(args):
+    """Turn the list route's query string into ``query_menu_items`` kwargs.
+
+    Args:
+        args (MultiDict): The request's query arguments.
+
+    Raises:
+        ValueError: With a client-facing message when a parameter is invalid.
+    """
+    day = args.get("day")
+    if day is not None:
+        day = day.strip().lower()
+        if day not in WEEKDAYS:
+            raise ValueError(f"invalid day: {day}")
+
+    active = _parse_active(args)
+
+    after = args.get("after")
+    if after is not None and not ObjectId.is_valid(after):
+        raise ValueError("invalid after cursor")
+
+    limit = args.get("limit")
+    if limit is not None:
+        if not limit.isdigit() or not 1 <= int(limit) <= MENU_PAGE_MAX:
+            raise ValueError(f"invalid limit: use 1-{MENU_PAGE_MAX}")
+        limit = int(limit)
+
+    fields = _parse_list_arg(args, "fields", allowed=("id",) + WIRE_FIELDS)
+
+    return {
+        "category": _parse_list_arg(args, "category", allowed=CATEGORIES),
+        "day": day,
+        "dietary": _parse_list_arg(args, "dietary", allowed=DIETARY_LABELS),
+        "exclude_allergens": _parse_list_arg(args, "exclude_allergens"),
+        "active": active,
+        "fields": fields,
+        "after": after,
+        "limit": limit,
+    }
+
+
+def uses_weekday_index(query, args):
+    """True when a parsed list query is ``day`` alone or with ``active=true``."""
+    return bool(query["day"]) and query["active"] is not False and set(args) <= WEEKDAY_INDEX_PARAMS
+
+
+def set_next_cursor(response, request, next_cursor):
+    """Add the ``X-Next-Cursor`` and ``Link: rel="next"`` headers of a list page."""
+    if next_cursor:
+        args = request.args.to_dict()
+        args["after"] = next_cursor
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
 
 
 def get_menu():
     """
     Controller: GET /api/v1/menu
     
-    Fetches all menu items from the database and returns them as JSON.
-    Converts MongoDB's _id field to id field for frontend compatibility.
+    Returns all menu items as JSON, served from the in-process menu
+    snapshot (see ``menu_cache.py``). MongoDB is only queried when the
+    snapshot is missing, expired or was invalidated by a write.
+
+    When any of the filter/projection/pagination query parameters is given
+    (``category``, ``day``, ``dietary``, ``exclude_allergens``, ``active``,
+    ``fields``, ``after``, ``limit``) the request is answered by
+    ``query_menu_items`` instead, which pushes them all down into MongoDB.
+    The exception is ``day`` on its own or with ``active=true``: that is
+    read from the in-memory weekday index (see ``menu_weekdays.py``).
+    The cursor for the next page is returned in the ``X-Next-Cursor``
+    header (and a ``Link: <...>; rel="next"`` header).
     
     Process:
-    1. Call model function to get all MenuItem objects from MongoDB
-    2. Convert MongoEngine QuerySet to JSON
-    3. Loop through each item and convert _id.$oid to id (string)
-    4. Return JSON array with HTTP 200 status
+    1. If filter parameters are present, validate them (400 on bad input),
+       then answer ``day`` [+ ``active=true``] from the weekday index, or
+       run the filtered query and return the matching page
+    2. Otherwise get the current menu snapshot from the cache (rebuilt on a miss)
+    3. If the client's If-None-Match/If-Modified-Since still match the
+       snapshot's ETag/Last-Modified, return 304 with no body
+    4. Otherwise return its pre-encoded JSON body (see ``menu_serializer.py``) with HTTP 200
     
     Returns:
-        tuple: (JSON response with all items, HTTP 200)
+        Response: JSON response with all items (200), or 304 when the
+               client's copy is current.
                Response format: [
                    {
-                       "_id": {...},
                        "id": "691211b751476ba3fc35b9f5",
                        "name": "Aurora Bites",
                        "price": 5.50,
@@ -34,51 +198,228 @@ def get_menu():
                    }
                ]
     """
-    items = list_all_menu_items()
-    items_json = json.loads(items.to_json())
-    for item in items_json:
-        item['id'] = str(item['_id']['$oid'])
-    return jsonify(items_json), 200
+    if any(name in request.args for name in LIST_QUERY_PARAMS):
+        try:
+            query = parse_list_query(request.args)
+        except ValueError as e:
+            return {"error": str(e)},400
+
+        if uses_weekday_index(query, request.args):
+            payload, etag = weekday_index.payload(query["day"], active_only=bool(query["active"]))
+            return _json_response(payload, etag, None)
+
+        items, next_cursor = query_menu_items(**query)
+        payload = encode_json(items)
+        response = _json_response(payload, content_etag(payload), None)
+        set_next_cursor(response, request, next_cursor)
+        return response
+
+    snapshot = menu_cache.get()
+    return _json_response(snapshot.payload, snapshot.etag, snapshot.last_modified)
+
+
+def get_today_menu_controller():
+    """
+    Controller: GET /api/v1/menu/today
+
+    Returns the active items served today, "today" being the current
+    weekday in the restaurant's time zone (``RESTAURANT_TIMEZONE``). The
+    list comes from the in-memory weekday index with a cached body and
+    ETag, so no query is made and the menu is not scanned.
+
+    The weekday and time zone are echoed in the ``X-Menu-Day`` and
+    ``X-Menu-Timezone`` headers.
+
+    Returns:
+        Response: JSON list of items (200), or 304 when the client's copy
+               is current.
+    """
+    day = today_name()
+    payload, etag = weekday_index.payload(day)
+    response = _json_response(payload, etag, None)
+    response.headers["X-Menu-Day"] = day
+    response.headers["X-Menu-Timezone"] = RESTAURANT_TIMEZONE
+    return response
+
+
+def get_menu_changes_controller():
+    """
+    Controller: GET /api/v1/menu/changes?since=<rev>
+
+    Returns the items created or updated and the ids deleted after menu
+    revision ``since``, so a client holding the menu applies one small
+    delta instead of downloading it again. Clients start without
+    ``since`` (or with 0), receive the whole menu, and continue from the
+    returned ``rev``. The body is cacheable like the menu list.
+
+    Process:
+    1. Validate ``since`` (a non-negative integer); 400 if invalid
+    2. Compact old tombstones if it is time to (once an hour per process),
+       and make sure this process numbers pending writes
+    3. Read the delta, or the full menu when the delta is not available
+       (see ``menu_changes_since``); recent answers are reused
+    4. Return it with an ETag (304 when the client's copy is current)
+
+    Returns:
+        Response | tuple: JSON body (200 / 304), or (error dict, 400)
+
+    Example responses:
+        Delta (200): {"rev": 42, "full": false, "upserted": [{"id": "...", "price": 7.5, ...}],
+                      "deleted": ["691211b751476ba3fc35b9f6"]}
+        Full (200): {"rev": 42, "full": true, "items": [...]}
+        Error (400): {"error": "since must be a non-negative integer"}
+    """
+    since = request.args.get("since", "0")
+    if not since.isdigit():
+        return {"error": "since must be a non-negative integer"},400
+
+    compact_if_due()
+    start_revision_sequencer()
+    payload, etag = menu_changes_payload(int(since))
+    return _json_response(payload, etag, None)
+
+
+def _parse_allergens(args, name):
+    """Parse a comma-separated allergen parameter into canonical allergen names.
+
+    Raises:
+        ValueError: If an allergen is not recognised.
+    """
+    values = _parse_list_arg(args, name) or []
+    canonical = [canonical_allergen(value) for value in values]
+    unknown = [value for value, known in zip(values, canonical) if known is None]
+    if unknown:
+        raise ValueError(f"invalid {name}: {', '.join(unknown)}")
+    return canonical
+
+
+def filter_menu_controller():
+    """
+    Controller: GET /api/v1/menu/filter
+
+    Combines any dietary / allergen include and exclude conditions, e.g.
+    ``?dietary=vegan&exclude_allergens=nuts,gluten``, and answers them from
+    the in-memory bitset index (see ``menu_bitsets.py``) with a few
+    whole-catalog bitwise operations instead of inspecting every item.
+
+    Allergen names are matched by group, so ``dairy`` and ``milk`` (or
+    ``egg`` and ``eggs``) are the same allergen; ``other`` stands for any
+    allergen outside the 14 EU groups.
+
+    Returns:
+        Response | tuple: JSON list of matching items (200, or 304 when the
+               client's copy is current), or (error dict, 400) on an
+               unknown label, allergen or active value.
+    """
+    args = request.args
+    try:
+        query = {
+            "dietary": _parse_list_arg(args, "dietary", allowed=DIETARY_LABELS) or [],
+            "exclude_dietary": _parse_list_arg(args, "exclude_dietary", allowed=DIETARY_LABELS) or [],
+            "allergens": _parse_allergens(args, "allergens"),
+            "exclude_allergens": _parse_allergens(args, "exclude_allergens"),
+            "active": _parse_active(args),
+        }
+    except ValueError as e:
+        return {"error": str(e)},400
+
+    payload = encode_json(bitset_index.filter(**query))
+    return _json_response(payload, content_etag(payload), None)
+
+
+def _parse_search_args(default_limit):
+    """Read ``q`` and ``limit`` for the search routes.
+
+    Raises:
+        ValueError: If ``q`` is missing/too long or ``limit`` is out of range.
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        raise ValueError("q is required")
+    if len(query) > MAX_QUERY_LENGTH:
+        raise ValueError(f"q is too long (max {MAX_QUERY_LENGTH} characters)")
+    limit = request.args.get("limit", str(default_limit))
+    if not limit.isdigit() or not 1 <= int(limit) <= SEARCH_LIMIT_MAX:
+        raise ValueError(f"invalid limit: use 1-{SEARCH_LIMIT_MAX}")
+    return query, int(limit)
+
+
+def search_menu_controller():
+    """
+    Controller: GET /api/v1/menu/search?q=
+
+    Full-text search over item names, descriptions and ingredients, served
+    from the in-memory inverted index (see ``menu_search.py``). Words are
+    matched case- and accent-insensitively, the last one (still being
+    typed) as a prefix, and an item must match all of them. Results are
+    ranked by relevance, best first.
+
+    Returns:
+        Response | tuple: JSON list of items (200, or 304 when the client's
+               copy is current), or (error dict, 400) on a bad ``q`` / ``limit``.
+    """
+    try:
+        query, limit = _parse_search_args(default_limit=20)
+    except ValueError as e:
+        return {"error": str(e)},400
+
+    payload = encode_json([item for _, item in search_index.search(query, limit)])
+    return _json_response(payload, content_etag(payload), None)
+
+
+def suggest_menu_controller():
+    """
+    Controller: GET /api/v1/menu/search/suggest?q=
+
+    Typeahead: completes the last word of ``q`` with words used on the
+    menu, most common first.
+
+    Returns:
+        tuple: (list of words, 200) or (error dict, 400) on a bad ``q`` / ``limit``.
+    """
+    try:
+        query, limit = _parse_search_args(default_limit=10)
+    except ValueError as e:
+        return {"error": str(e)},400
+
+    return search_index.suggest(query, limit),200
 
 
 def get_menu_item_controller(item_id):
     """
     Controller: GET /api/v1/menu/<item_id>
     
-    Fetches a single menu item by ID and returns it as JSON.
-    Handles errors with appropriate HTTP status codes.
+    Looks up a single menu item by ID in the menu snapshot and returns it
+    as JSON. Handles errors with appropriate HTTP status codes.
     
     Process:
-    1. Try to fetch the item from database by ID
-    2. If fetch fails (malformed ID), return 400 with error message
+    1. Validate the ID; if it is not a valid ObjectId, return 400
+    2. Look the item up in the current menu snapshot
     3. If item not found, return 400 with "not found" message
-    4. Convert _id.$oid to id (string) for frontend
-    5. Return JSON item with HTTP 200 status
+    4. Return 304 if the client's validators match the item's ETag,
+       otherwise the JSON item (already carrying a string id) with HTTP 200
     
     Args:
         item_id (str): The MongoDB ObjectId from the URL (e.g., "691211b751476ba3fc35b9f5")
     
     Returns:
-        tuple: (JSON response, HTTP status code)
-               - (item JSON, 200) if item found
-               - (error dict, 400) if malformed input or not found
+        Response | tuple: The item response (200, or 304 when the client's
+               copy is current), or (error dict, 400) if malformed input or not found
     
     Example responses:
-        Success (200): {"_id": {...}, "id": "...", "name": "Aurora Bites", ...}
+        Success (200): {"id": "...", "name": "Aurora Bites", ...}
         Error (400): {"error": "Item not found"}
     """
-    try:
-        item = get_menu_by_id(item_id)   
-    except:
+    if not ObjectId.is_valid(item_id):
         return {"error":"malformed input"},400
 
-    if not item:
+    snapshot = menu_cache.get()
+    entry = snapshot.item_payload(item_id)
+    if entry is None:
          return {"error": "Item not found"},400
-    
-    item_json = json.loads(item.to_json())
-    item_json["id"]=str(item_json["_id"]["$oid"])
-       
-    return jsonify(item_json),200
+
+    payload, etag = entry
+    return _json_response(payload, etag, snapshot.last_modified)
 
     
 def create_menu_item_controller():
@@ -107,22 +448,57 @@ def create_menu_item_controller():
     
     Returns:
         tuple: (JSON of created item, HTTP 200)
-               Response includes the MongoDB _id assigned by database
+               Response includes the id assigned by the database
     """
     item = add_menu_item(request.get_json())
-    return item.to_json(),200
+    return serialize_menu_item(item),200
+
+def _expected_version(item_id):
+    """Read the expected item version from the If-Match header.
+
+    Accepts the item's ETag (``"<id>-<version>"``, as sent by GET and PUT)
+    or a bare quoted version (``"3"``). Version 0 stands for an item that
+    has never been updated since versions were introduced.
+
+    Returns:
+        int | None: The version, or None when If-Match is absent or ``*``.
+
+    Raises:
+        ValueError: If If-Match is not the ETag of this item or a version number.
+        VersionConflictError: If If-Match only holds weak ETags, which never
+                              match (If-Match uses the strong comparison).
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    tags = request.if_match.as_set()
+    if not tags:
+        raise VersionConflictError("If-Match holds no strong ETag")
+    if len(tags) != 1:
+        raise ValueError(f'If-Match must hold one item ETag, e.g. If-Match: "{item_id}-3"')
+    tag = next(iter(tags))
+    if tag.startswith(f"{item_id}-"):
+        tag = tag[len(item_id) + 1:]
+    if not tag.isdigit():
+        raise ValueError(f'If-Match must hold the item ETag, e.g. If-Match: "{item_id}-3"')
+    return int(tag)
+
 
 def update_menu_item_controller(item_id):
     """
     Controller: PUT /api/v1/menu/<item_id>
     
     Updates an existing menu item with new data from request body.
-    Only provided fields are updated (partial update).
+    Only provided fields are updated (partial update), in one database
+    round trip. Sending the item's ETag (from GET or a previous PUT) in an
+    If-Match header makes the update conditional: it fails with 412 if someone else changed the
+    item in the meantime.
     
     Process:
-    1. Try to find and update the item with new data
-    2. If item not found or error occurs, return 404 with error message
-    3. Return updated item as JSON with HTTP 200
+    1. Read the optional If-Match ETag; if malformed, return 400
+    2. Update the item and get the new document back in one call
+    3. If the data is invalid, return 400; if the item is missing, 404;
+       if the version no longer matches, 412
+    4. Return updated item as JSON with HTTP 200 and its new ETag
     
     Args:
         item_id (str): The MongoDB ObjectId from the URL
@@ -137,18 +513,76 @@ def update_menu_item_controller(item_id):
     Returns:
         tuple: (JSON of updated item, HTTP status code)
                - (item JSON, 200) if successful
-               - (error dict, 404) if item not found or update fails
+               - (error dict, 400) if the body or If-Match header is invalid
+               - (error dict, 404) if item not found
+               - (error dict, 412) if If-Match does not match the current version
+                 (or holds only weak ETags)
     
     Example responses:
-        Success (200): {"_id": {...}, "id": "...", "price": 7.99, "name": "Updated Name", ...}
+        Success (200): {"id": "...", "price": 7.99, "name": "Updated Name", "version": 4, ...}
         Error (404): {"error": "Item not found"}
+        Error (412): {"error": "Item was modified by someone else", "version_expected": 3}
     """
+    if not ObjectId.is_valid(item_id):
+        return {"error": "Item not found"}, 404
+    expected_version = None
     try:
-        item = update_menu_item(item_id,request.get_json())
-        return item.to_json(),200
-    except:
+        expected_version = _expected_version(item_id)
+        item = update_menu_item(item_id,request.get_json(silent=True),expected_version)
+    except (ValueError, ValidationError) as e:
+        return {"error": str(e)}, 400
+    except VersionConflictError:
+        return {"error": "Item was modified by someone else", "version_expected": expected_version}, 412
+    except MenuItem.DoesNotExist:
           return {"error": "Item not found"}, 404
 
+    item = serialize_menu_item(item)
+    return item,200,{"ETag": f'"{item_etag(item)}"'}
+
+def bulk_menu_items_controller():
+    """
+    Controller: POST /api/v1/menu/bulk
+
+    Applies a batch of create, update and delete operations with a single
+    ``bulk_write`` instead of one request (and one round trip) per item.
+
+    Process:
+    1. Check the body is a non-empty array of at most MENU_BULK_MAX operations
+    2. Validate every operation up front; if any is invalid, return 400
+       listing the errors and write nothing
+    3. Run the batch in one bulk_write (see ``bulk_write_menu_items``)
+    4. Return per-operation results with HTTP 200
+
+    Request body example:
+        [
+            {"op": "create", "data": {"name": "Birch Latte", "price": 3.75, "category": "drink"}},
+            {"op": "update", "id": "691211b751476ba3fc35b9f5", "data": {"price": 7.99}},
+            {"op": "delete", "id": "691b7569f13b2b3f70dee895"}
+        ]
+
+    Returns:
+        tuple: (response dict, HTTP status code)
+               - (per-operation results and counts, 200) when the batch ran
+               - ({"error": ..., "errors": [...]}, 400) if validation failed
+
+    Example responses:
+        Success (200): {"results": [{"index": 0, "op": "create", "id": "...", "status": "created"}, ...],
+                        "created": 1, "updated": 1, "deleted": 0, "failed": 1}
+        Error (400): {"error": "invalid operations", "errors": [{"index": 1, "error": "malformed id"}]}
+    """
+    operations = request.get_json(silent=True)
+    if not isinstance(operations, list) or not operations:
+        return {"error": "body must be a non-empty array of operations"},400
+    if len(operations) > MENU_BULK_MAX:
+        return {"error": f"too many operations (max {MENU_BULK_MAX})"},400
+
+    prepared, errors = validate_bulk_operations(operations)
+    if errors:
+        return {"error": "invalid operations", "errors": errors},400
+
+    return bulk_write_menu_items(prepared),200
+
+
 def delete_menu_item_controller(item_id):
     """
     Controller: DELETE /api/v1/menu/<item_id>
@@ -172,8 +606,70 @@ def delete_menu_item_controller(item_id):
         Success (200): {"message": "Item deleted successfully"}
         Error (404): {"error": "Item not found"}
     """
+    if not ObjectId.is_valid(item_id):
+        return {"error":"Item not found"},404
     try:
         result = delete_menu_item(item_id)
         return result,200
-    except:
-        return {"error":"Item not found"},404
\ No newline at end of file
+    except MenuItem.DoesNotExist:
+        return {"error":"Item not found"},404
+
+
+def stream_menu_controller():
+    """
+    Controller: GET /api/v1/menu/stream
+
+    Server-Sent Events of menu changes (see ``menu_stream.py``). A
+    browser that reconnects sends Last-Event-ID and receives the changes
+    it missed, or a ``reset`` event.
+
+    Only reached under WSGI (``asgi.py`` serves this path itself), where
+    an open stream would hold a worker thread. So unless
+    MENU_STREAM_WSGI=hold, the response carries the missed changes and a
+    ``retry:`` of MENU_STREAM_POLL_SECONDS, and ends.
+
+    Returns:
+        Response | tuple: the ``text/event-stream`` response, or
+               (error dict, 503, Retry-After) when this process already
+               holds MENU_STREAM_MAX_CLIENTS streams
+    """
+    last_event_id = request.headers.get("Last-Event-ID")
+    start_menu_stream()
+    if MENU_STREAM_WSGI != "hold":
+        body = menu_stream.poll(last_event_id, int(MENU_STREAM_POLL_SECONDS * 1000))
+    elif not menu_stream.accepting():
+        return {"error": "Too many open menu streams"},503,{"Retry-After": "5"}
+    else:
+        body = menu_stream.stream(last_event_id)
+    response = Response(body, mimetype="text/event-stream")
+    response.headers.update(STREAM_HEADERS)
+    return response
+
+
+def get_menu_cache_stats_controller():
+    """
+    Controller: GET /api/v1/menu/cache/stats
+
+    Returns the menu snapshot cache counters (hits, misses, invalidations,
+    current version and age) for monitoring, plus the weekday index's
+    per-day item counts and the weekday, bitset and search indexes'
+    rebuild/patch counters and the change stream's open connections.
+
+    Returns:
+        tuple: (stats dict, HTTP 200)
+    """
+    return {**menu_cache.stats(), "weekday_index": weekday_index.stats(), "bitset_index": bitset_index.stats(),
+            "search_index": search_index.stats(), "stream": menu_stream.stats()},200
+
+
+def get_menu_index_report_controller():
+    """
+    Controller: GET /api/v1/menu/admin/indexes
+
+    Runs ``explain()`` on every query shape used by the menu list route and
+    reports which ones are served by an index (see ``menu_indexes.py``).
+
+    Returns:
+        tuple: (report dict, HTTP 200)
+    """
+    return index_usage_report(),200
@@ -0,0 +1,62 @@
+"""In-process notifications of menu writes.
+
+The write helpers in ``menu_model.py`` publish one ``MenuChange`` per item
+they create, update or delete, after the write reached MongoDB. In-memory
+indexes subscribe to keep themselves current without reloading the whole
+menu::
+
+    from .menu_events import subscribe
+
+    def on_change(change):
+        if change.op == "delete":
+            forget(change.item_id)
+        else:
+            remember(change.item)
+
+    subscribe(on_change)
+
+Listeners run synchronously in the writing thread, so they must be quick
+and must not raise (exceptions are logged and swallowed, a failing index
+must not fail the write). Only writes made by this process are seen;
+indexes still need a TTL-style rebuild to pick up other workers' writes.
+"""
+
+import logging
+import threading
+from collections import namedtuple
+
+
+# op: "create" | "update" | "delete"
+# item_id: string id of the item
+# item: the item in wire format after the write (None for deletes)
+# fields: names of the fields an update set (None: unknown, treat all as changed)
+MenuChange = namedtuple("MenuChange", ["op", "item_id", "item", "fields"], defaults=(None,))
+
+logger = logging.getLogger(__name__)
+
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def subscribe(listener):
+    """Call ``listener(change)`` for every menu write made by this process."""
+    with _listeners_lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+    return listener
+
+
+def unsubscribe(listener):
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def publish(op, item_id, item=None, fields=None):
+    """Notify every listener of one item change."""
+    change = MenuChange(op, str(item_id), item, tuple(fields) if fields is not None else None)
+    for listener in tuple(_listeners):
+        try:
+            listener(change)
+        except Exception:
+            logger.exception("menu change listener %r failed", listener)
@@ -0,0 +1,113 @@
+"""Index management and index-usage report for the menu collection.
+
+- ``ensure_menu_indexes()`` creates the indexes declared in
+  ``MenuItem.meta`` (called once per process by ``init_database`` in
+  ``app.py``, on the first request that uses MongoDB).
+- ``index_usage_report()`` runs ``explain()`` on every query shape the
+  API issues (see ``build_menu_query`` in ``menu_model.py``) and reports
+  whether the winning plan uses an index or scans the whole collection.
+
+The report is served at ``GET /api/v1/menu/admin/indexes`` and can also be
+printed from the command line (from the ``backend`` folder)::
+
+    python -m api.v1.menu.menu_indexes
+"""
+
+import json
+
+from bson import ObjectId
+
+from .menu_model import MenuItem, build_menu_query
+from .menu_revisions import MenuTombstone
+
+
+# Query shapes issued by GET /api/v1/menu, as build_menu_query() kwargs.
+# Sample values only need to have the right type; the plan depends on the
+# shape of the query, not on the values.
+QUERY_SHAPES = {
+    "active+category": {"active": True, "category": ["main"]},
+    "category": {"category": ["starter", "dessert"]},
+    "day": {"day": "monday"},
+    "dietary": {"dietary": ["vegan", "gluten-free"]},
+    "exclude_allergens": {"exclude_allergens": ["nuts"]},
+    "day+active+exclude_allergens": {"day": "friday", "active": True, "exclude_allergens": ["gluten"]},
+    "cursor page": {"after": str(ObjectId())},
+}
+
+
+def ensure_menu_indexes():
+    """Create the indexes declared in ``MenuItem.meta`` (and the tombstones') if they are missing."""
+    MenuItem.ensure_indexes()
+    MenuTombstone.ensure_indexes()
+
+
+def _plan_stages(plan):
+    """Flatten a winning plan tree into (stage, index_name) pairs, root first."""
+    stages = []
+    pending = [plan]
+    while pending:
+        node = pending.pop()
+        if not isinstance(node, dict):
+            continue
+        if "stage" in node:
+            stages.append((node["stage"], node.get("indexName")))
+        # Classic plans nest through inputStage(s); SBE plans wrap the tree
+        # in queryPlan.
+        pending.extend(node.get("inputStages", []))
+        for key in ("inputStage", "queryPlan"):
+            if key in node:
+                pending.append(node[key])
+    return stages
+
+
+def explain_query_shape(query):
+    """
+    Explain one query shape.
+
+    Args:
+        query (dict): ``build_menu_query`` keyword arguments.
+
+    Returns:
+        dict: ``{"stages": [...], "indexes": [...], "uses_index": bool,
+                 "collection_scan": bool, "in_memory_sort": bool}``
+    """
+    explain = build_menu_query(**query).explain()
+    stages = _plan_stages(explain["queryPlanner"]["winningPlan"])
+    names = [stage for stage, _ in stages]
+    return {
+        "stages": names,
+        "indexes": sorted({index for _, index in stages if index}),
+        "uses_index": any(stage in ("IXSCAN", "IDHACK", "EXPRESS_IXSCAN") for stage in names),
+        "collection_scan": "COLLSCAN" in names,
+        "in_memory_sort": "SORT" in names,
+    }
+
+
+def index_usage_report():
+    """
+    Explain every known query shape against the live collection.
+
+    Returns:
+        dict: ``{"indexes": [<index names>], "queries": {<shape>: <explain summary>}}``.
+              A shape whose explain failed carries an ``error`` message instead.
+    """
+    report = {
+        "indexes": sorted(MenuItem._get_collection().index_information()),
+        "queries": {},
+    }
+    for name, query in QUERY_SHAPES.items():
+        try:
+            report["queries"][name] = {"query": query, **explain_query_shape(query)}
+        except Exception as e:
+            report["queries"][name] = {"query": query, "error": str(e)}
+    return report
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from api.utils.db import mongo_connect
+
+    load_dotenv()
+    mongo_connect()
+    ensure_menu_indexes()
+    print(json.dumps(index_usage_report(), indent=2))
@@ -1,214 +1,132 @@
-"""Mock menu model for the API.
+"""MongoEngine model and data access for the menu API.
 
-This module provides in-memory mock data for development and two
-small helper functions used by the controllers:
+``MenuItem`` is the menu collection. The helpers below are used by the
+controllers and keep the in-process derived state up to date:
 
-- list_all_menu_items() -> list[dict]
-- get_menu_by_id(item_id: int) -> dict|None
-
-The dataset is intentionally small and self-contained so the project can
-run without a database during development and testing.
+- list/query/filter helpers for the read endpoints,
+- add/update/delete and bulk writes, each left for a menu revision
+  (``menu_revisions.py``) and announced through ``menu_events``,
+- ``menu_cache``, the snapshot behind ``GET /api/v1/menu/``,
+- ``menu_changes_since`` for ``GET /api/v1/menu/changes``.
 """
-from mongoengine import Document , StringField, FloatField, ListField, BooleanField
+import os
+import threading
+from collections import OrderedDict
+
+from mongoengine import Document , StringField, FloatField, ListField, BooleanField, IntField, ValidationError
 from bson import ObjectId
-# Mock data (16 items) for Revontulet Flamehouse
+from pymongo import InsertOne, UpdateOne, DeleteOne, ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from .menu_cache import MenuSnapshotCache, content_etag
+from .menu_events import publish
+from .menu_revisions import PENDING, record_tombstones, revision_state, revisions_pending
+from .menu_revisions import MenuTombstone
+from .menu_serializer import encode_json, project_item
+
+CATEGORIES = ["starter","main","dessert","side","drink","special"]
+DIETARY_LABELS = ["vegetarian","vegan","gluten-free","dairy-free","pescatarian"]
+WEEKDAYS = ["monday","tuesday","wednesday","thursday","friday","saturday","sunday"]
+
+# Allergens are free text, so they are mapped onto the 14 EU allergen
+# groups (plus the spellings found in the data) to get a fixed bit per
+# allergen. Anything else sets OTHER_ALLERGEN.
+ALLERGENS = ["gluten","crustaceans","egg","fish","peanuts","soy","milk","nuts",
+             "celery","mustard","sesame","sulphites","lupin","molluscs"]
+ALLERGEN_ALIASES = {"eggs":"egg","dairy":"milk","lactose":"milk","tree nuts":"nuts","peanut":"peanuts",
+                    "soya":"soy","sulfites":"sulphites","shellfish":"crustaceans","wheat":"gluten"}
+OTHER_ALLERGEN = "other"
+
+DIETARY_BITS = {label: 1 << bit for bit, label in enumerate(DIETARY_LABELS)}
+ALLERGEN_BITS = {label: 1 << bit for bit, label in enumerate(ALLERGENS + [OTHER_ALLERGEN])}
+
+
+def canonical_allergen(name):
+    """Map an allergen as written ("Dairy", "eggs") to its ALLERGENS name, or None."""
+    name = name.strip().lower()
+    name = ALLERGEN_ALIASES.get(name, name)
+    return name if name in ALLERGEN_BITS else None
+
+
+def dietary_mask(labels):
+    """Bitmask of dietary labels (bit i = DIETARY_LABELS[i]); unknown labels are ignored."""
+    mask = 0
+    for label in labels or ():
+        mask |= DIETARY_BITS.get(str(label).lower(), 0)
+    return mask
+
+
+def allergen_mask(allergens):
+    """Bitmask of allergens (bit i = ALLERGENS[i]); unrecognised names set the "other" bit."""
+    mask = 0
+    for name in allergens or ():
+        mask |= ALLERGEN_BITS[canonical_allergen(str(name)) or OTHER_ALLERGEN]
+    return mask
+
 
 class MenuItem(Document):
     
     name =  StringField (required = True)
     description= StringField()
     price = FloatField()
-    category = StringField(required = True, choices = ["starter","main","dessert","side","drink","special"])
+    category = StringField(required = True, choices = CATEGORIES)
     image = StringField()
-    dietary = ListField(StringField(choices =["vegetarian","vegan","gluten-free","dairy-free","pescatarian"]))
+    dietary = ListField(StringField(choices = DIETARY_LABELS))
     allergens = ListField(StringField())
     # Simple ingredients list (strings). Kept optional for backward compatibility.
     ingredients = ListField(StringField())
     days_of_week = ListField(StringField())
     active = BooleanField()
-    
-    
-"""
-menu_items = [
-    {
-        "id": 1,
-        "name": "Aurora Bites",
-        "description": "Crispy potato bites tossed in northern spice, served with cool dill sauce.",
-        "price": 5.50,
-        "category": "starter",
-        "image": "https://via.placeholder.com/480x320?text=Aurora+Bites",
-        "dietary": ["vegetarian"],
-        "allergens": ["milk"],
-        "available_days": ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
-    },
-    {
-        "id": 2,
-        "name": "Nordic Salmon Skewers",
-        "description": "Grilled salmon skewers with lemon-herb glaze and a side of dill mayo.",
-        "price": 9.75,
-        "category": "starter",
-        "image": "https://via.placeholder.com/480x320?text=Nordic+Salmon+Skewers",
-        "dietary": [],
-        "allergens": ["fish"],
-        "available_days": ["Friday","Saturday","Sunday"]
-    },
-    {
-        "id": 3,
-        "name": "Smoked Trout Salad",
-        "description": "Mixed leaves, smoked trout flakes, pickled cucumber and horseradish cream.",
-        "price": 8.95,
-        "category": "starter",
-        "image": "https://via.placeholder.com/480x320?text=Smoked+Trout+Salad",
-        "dietary": [],
-        "allergens": ["fish","dairy"],
-        "available_days": ["Friday","Saturday"]
-    },
-    {
-        "id": 4,
-        "name": "Reindeer Stew",
-        "description": "Slow-cooked reindeer with root vegetables and lingonberry jus.",
-        "price": 14.50,
-        "category": "main",
-        "image": "https://via.placeholder.com/480x320?text=Reindeer+Stew",
-        "dietary": [],
-        "allergens": [],
-        "available_days": ["Monday","Tuesday","Wednesday","Thursday","Friday"]
-    },
-    {
-        "id": 5,
-        "name": "Arctic Garden Bowl",
-        "description": "Warm grain bowl with roasted squash, kale, chickpeas and tahini dressing.",
-        "price": 12.00,
-        "category": "main",
-        "image": "https://via.placeholder.com/480x320?text=Arctic+Garden+Bowl",
-        "dietary": ["vegan","gluten-free"],
-        "allergens": ["sesame"],
-        "available_days": ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday"]
-    },
-    {
-        "id": 6,
-        "name": "Firewood Salmon",
-        "description": "Oak-smoked salmon fillet, buttered new potatoes and seasonal greens.",
-        "price": 16.50,
-        "category": "main",
-        "image": "https://via.placeholder.com/480x320?text=Firewood+Salmon",
-        "dietary": [],
-        "allergens": ["fish","dairy"],
-        "available_days": ["Saturday","Sunday"]
-    },
-    {
-        "id": 7,
-        "name": "Midnight Burger",
-        "description": "Grass-fed beef patty, melted cheese, caramelized onions and truffle mayo. Served with fries.",
-        "price": 13.25,
-        "category": "main",
-        "image": "https://via.placeholder.com/480x320?text=Midnight+Burger",
-        "dietary": [],
-        "allergens": ["gluten","dairy","eggs"],
-        "available_days": ["Monday","Tuesday","Wednesday","Thursday","Friday"]
-    },
-    {
-        "id": 8,
-        "name": "Fjord Falafel Wrap",
-        "description": "Crispy falafel, pickled slaw and herb yogurt in a soft wrap.",
-        "price": 9.00,
-        "category": "main",
-        "image": "https://via.placeholder.com/480x320?text=Fjord+Falafel+Wrap",
-        "dietary": ["vegetarian"],
-        "allergens": ["gluten","sesame","dairy"],
-        "available_days": ["Wednesday","Thursday","Friday","Saturday"]
-    },
-    {
-        "id": 9,
-        "name": "Glazed Lingon Pancakes",
-        "description": "Light pancakes topped with lingonberry compote and whipped cream.",
-        "price": 6.25,
-        "category": "dessert",
-        "image": "https://via.placeholder.com/480x320?text=Glazed+Lingon+Pancakes",
-        "dietary": ["vegetarian"],
-        "allergens": ["gluten","eggs","dairy"],
-        "available_days": ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
-    },
-    {
-        "id": 10,
-        "name": "Northern Lights Cheesecake",
-        "description": "Velvety cheesecake with a citrus glaze and berry dust.",
-        "price": 6.75,
-        "category": "dessert",
-        "image": "https://via.placeholder.com/480x320?text=Northern+Lights+Cheesecake",
-        "dietary": ["vegetarian"],
-        "allergens": ["dairy","eggs","gluten"],
-        "available_days": ["Friday","Saturday","Sunday"]
-    },
-    {
-        "id": 11,
-        "name": "Crispy Fries",
-        "description": "Hand-cut fries tossed with sea salt.",
-        "price": 3.50,
-        "category": "side",
-        "image": "https://via.placeholder.com/480x320?text=Crispy+Fries",
-        "dietary": ["vegan"],
-        "allergens": [],
-        "available_days": ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
-    },
-    {
-        "id": 12,
-        "name": "Midnight Berry Parfait",
-        "description": "Layers of yogurt, granola and midnight berries.",
-        "price": 5.95,
-        "category": "dessert",
-        "image": "https://via.placeholder.com/480x320?text=Midnight+Berry+Parfait",
-        "dietary": ["vegetarian"],
-        "allergens": ["nuts","dairy","gluten"],
-        "available_days": ["Friday","Saturday"]
-    },
-    {
-        "id": 13,
-        "name": "Cloudberry Spritz",
-        "description": "Refreshing cloudberry soda with a hint of lemon.",
-        "price": 3.50,
-        "category": "drink",
-        "image": "https://via.placeholder.com/480x320?text=Cloudberry+Spritz",
-        "dietary": ["vegan"],
-        "allergens": [],
-        "available_days": ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
-    },
-    {
-        "id": 14,
-        "name": "Birch Latte",
-        "description": "Warm birch-infused latte (decaf option available).",
-        "price": 3.00,
-        "category": "drink",
-        "image": "https://via.placeholder.com/480x320?text=Birch+Latte",
-        "dietary": ["vegetarian"],
-        "allergens": ["dairy"],
-        "available_days": ["Monday","Tuesday","Wednesday","Thursday","Friday"]
-    },
-    {
-        "id": 15,
-        "name": "Sparkling Sea Tonic",
-        "description": "Herbal sparkling tonic with sea-salt rim and citrus twist.",
-        "price": 4.25,
-        "category": "drink",
-        "image": "https://via.placeholder.com/480x320?text=Sparkling+Sea+Tonic",
-        "dietary": ["vegan"],
-        "allergens": [],
-        "available_days": ["Monday","Tuesday","Wednesday","Thursday","Friday"]
-    },
-    {
-        "id": 16,
-        "name": "Chef's Northern Special",
-        "description": "Rotating chef special — ask for today's creation.",
-        "price": 17.50,
-        "category": "special",
-        "image": "https://via.placeholder.com/480x320?text=Chefs+Northern+Special",
-        "dietary": [],
-        "allergens": [],
-        "available_days": ["Saturday"]
+    # Bumped by every update; part of the item ETag that clients send back
+    # in If-Match for optimistic concurrency (see update_menu_item). Missing
+    # on items stored before versions existed, which count as version 0.
+    version = IntField(default=1)
+    # dietary / allergens as bitmasks (see dietary_mask, allergen_mask),
+    # kept in sync by clean() and _validate_changes(); not sent to clients.
+    dietary_mask = IntField(default=0)
+    allergen_mask = IntField(default=0)
+    # Menu-wide revision of the item's last write (see menu_revisions.py);
+    # PENDING until numbered, 0 for items written before revisions existed.
+    rev = IntField(default=0)
+
+    # Indexes for the filtered list queries in query_menu_items(). Each one
+    # ends with _id so the cursor pagination sort (order_by("id")) is served
+    # by the same index instead of an in-memory SORT stage. The array fields
+    # get one (multikey) index each: MongoDB cannot index two arrays in one
+    # compound index. Created by ensure_menu_indexes() (see menu_indexes.py).
+    meta = {
+        "indexes": [
+            {"fields": ["active", "category", "id"], "name": "active_category"},
+            {"fields": ["days_of_week", "id"], "name": "days_of_week"},
+            {"fields": ["dietary", "id"], "name": "dietary"},
+            {"fields": ["allergens", "id"], "name": "allergens"},
+            # GET /api/v1/menu/changes
+            {"fields": ["rev"], "name": "rev"},
+        ],
     }
-]
 
-"""
+    def clean(self):
+        """Recompute the stored masks; runs on every validate()/save()."""
+        self.dietary_mask = dietary_mask(self.dietary)
+        self.allergen_mask = allergen_mask(self.allergens)
+
+
+# Derived fields the server maintains and keeps out of API responses.
+INTERNAL_FIELDS = ("dietary_mask", "allergen_mask", "rev")
+
+# Document fields in the order they appear in API responses (``id`` is
+# added separately by the serializer).
+WIRE_FIELDS = tuple(name for name in MenuItem._fields_ordered if name != "id" and name not in INTERNAL_FIELDS)
+
+# Fields a client may change through PUT /api/v1/menu/<id> or a bulk
+# update. ``version`` is maintained by the server.
+UPDATABLE_FIELDS = tuple(name for name in WIRE_FIELDS if name != "version")
+
+
+class VersionConflictError(Exception):
+    """Raised when an update's expected version does not match the stored one."""
+
+
 def list_all_menu_items():
     """
     Retrieve all menu items from the MongoDB database.
@@ -229,6 +147,206 @@ def list_all_menu_items():
     return MenuItem.objects()
 
 
+def query_menu_items(category=None, day=None, dietary=None, exclude_allergens=None,
+                     active=None, fields=None, after=None, limit=None):
+    """
+    Query menu items with filters, projection and cursor pagination.
+
+    Every filter is pushed down into the MongoDB query; nothing is filtered
+    in Python. Results are ordered by ``_id`` so the last returned id can be
+    used as the cursor for the next page.
+
+    Args:
+        category (list[str] | None): Keep items in any of these categories.
+        day (str | None): Lower-case weekday name; keep items served that day.
+                          Matches both "monday" and "Monday" as stored.
+        dietary (list[str] | None): Keep items carrying ALL of these labels.
+        exclude_allergens (list[str] | None): Drop items containing ANY of these.
+        active (bool | None): Keep only active (True) or inactive (False) items.
+        fields (list[str] | None): Fields to return (``id`` is always returned).
+        after (str | None): Cursor; only return items with ``_id`` greater than it.
+        limit (int | None): Page size. ``None`` returns every match.
+
+    Returns:
+        tuple: (items, next_cursor)
+               - items (list[dict]): matching items in wire format
+               - next_cursor (str | None): pass as ``after`` to get the next
+                 page, or None when there are no more results
+
+    Example:
+        items, cursor = query_menu_items(category=["main"], day="friday", limit=20)
+    """
+    next_cursor = None
+    queryset = build_menu_query(category, day, dietary, exclude_allergens, active, after)
+    projected = WIRE_FIELDS
+    if fields:
+        projected = tuple(name for name in WIRE_FIELDS if name in fields)
+        queryset = queryset.only(*projected)
+    if limit:
+        # Fetch one extra document to know whether another page exists.
+        queryset = queryset.limit(limit + 1)
+
+    items = [project_item(raw, projected) for raw in queryset.as_pymongo()]
+    if limit and len(items) > limit:
+        items = items[:limit]
+        next_cursor = items[-1]["id"]
+    return items, next_cursor
+
+
+def build_menu_query(category=None, day=None, dietary=None, exclude_allergens=None,
+                     active=None, after=None):
+    """
+    Build the MongoEngine QuerySet behind ``query_menu_items``.
+
+    Kept separate so the index report (``menu_indexes.py``) can ``explain()``
+    exactly the queries the API runs. Arguments are the same as for
+    ``query_menu_items``.
+
+    Returns:
+        QuerySet: Filtered MenuItem QuerySet ordered by ``_id``.
+    """
+    query = menu_filter(category, day, dietary, exclude_allergens, active, after)
+    return MenuItem.objects(__raw__=query).order_by("id")
+
+
+def menu_filter(category=None, day=None, dietary=None, exclude_allergens=None,
+                active=None, after=None):
+    """
+    Return the raw MongoDB filter document for the list query's filters.
+
+    Shared by ``build_menu_query`` and the async read path
+    (``menu_async.py``) so both run the same query. Arguments are the same as for
+    ``query_menu_items``.
+
+    Returns:
+        dict: e.g. ``{"category": {"$in": ["main"]}, "active": True}``
+    """
+    query = {}
+    if category:
+        query["category"] = {"$in": category}
+    if day:
+        query["days_of_week"] = {"$in": [day, day.capitalize()]}
+    if dietary:
+        query["dietary"] = {"$all": dietary}
+    if exclude_allergens:
+        query["allergens"] = {"$nin": exclude_allergens}
+    if active is not None:
+        query["active"] = active
+    if after:
+        query["_id"] = {"$gt": ObjectId(after)}
+    return query
+
+
+def _load_menu_items():
+    """
+    Load every menu item in API format for the snapshot cache.
+
+    Reads raw documents with ``as_pymongo()`` (no MongoEngine object
+    construction) and projects them straight into the wire format, with
+    ``id`` as a plain string.
+
+    Returns:
+        list[dict]: All menu items, each with an ``id`` string field.
+    """
+    return [project_item(raw, WIRE_FIELDS) for raw in list_all_menu_items().as_pymongo()]
+
+
+def menu_changes_since(since, state=None):
+    """
+    Return what changed on the menu after revision ``since``.
+
+    Only revisions up to the settled one are included (see
+    ``menu_revisions.py``), so a client that continues from the returned
+    ``rev`` never skips a write that was still in flight. Without a
+    usable ``since`` (missing, 0, older than the compacted tombstones, or
+    newer than this database has) the whole menu is returned instead.
+
+    Args:
+        since (int | None): The ``rev`` of the client's last sync.
+        state (dict | None): ``revision_state()``, if already read.
+
+    Returns:
+        dict: ``{"rev", "full": False, "upserted": [items], "deleted": [ids]}``
+              or ``{"rev", "full": True, "items": [items]}``.
+    """
+    state = state or revision_state()
+    rev = state["settled"]
+    if _needs_full_menu(since, state):
+        # Read from MongoDB, not the snapshot cache: the snapshot may be
+        # older than ``rev``.
+        return {"rev": rev, "full": True, "items": _load_menu_items()}
+
+    window = {"rev": {"$gt": since, "$lte": rev}}
+    upserted = [project_item(raw, WIRE_FIELDS) for raw in MenuItem._get_collection().find(window)]
+    deleted = [str(raw["_id"]) for raw in MenuTombstone._get_collection().find(window, {"_id": 1})]
+    return {"rev": rev, "full": False, "upserted": upserted, "deleted": deleted}
+
+
+def _needs_full_menu(since, state):
+    return not since or since < state["compacted"] or since > state["settled"]
+
+
+# Encoded /api/v1/menu/changes bodies by (since, settled, compacted
+# revision). After a write every client at the previous revision asks
+# for the same delta. No invalidation is needed: a later write moves the
+# settled revision and so the key, and an older body stays a correct
+# delta to continue from.
+MENU_CHANGES_CACHE_SIZE = int(os.getenv("MENU_CHANGES_CACHE_SIZE", "64"))
+_changes_cache = OrderedDict()
+_changes_cache_lock = threading.Lock()
+
+
+def menu_changes_payload(since):
+    """
+    ``menu_changes_since`` as JSON bytes plus their ETag, reusing recent answers.
+
+    Costs one read of the revision counter when the answer is cached.
+
+    Returns:
+        tuple: ``(payload bytes, etag)``
+    """
+    state = revision_state()
+    key = (None if _needs_full_menu(since, state) else since, state["settled"], state["compacted"])
+    with _changes_cache_lock:
+        cached = _changes_cache.get(key)
+        if cached is not None:
+            _changes_cache.move_to_end(key)
+            return cached
+
+    payload = encode_json(menu_changes_since(since, state))
+    entry = (payload, content_etag(payload))
+    with _changes_cache_lock:
+        _changes_cache[key] = entry
+        while len(_changes_cache) > MENU_CHANGES_CACHE_SIZE:
+            _changes_cache.popitem(last=False)
+    return entry
+
+
+def serialize_menu_item(item):
+    """
+    Convert a MenuItem document into the API wire format.
+
+    Args:
+        item (MenuItem): A saved menu item.
+
+    Returns:
+        dict: ``{"id": "<ObjectId string>", "name": ..., ...}``
+    """
+    return project_item(item.to_mongo(), WIRE_FIELDS)
+
+
+# Process-wide menu snapshot. Reads are served from memory; every write
+# helper below invalidates it. MENU_CACHE_TTL (seconds) bounds staleness
+# for writes done by other worker processes; 0 disables the cache.
+menu_cache = MenuSnapshotCache(_load_menu_items, ttl=float(os.getenv("MENU_CACHE_TTL", "300")))
+
+
+def _menu_changed(op, item_id, raw=None, fields=None):
+    """Invalidate the snapshot and tell ``menu_events`` listeners about one write."""
+    menu_cache.invalidate()
+    publish(op, item_id, project_item(raw, WIRE_FIELDS) if raw is not None else None, fields)
+
+
 def get_menu_by_id(item_id):
     """
     Find a single menu item by its MongoDB ObjectId.
@@ -288,7 +406,18 @@ def add_menu_item(item_data):
         new_item = add_menu_item(data)
         print(new_item.id)  # MongoDB ObjectId
     """
-    new_item = MenuItem(
+    new_item = _new_menu_item(item_data)
+    new_item.validate()
+    new_item.rev = PENDING
+    new_item.save()
+    revisions_pending()
+    _menu_changed("create", new_item.id, new_item.to_mongo())
+    return new_item
+
+
+def _new_menu_item(item_data):
+    """Build an unsaved MenuItem from request data, applying field defaults."""
+    return MenuItem(
         name = item_data.get('name'),
         description = item_data.get('description'),
         price = item_data.get('price'),
@@ -301,45 +430,72 @@ def add_menu_item(item_data):
         active = item_data.get('active',True)
         
     )
-    new_item.save()
-    return new_item
 
-def update_menu_item(item_id,item_data):
+def update_menu_item(item_id,item_data,expected_version=None):
     """
     Update an existing menu item with new data.
     
-    Finds the item by ID and updates only the fields provided in item_data.
-    Uses MongoEngine's .update(**item_data) which performs a partial update
-    (only specified fields are changed, others remain unchanged).
+    Only the fields provided in item_data are changed (partial update), and
+    only fields listed in UPDATABLE_FIELDS are accepted. The whole update is
+    a single ``find_one_and_update`` round trip that also bumps the item's
+    ``version``, marks the item for a new menu revision (numbered off the
+    request path, see ``menu_revisions.py``) and returns the document as
+    it is after the update.
     
     Args:
         item_id (str): The MongoDB ObjectId as a string
         item_data (dict): Dictionary of fields to update (e.g., {"price": 12.99})
+        expected_version (int | None): When given, the update only applies if
+                                       the stored ``version`` still equals it
+                                       (optimistic concurrency, from If-Match);
+                                       0 means "has no version yet".
     
     Returns:
         MenuItem: The updated MenuItem object.
     
     Raises:
+        ValueError / ValidationError: If item_data is empty, names a field that
+                                      cannot be updated or has an invalid value.
         DoesNotExist: If no item with that ID exists (caught by controller).
+        VersionConflictError: If expected_version no longer matches.
     
     Example:
         update_data = {"price": 12.99, "name": "Updated Name"}
-        updated_item = update_menu_item("691211b751476ba3fc35b9f5", update_data)
+        updated_item = update_menu_item("691211b751476ba3fc35b9f5", update_data, expected_version=3)
     """
-    # FIX: Added ObjectId() conversion for item_id
-    # ISSUE: String ID must be converted to MongoDB ObjectId for database query
-    item = MenuItem.objects.get(id=ObjectId(item_id))
-    item.update(**item_data)
-    # FIX: Re-fetch the updated item before returning
-    # ISSUE: .update() doesn't return the updated document, so we fetch it again
-    # to ensure the response contains the latest data
-    return MenuItem.objects.get(id=ObjectId(item_id))
+    if not isinstance(item_data, dict) or not item_data:
+        raise ValueError("update needs a non-empty JSON object")
+    changes = _validate_changes(item_data)
+
+    query = {"_id": ObjectId(item_id)}
+    if expected_version == 0:
+        # Stored before versions existed; ``$inc`` below starts it at 1.
+        query["version"] = {"$exists": False}
+    elif expected_version is not None:
+        query["version"] = expected_version
+
+    raw = MenuItem._get_collection().find_one_and_update(
+        query,
+        {"$set": {**changes, "rev": PENDING}, "$inc": {"version": 1}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if raw is None:
+        # Only the failure path pays for a second lookup, to tell the two
+        # cases apart.
+        if expected_version is not None and MenuItem.objects(id=query["_id"]).only("id").first():
+            raise VersionConflictError(f"item {item_id} is no longer at version {expected_version}")
+        raise MenuItem.DoesNotExist(f"item {item_id} not found")
+
+    revisions_pending()
+    _menu_changed("update", item_id, raw, fields=item_data)
+    return MenuItem._from_son(raw)
 
 def delete_menu_item(item_id):
     """
     Delete a menu item from the database.
     
-    Finds the item by ID and removes it from MongoDB completely.
+    Removes the item with a single ``find_one_and_delete`` round trip and
+    leaves a tombstone, numbered like any write, for ``menu_changes_since``.
     
     Args:
         item_id (str): The MongoDB ObjectId as a string
@@ -354,7 +510,190 @@ def delete_menu_item(item_id):
         result = delete_menu_item("691211b751476ba3fc35b9f5")
         print(result)  # {"message": "Item deleted successfully"}
     """
-    # FIX: Added ObjectId() conversion for item_id
-    # ISSUE: String ID must be converted to MongoDB ObjectId for database query
-    MenuItem.objects.get(id=ObjectId(item_id)).delete()
-    return{"message": "Item deleted successfully"}
\ No newline at end of file
+    deleted = MenuItem._get_collection().find_one_and_delete(
+        {"_id": ObjectId(item_id)}, projection={"_id": 1}
+    )
+    if deleted is None:
+        raise MenuItem.DoesNotExist(f"item {item_id} not found")
+    record_tombstones([deleted["_id"]])
+    revisions_pending()
+    _menu_changed("delete", item_id)
+    return{"message": "Item deleted successfully"}
+
+
+def validate_bulk_operations(operations):
+    """
+    Validate a batch of create/update/delete operations before writing.
+
+    Every operation is checked up front so that a batch with a single bad
+    entry is rejected as a whole instead of being half applied. An item
+    may be the target of one update or delete per batch.
+
+    Args:
+        operations (list[dict]): Each entry is one of
+            - {"op": "create", "data": {...}}
+            - {"op": "update", "id": "<ObjectId>", "data": {<fields to set>}}
+            - {"op": "delete", "id": "<ObjectId>"}
+
+    Returns:
+        tuple: (prepared, errors)
+               - prepared (list[dict]): operations ready for
+                 ``bulk_write_menu_items`` (ids as ObjectId, data converted
+                 to MongoDB values)
+               - errors (list[dict]): ``{"index": i, "error": "..."}`` for
+                 every invalid operation (empty when the batch is valid)
+    """
+    prepared, errors = [], []
+    targets = {}   # id -> index of the operation that targets it
+    for index, operation in enumerate(operations):
+        try:
+            if not isinstance(operation, dict):
+                raise ValueError("operation must be an object")
+            op = operation.get("op")
+            data = operation.get("data") or {}
+            if not isinstance(data, dict):
+                raise ValueError("data must be an object")
+
+            if op == "create":
+                item = _new_menu_item(data)
+                item.validate()
+                document = item.to_mongo().to_dict()
+                document["_id"] = ObjectId()
+                prepared.append({"op": op, "id": document["_id"], "document": document})
+                continue
+
+            if op not in ("update", "delete"):
+                raise ValueError("op must be create, update or delete")
+            if not ObjectId.is_valid(operation.get("id")):
+                raise ValueError("malformed id")
+            entry = {"op": op, "id": ObjectId(operation["id"])}
+            if entry["id"] in targets:
+                raise ValueError(f"duplicate id (also at index {targets[entry['id']]})")
+            targets[entry["id"]] = index
+            if op == "update":
+                if not data:
+                    raise ValueError("update needs a non-empty data object")
+                entry["changes"] = _validate_changes(data)
+                entry["fields"] = tuple(data)
+            prepared.append(entry)
+        except (ValueError, ValidationError) as e:
+            errors.append({"index": index, "error": str(e)})
+    return prepared, errors
+
+
+def _validate_changes(data):
+    """Validate a partial update and convert it to a MongoDB ``$set`` document."""
+    changes = {}
+    for name, value in data.items():
+        if name not in UPDATABLE_FIELDS:
+            raise ValueError(f"field cannot be updated: {name}")
+        field = MenuItem._fields[name]
+        if value is None:
+            if field.required:
+                raise ValueError(f"{name} is required")
+        else:
+            field._validate(value)
+        changes[field.db_field] = field.to_mongo(value) if value is not None else None
+    if "dietary" in data:
+        changes["dietary_mask"] = dietary_mask(data["dietary"])
+    if "allergens" in data:
+        changes["allergen_mask"] = allergen_mask(data["allergens"])
+    return changes
+
+
+def bulk_write_menu_items(prepared):
+    """
+    Apply validated operations in a single ``bulk_write`` round trip.
+
+    Each operation's status comes from the write itself. Creates and
+    updates go into the batch as they are; a delete goes in as an update
+    of its target (which tells whether it exists) and the touched targets
+    are then removed with one ``delete_many``. When the batch matched
+    fewer targets than it named, one ``$in`` read tells which ones are
+    missing; they are reported as ``not_found``. Every write is left for
+    a menu revision, and deletes leave tombstones once they are done. The
+    menu cache is invalidated once for the whole batch, then the applied
+    changes are published to ``menu_events`` listeners.
+
+    Args:
+        prepared (list[dict]): Output of ``validate_bulk_operations``
+                               (at most one operation per id).
+
+    Returns:
+        dict: {
+                  "results": [{"index": 0, "op": "create", "id": "...", "status": "created"}, ...],
+                  "created": int, "updated": int, "deleted": int, "failed": int
+              }
+              ``status`` is one of created, updated, deleted, not_found, error.
+    """
+    collection = MenuItem._get_collection()
+    results = []
+    requests = []
+    for index, entry in enumerate(prepared):
+        results.append({"index": index, "op": entry["op"], "id": str(entry["id"]),
+                        "status": {"create": "created", "update": "updated", "delete": "deleted"}[entry["op"]]})
+        if entry["op"] == "create":
+            requests.append(InsertOne({**entry["document"], "rev": PENDING}))
+        elif entry["op"] == "update":
+            requests.append(UpdateOne({"_id": entry["id"]},
+                                      {"$set": {**entry["changes"], "rev": PENDING}, "$inc": {"version": 1}}))
+        else:
+            requests.append(UpdateOne({"_id": entry["id"]}, {"$set": {"rev": PENDING}}))
+
+    if requests:
+        try:
+            _apply_bulk(collection, requests, results, prepared)
+        finally:
+            # Also after a failure: part of the batch may have been applied.
+            menu_cache.invalidate()
+        revisions_pending()
+        _publish_bulk_changes(collection, results, prepared)
+
+    summary = {"results": results, "created": 0, "updated": 0, "deleted": 0, "failed": 0}
+    for result in results:
+        status = result["status"]
+        if status in ("created", "updated", "deleted"):
+            summary[status] += 1
+        else:
+            summary["failed"] += 1
+    return summary
+
+
+def _apply_bulk(collection, requests, results, prepared):
+    """Run the batch of ``bulk_write_menu_items`` and set each result's status."""
+    try:
+        matched = collection.bulk_write(requests, ordered=False).matched_count
+    except BulkWriteError as e:
+        matched = e.details.get("nMatched", 0)
+        for write_error in e.details.get("writeErrors", []):
+            result = results[write_error["index"]]
+            result["status"] = "error"
+            result["error"] = write_error.get("errmsg", "write failed")
+
+    targeted = [result for result in results if result["op"] != "create" and result["status"] != "error"]
+    if matched < len(targeted):
+        ids = [prepared[result["index"]]["id"] for result in targeted]
+        found = {raw["_id"] for raw in collection.find({"_id": {"$in": ids}}, {"_id": 1})}
+        for result in targeted:
+            if prepared[result["index"]]["id"] not in found:
+                result["status"] = "not_found"
+
+    deleted = [prepared[result["index"]]["id"] for result in targeted if result["status"] == "deleted"]
+    if deleted:
+        collection.delete_many({"_id": {"$in": deleted}})
+        record_tombstones(deleted)
+
+
+def _publish_bulk_changes(collection, results, prepared):
+    """Publish the writes a bulk batch applied, reading the written items back in one query."""
+    applied = [result for result in results if result["status"] in ("created", "updated", "deleted")]
+    written = [ObjectId(result["id"]) for result in applied if result["op"] != "delete"]
+    documents = {}
+    if written:
+        documents = {str(raw["_id"]): raw for raw in collection.find({"_id": {"$in": written}})}
+    for result in applied:
+        if result["op"] == "delete":
+            publish("delete", result["id"])
+        elif result["id"] in documents:
+            publish(result["op"], result["id"], project_item(documents[result["id"]], WIRE_FIELDS),
+                    prepared[result["index"]].get("fields"))
@@ -0,0 +1,158 @@
+"""Server-side rendering of the menu card grid.
+
+The ``/menu`` page used to be an empty shell filled in by
+``menuRenderer.js`` after a second request to ``/api/v1/menu``. With SSR
+the page arrives with the category sections and cards already in the
+HTML, plus the menu JSON embedded in ``<script id="menu-data">`` so the
+page script hydrates from it instead of fetching it again.
+
+The markup mirrors ``renderMenuFragment`` / ``createMenuCard`` in the
+frontend (same classes, category order and image ``srcset``), so the
+stylesheet and the client-side code work on either version.
+
+Caching, from the bottom up:
+
+- Each card is rendered from ``partials/menu_card.html`` once and cached
+  under the item's ETag (see ``MenuSnapshot.item_payload``). When
+  an item changes its ETag changes, so only that card is re-rendered.
+- The assembled grid and the escaped JSON are cached per snapshot ETag,
+  so an unchanged menu costs one dict lookup per page view.
+"""
+
+import threading
+from urllib.parse import quote
+
+from flask import render_template
+from markupsafe import Markup
+
+from .menu_model import menu_cache
+
+
+# Same order and aliases as CATEGORY_ALIASES / order in menuRenderer.js.
+CATEGORY_ORDER = ("Starter", "Main", "Dessert", "Side", "Drink")
+CATEGORY_ALIASES = {
+    "starter": "Starter", "starters": "Starter", "appetizer": "Starter", "appetizers": "Starter",
+    "main": "Main", "mains": "Main", "main course": "Main", "entree": "Main",
+    "dessert": "Dessert", "desert": "Dessert",
+    "side": "Side", "sides": "Side",
+    "drink": "Drink", "drinks": "Drink", "beverage": "Drink", "beverages": "Drink",
+}
+
+# Mirrors MEDIA_WIDTHS / resolveImageSrcset in image-resolver.js.
+MEDIA_WIDTHS = (320, 480, 640, 960, 1280)
+ASSETS_PREFIX = "/static/assets/"
+FALLBACK_IMAGE = "/static/assets/fallback-image.jpeg"
+
+
+def category_label(value):
+    """Display label of a category, as normalizeCategoryName() computes it."""
+    raw = value.strip() if isinstance(value, str) and value.strip() else "Uncategorized"
+    return CATEGORY_ALIASES.get(raw.lower(), raw)
+
+
+def group_by_category(items):
+    """
+    Group items into ``[(key, label, items)]`` in the frontend's order:
+    the preferred categories first, then the others alphabetically.
+    """
+    groups = {}
+    for item in items:
+        if not item.get("name"):
+            continue
+        label = category_label(item.get("category"))
+        groups.setdefault(label.lower(), (label, []))[1].append(item)
+    preferred = [label.lower() for label in CATEGORY_ORDER if label.lower() in groups]
+    others = sorted(key for key in groups if key not in preferred)
+    return [(key, *groups[key]) for key in preferred + others]
+
+
+def _encode_uri_component(value):
+    return quote(value, safe="!'()*-._~")
+
+
+def image_sources(item):
+    """
+    Return ``(src, srcset)`` for a card image, like resolveImageUrl(item, 640)
+    and resolveImageSrcset(item) in image-resolver.js.
+    """
+    value = item.get("image_url") or item.get("image")
+    if not value or not isinstance(value, str):
+        return FALLBACK_IMAGE, ""
+    if value.startswith(ASSETS_PREFIX):
+        name = value[len(ASSETS_PREFIX):]
+    elif value.startswith(("/", "http")):
+        return value, ""
+    else:
+        name = value
+    encoded = _encode_uri_component(name)
+    srcset = ", ".join(f"/media/{encoded}?w={width} {width}w" for width in MEDIA_WIDTHS)
+    return f"/media/{encoded}?w=640", srcset
+
+
+def js_number(value):
+    """Format a price the way JavaScript prints numbers (12.0 -> "12")."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class MenuFragmentCache:
+    """Per-item card HTML and per-snapshot page parts, keyed by content ETags."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cards = {}        # item id -> (item etag, Markup)
+        self._page = None       # (snapshot etag, grid Markup, data Markup)
+        self.card_hits = 0
+        self.card_renders = 0
+
+    def card(self, snapshot, item):
+        """Return the cached card HTML of ``item``, rendering it if stale."""
+        item_etag = snapshot.item_payload(item["id"])[1]
+        cached = self._cards.get(item["id"])
+        if cached is not None and cached[0] == item_etag:
+            self.card_hits += 1
+            return cached[1]
+        src, srcset = image_sources(item)
+        html = Markup(render_template(
+            "partials/menu_card.html", item=item, src=src, srcset=srcset, price=js_number(item.get("price")),
+        ))
+        with self._lock:
+            self._cards[item["id"]] = (item_etag, html)
+        self.card_renders += 1
+        return html
+
+    def page(self):
+        """
+        Return ``(grid_html, data_json)`` for the current menu snapshot.
+
+        ``data_json`` is the snapshot's JSON body made safe for embedding in
+        a ``<script type="application/json">`` element.
+        """
+        snapshot = menu_cache.get()
+        cached = self._page
+        if cached is not None and cached[0] == snapshot.etag:
+            return cached[1], cached[2]
+
+        sections = []
+        for key, label, items in group_by_category(snapshot.items):
+            cards = Markup("").join(self.card(snapshot, item) for item in items)
+            sections.append(render_template(
+                "partials/menu_category.html", key=key, label=label, cards=cards,
+            ))
+        grid = Markup("".join(sections))
+        # "<" only occurs inside JSON strings, where \\u003c is equivalent;
+        # this keeps "</script>" in a dish description from ending the element.
+        data = Markup(snapshot.payload.decode("utf-8").replace("<", "\\u003c"))
+        with self._lock:
+            # Forget cards of items that are no longer on the menu.
+            for item_id in set(self._cards) - set(snapshot.by_id):
+                del self._cards[item_id]
+            self._page = (snapshot.etag, grid, data)
+        return grid, data
+
+    def stats(self):
+        return {"cards": len(self._cards), "card_hits": self.card_hits, "card_renders": self.card_renders}
+
+
+menu_fragments = MenuFragmentCache()
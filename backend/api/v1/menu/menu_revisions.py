@@ -0,0 +1,302 @@
+"""Menu-wide revision numbers and delete tombstones for ``GET /api/v1/menu/changes``.
+
+Every menu write is stamped with a number of one global counter, on the
+item (``MenuItem.rev``) or, for a delete, on a tombstone
+(``MenuTombstone``). The changes since revision N are then the items
+and tombstones with ``rev > N``, found through an index on ``rev``.
+
+The number is not taken on the request path: a write stores
+``rev = PENDING`` (below every real revision, so it is left out of
+deltas) in the same round trip as the data, and wakes this process's
+sequencer thread. The sequencer (``assign_revisions``) numbers all
+pending writes at once, off the request path:
+
+1. find the pending items and tombstones,
+2. take one number each from the counter (``claim_revisions``),
+3. stamp them, where still pending (another process may have got there
+   first; its numbers then go unused),
+4. settle the numbers (``settle_revisions``).
+
+Sequencers of several processes run concurrently, so numbers can reach
+the database out of order: revision 11 may be stored while 10 is still
+on its way. A reader that answered "up to 11" would make its client skip
+10 for good. Hence two positions in the counter document:
+
+- ``rev``      the last number handed out,
+- ``settled``  the last number below which every stamp is finished.
+
+A sequencer that took ``first..last`` moves ``settled`` from ``first - 1``
+to ``last`` once its stamps are done, waiting for earlier ones to move it
+first. Readers only answer up to ``settled``. A sequencer that died
+between the two steps would hold everyone up, so after
+``MENU_REV_SETTLE_TIMEOUT`` seconds (default 5) the others move on
+without it. If it was only slow, it finds the watermark past its numbers
+when it settles and resets its stamps to ``PENDING``: the writes are
+numbered again, above the watermark, instead of being hidden from
+clients that already moved past. Writes left pending by a process that
+died are picked up by the next sweep of any sequencer (every
+``MENU_REV_SWEEP_SECONDS``, default 5).
+
+Tombstones are kept for ``MENU_TOMBSTONE_DAYS`` (default 30).
+``compact_tombstones`` drops older ones and records the highest revision
+dropped as ``compacted``; a client whose revision is older than that has
+missed deletes and gets a full snapshot instead. Each process compacts at
+most once per ``MENU_COMPACT_INTERVAL`` seconds (default 3600), when
+changes are read; it can also be run from a cron job::
+
+    python -m api.v1.menu.menu_revisions
+"""
+
+import datetime
+import logging
+import os
+import threading
+import time
+
+from mongoengine import DateTimeField, Document, IntField, ObjectIdField, StringField
+from pymongo import ReturnDocument, UpdateOne
+
+
+MENU_REV_SETTLE_TIMEOUT = float(os.getenv("MENU_REV_SETTLE_TIMEOUT", "5"))
+MENU_TOMBSTONE_DAYS = float(os.getenv("MENU_TOMBSTONE_DAYS", "30"))
+MENU_COMPACT_INTERVAL = float(os.getenv("MENU_COMPACT_INTERVAL", "3600"))
+MENU_REV_SWEEP_SECONDS = float(os.getenv("MENU_REV_SWEEP_SECONDS", "5"))
+
+COUNTER_ID = "menu"
+
+# ``rev`` of a write the sequencer has not numbered yet.
+PENDING = -1
+
+# Pending writes numbered per pass.
+SEQUENCE_BATCH = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class MenuRevision(Document):
+    """The menu's revision counter (one document, ``_id`` ``"menu"``)."""
+
+    id = StringField(primary_key=True)
+    rev = IntField(default=0)
+    settled = IntField(default=0)
+    compacted = IntField(default=0)
+
+    meta = {"collection": "menu_revision"}
+
+
+class MenuTombstone(Document):
+    """A deleted menu item, kept so delta clients learn about the delete."""
+
+    id = ObjectIdField(primary_key=True)   # the deleted item's id
+    rev = IntField(required=True)
+    deleted_at = DateTimeField(required=True)
+
+    meta = {
+        "collection": "menu_tombstone",
+        "indexes": [{"fields": ["rev"], "name": "rev"}],
+    }
+
+
+def claim_revisions(count=1):
+    """
+    Take the next ``count`` revision numbers.
+
+    Every claim must be followed by ``settle_revisions(first, last)``,
+    also when the stamping fails.
+
+    Returns:
+        tuple: ``(first, last)`` revision numbers.
+    """
+    counter = MenuRevision._get_collection().find_one_and_update(
+        {"_id": COUNTER_ID},
+        {"$inc": {"rev": count}, "$setOnInsert": {"settled": 0, "compacted": 0}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return counter["rev"] - count + 1, counter["rev"]
+
+
+def settle_revisions(first, last):
+    """
+    Mark revisions ``first..last`` as written, after every earlier one.
+
+    Usually a single update. If an earlier claim has not settled yet,
+    waits for it (polling, up to ``MENU_REV_SETTLE_TIMEOUT`` seconds),
+    then moves on without it.
+
+    Returns:
+        bool: False if another sequencer already moved on without these
+              revisions; their stamps must then be numbered again.
+    """
+    collection = MenuRevision._get_collection()
+    deadline = time.monotonic() + MENU_REV_SETTLE_TIMEOUT
+    delay = 0.001
+    while True:
+        if collection.update_one({"_id": COUNTER_ID, "settled": first - 1}, {"$set": {"settled": last}}).modified_count:
+            return True
+        counter = collection.find_one({"_id": COUNTER_ID}, {"settled": 1})
+        if counter is None or counter["settled"] >= last:
+            # Only a timed-out waiter moves ``settled`` past a claim.
+            return False
+        if time.monotonic() > deadline:
+            logger.warning("menu revisions before %d were not settled in time; skipping ahead", first)
+            collection.update_one({"_id": COUNTER_ID}, {"$max": {"settled": last}})
+            return True
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
+
+
+def revision_state():
+    """
+    Return ``{"settled": int, "compacted": int}``; zeros before the first write.
+    """
+    counter = MenuRevision._get_collection().find_one({"_id": COUNTER_ID}, {"settled": 1, "compacted": 1})
+    if counter is None:
+        return {"settled": 0, "compacted": 0}
+    return {"settled": counter.get("settled", 0), "compacted": counter.get("compacted", 0)}
+
+
+def record_tombstones(deleted):
+    """
+    Store tombstones for deleted items, pending a revision.
+
+    Upserts, so recording the same id twice (or again after a retry) is
+    harmless: the tombstone is just numbered again.
+
+    Args:
+        deleted (list[ObjectId]): The deleted items' ids.
+    """
+    if not deleted:
+        return
+    now = datetime.datetime.now(datetime.timezone.utc)
+    MenuTombstone._get_collection().bulk_write(
+        [UpdateOne({"_id": item_id}, {"$set": {"rev": PENDING, "deleted_at": now}}, upsert=True)
+         for item_id in dict.fromkeys(deleted)],
+        ordered=False,
+    )
+
+
+def assign_revisions():
+    """
+    Number pending menu writes and settle the numbers (one sequencer pass).
+
+    Returns:
+        int: The pending writes found (at most ``SEQUENCE_BATCH``).
+    """
+    from .menu_model import MenuItem
+
+    collections = (MenuItem._get_collection(), MenuTombstone._get_collection())
+    pending = []
+    for collection in collections:
+        remaining = SEQUENCE_BATCH - len(pending)
+        if remaining > 0:
+            pending += [(collection, raw["_id"])
+                        for raw in collection.find({"rev": PENDING}, {"_id": 1}).limit(remaining)]
+    if not pending:
+        return 0
+
+    first, last = claim_revisions(len(pending))
+    stamps = {}
+    for rev, (collection, document_id) in enumerate(pending, first):
+        stamps.setdefault(collection.name, (collection, []))[1].append(
+            UpdateOne({"_id": document_id, "rev": PENDING}, {"$set": {"rev": rev}}))
+    try:
+        for collection, requests in stamps.values():
+            collection.bulk_write(requests, ordered=False)
+    finally:
+        if not settle_revisions(first, last):
+            # Clients may already be past these numbers: number again.
+            window = {"rev": {"$gte": first, "$lte": last}}
+            for collection in collections:
+                collection.update_many(window, {"$set": {"rev": PENDING}})
+            _wake.set()
+    return len(pending)
+
+
+_wake = threading.Event()
+_sequencer_pid = None
+_sequencer_lock = threading.Lock()
+
+
+def _run_sequencer():
+    while True:
+        _wake.wait(MENU_REV_SWEEP_SECONDS)
+        _wake.clear()
+        try:
+            while assign_revisions() == SEQUENCE_BATCH:
+                pass
+        except Exception:
+            logger.exception("numbering menu revisions failed")
+            time.sleep(1)
+
+
+def start_revision_sequencer():
+    """
+    Start this process's sequencer thread, once per process (also after a fork).
+
+    Called by writes (``revisions_pending``) and by ``GET
+    /api/v1/menu/changes``, so writes left pending by a process that died
+    are numbered as long as any process serves the menu changes.
+    """
+    global _sequencer_pid
+    if _sequencer_pid == os.getpid():
+        return
+    with _sequencer_lock:
+        if _sequencer_pid != os.getpid():
+            threading.Thread(target=_run_sequencer, name="menu-revisions", daemon=True).start()
+            _sequencer_pid = os.getpid()
+
+
+def revisions_pending():
+    """Tell the sequencer that a write is waiting for its revision."""
+    start_revision_sequencer()
+    _wake.set()
+
+
+def compact_tombstones(max_age_days=None):
+    """
+    Drop tombstones older than ``max_age_days`` (default
+    ``MENU_TOMBSTONE_DAYS``), recording the highest revision dropped.
+
+    Returns:
+        int: The compacted revision (clients behind it need a full snapshot).
+    """
+    if max_age_days is None:
+        max_age_days = MENU_TOMBSTONE_DAYS
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=max_age_days)
+    tombstones = MenuTombstone._get_collection()
+    newest = tombstones.find_one({"deleted_at": {"$lt": cutoff}}, {"rev": 1}, sort=[("rev", -1)])
+    if newest is None:
+        return revision_state()["compacted"]
+    # Raise the floor first: a reader between the two steps then sends a
+    # full snapshot instead of a delta with deletes missing.
+    MenuRevision._get_collection().update_one({"_id": COUNTER_ID}, {"$max": {"compacted": newest["rev"]}})
+    tombstones.delete_many({"rev": {"$lte": newest["rev"]}})
+    return revision_state()["compacted"]
+
+
+_compact_lock = threading.Lock()
+_compacted_at = None
+
+
+def compact_if_due():
+    """Run ``compact_tombstones`` if this process has not done so for ``MENU_COMPACT_INTERVAL`` seconds."""
+    global _compacted_at
+    if _compacted_at is not None and time.monotonic() - _compacted_at < MENU_COMPACT_INTERVAL:
+        return
+    if not _compact_lock.acquire(blocking=False):
+        return
+    try:
+        _compacted_at = time.monotonic()
+        compact_tombstones()
+    finally:
+        _compact_lock.release()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from api.utils.db import mongo_connect
+
+    load_dotenv()
+    mongo_connect()
+    print(f"compacted up to revision {compact_tombstones()}")
@@ -2,15 +2,26 @@
 
 Routes:
 - GET /api/v1/menu/         -> returns list of menu items
+- GET /api/v1/menu/today   -> active items served today (restaurant time zone)
+- GET /api/v1/menu/filter  -> dietary/allergen include+exclude filter (bitset index)
+- GET /api/v1/menu/search?q= -> ranked full-text search (inverted index)
+- GET /api/v1/menu/search/suggest?q= -> typeahead completions
+- GET /api/v1/menu/stream    -> live menu changes (Server-Sent Events)
+- GET /api/v1/menu/changes?since= -> items changed/deleted after a menu revision
 - GET /api/v1/menu/<item_id> -> returns single item or 404
+- POST /api/v1/menu/bulk     -> batch of create/update/delete operations
+- GET /api/v1/menu/cache/stats -> menu snapshot cache counters
+- GET /api/v1/menu/admin/indexes -> explain() report per list query shape
 
 This module keeps route definitions tiny by delegating logic to the
 controller helpers in ``menu_controller.py`` which return (response,
-status) tuples.
+status) tuples. Each route imports its controller when first called:
+the controllers pull in the model and MongoEngine, which a worker then
+loads with its first API request instead of at startup (see
+``create_app`` in ``app.py``).
 """
 
 from flask import Blueprint
-from .menu_controller import get_menu,get_menu_item_controller, create_menu_item_controller, update_menu_item_controller,delete_menu_item_controller
 
 
 menu_bp = Blueprint("menu", __name__, url_prefix="/api/v1/menu")
@@ -23,10 +34,25 @@ def get_all_menu_route():
     @apiName GetAllMenu
     @apiGroup Menu
     @apiVersion 1.0.0
+
+    @apiDescription Without query parameters the full menu is returned from
+    the in-memory snapshot. Any of the parameters below switches to a
+    filtered MongoDB query; when a page is cut by ``limit`` the cursor for
+    the next page is sent in the ``X-Next-Cursor`` and ``Link`` headers.
+    ``day`` alone, or with ``active=true``, is answered from the in-memory
+    weekday index instead.
+
+    @apiQuery {String} [category] Comma-separated categories (starter,main,...)
+    @apiQuery {String} [day] Weekday name, e.g. friday
+    @apiQuery {String} [dietary] Comma-separated labels the item must ALL have
+    @apiQuery {String} [exclude_allergens] Comma-separated allergens to exclude
+    @apiQuery {Boolean} [active] true or false
+    @apiQuery {String} [fields] Comma-separated fields to return (id is always included)
+    @apiQuery {String} [after] Cursor: return items after this id
+    @apiQuery {Number} [limit] Page size (1-500)
     
     @apiSuccess {Object[]} items List of menu items
-    @apiSuccess {String} items._id MongoDB ObjectId
-    @apiSuccess {String} items.id Item ID (string)
+    @apiSuccess {String} items.id Item ID (MongoDB ObjectId as a string)
     @apiSuccess {String} items.name Item name
     @apiSuccess {Number} items.price Item price
     @apiSuccess {String} items.category Item category (starter|main|dessert|side|drink|special)
@@ -40,7 +66,6 @@ def get_all_menu_route():
         HTTP/1.1 200 OK
         [
             {
-                "_id": {"$oid": "691211b751476ba3fc35b9f5"},
                 "id": "691211b751476ba3fc35b9f5",
                 "name": "Aurora Bites",
                 "price": 5.50,
@@ -53,9 +78,233 @@ def get_all_menu_route():
             }
         ]
     """
+    from .menu_controller import get_menu
     return get_menu()
 
 
+@menu_bp.route("/today", methods=["GET"])
+def get_today_menu_route():
+    """
+    @api {get} /menu/today Get Today's Menu
+    @apiName GetTodayMenu
+    @apiGroup Menu
+    @apiVersion 1.0.0
+
+    @apiDescription Active items whose days_of_week include the current
+    weekday in the restaurant's time zone (RESTAURANT_TIMEZONE, default
+    UTC). Served from the in-memory weekday index.
+
+    @apiHeader (Response Headers) {String} X-Menu-Day Weekday used, e.g. saturday
+    @apiHeader (Response Headers) {String} X-Menu-Timezone Time zone used, e.g. Europe/Helsinki
+
+    @apiSuccess {Object[]} items Menu items, same format as GET /menu
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        X-Menu-Day: saturday
+        [
+            {
+                "id": "691211b751476ba3fc35b9f5",
+                "name": "Aurora Bites",
+                "price": 5.50,
+                "days_of_week": ["Friday", "Saturday"],
+                "active": true
+            }
+        ]
+    """
+    from .menu_controller import get_today_menu_controller
+    return get_today_menu_controller()
+
+
+@menu_bp.route("/filter", methods=["GET"])
+def filter_menu_route():
+    """
+    @api {get} /menu/filter Filter Menu by Dietary Labels and Allergens
+    @apiName FilterMenu
+    @apiGroup Menu
+    @apiVersion 1.0.0
+
+    @apiDescription Any combination of the conditions below, all of which
+    must hold. Answered from the in-memory bitset index. Allergens are
+    matched by group (dairy = milk, eggs = egg, ...); "other" matches any
+    allergen outside the 14 EU groups.
+
+    @apiQuery {String} [dietary] Comma-separated labels the item must ALL have
+    @apiQuery {String} [exclude_dietary] Comma-separated labels the item must have NONE of
+    @apiQuery {String} [allergens] Comma-separated allergens the item must ALL contain
+    @apiQuery {String} [exclude_allergens] Comma-separated allergens the item must contain NONE of
+    @apiQuery {Boolean} [active] true or false
+
+    @apiSuccess {Object[]} items Matching menu items, same format as GET /menu
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        [
+            {
+                "id": "691211b751476ba3fc35b9f5",
+                "name": "Forest Bowl",
+                "dietary": ["vegan", "gluten-free"],
+                "allergens": ["sesame"],
+                "active": true
+            }
+        ]
+
+    @apiError InvalidFilter Unknown dietary label or allergen
+    @apiErrorExample Error-Response:
+        HTTP/1.1 400 Bad Request
+        {"error": "invalid exclude_allergens: plutonium"}
+    """
+    from .menu_controller import filter_menu_controller
+    return filter_menu_controller()
+
+
+@menu_bp.route("/search", methods=["GET"])
+def search_menu_route():
+    """
+    @api {get} /menu/search Search Menu Items
+    @apiName SearchMenu
+    @apiGroup Menu
+    @apiVersion 1.0.0
+
+    @apiDescription Searches name, description and ingredients. Matching
+    ignores case and accents, the last word matches as a prefix ("lingon"
+    finds "Lingonberry"), as do earlier words of 3+ letters, and an item
+    must match all words. Results are
+    ranked best first (name > ingredients > description, whole words
+    above completions).
+
+    @apiQuery {String} q Search text (max 200 characters)
+    @apiQuery {Number} [limit=20] Maximum number of results (1-50)
+
+    @apiSuccess {Object[]} items Matching menu items, same format as GET /menu
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        [
+            {
+                "id": "691211b751476ba3fc35b9f5",
+                "name": "Lingonberry Tart",
+                "price": 7.5,
+                "category": "dessert"
+            }
+        ]
+
+    @apiError MissingQuery q is missing or invalid
+    @apiErrorExample Error-Response:
+        HTTP/1.1 400 Bad Request
+        {"error": "q is required"}
+    """
+    from .menu_controller import search_menu_controller
+    return search_menu_controller()
+
+
+@menu_bp.route("/search/suggest", methods=["GET"])
+def suggest_menu_route():
+    """
+    @api {get} /menu/search/suggest Autocomplete Search Words
+    @apiName SuggestMenu
+    @apiGroup Menu
+    @apiVersion 1.0.0
+
+    @apiDescription Completes the last word of q with words used on the
+    menu, most common first. Meant for typeahead.
+
+    @apiQuery {String} q Text typed so far
+    @apiQuery {Number} [limit=10] Maximum number of suggestions (1-50)
+
+    @apiSuccess {String[]} suggestions Completed words (lower case, as written on the menu)
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        ["lingonberry", "lingonberries"]
+    """
+    from .menu_controller import suggest_menu_controller
+    return suggest_menu_controller()
+
+
+@menu_bp.route("/stream", methods=["GET"])
+def menu_stream_route():
+    """
+    @api {get} /menu/stream Stream Menu Changes
+    @apiName StreamMenu
+    @apiGroup Menu
+    @apiVersion 1.0.0
+
+    @apiDescription Server-Sent Events (``text/event-stream``): one
+    ``change`` event per created, updated or deleted item, carrying only
+    what changed. Open it with ``new EventSource("/api/v1/menu/stream")``.
+    On reconnect the browser sends ``Last-Event-ID`` and gets the events
+    it missed; when they are no longer known a ``reset`` event tells it to
+    reload the menu. A ``: ping`` comment is sent every
+    MENU_STREAM_HEARTBEAT seconds while nothing changes.
+
+    Streams stay open under ``asgi.py`` only. Under WSGI the response
+    holds the missed events and ``retry:`` (MENU_STREAM_POLL_SECONDS) and
+    ends, so the browser polls, unless MENU_STREAM_WSGI=hold.
+
+    @apiHeader {String} [Last-Event-ID] Id of the last event received
+
+    @apiSuccess {String} op create, update or delete
+    @apiSuccess {String} id Item ID
+    @apiSuccess {Number} version Item version after the write (not for delete)
+    @apiSuccess {Object} fields The fields the write set (the whole item for create)
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        Content-Type: text/event-stream
+
+        id: 3f9a0c1e-42
+        event: change
+        data: {"op":"update","id":"691211b751476ba3fc35b9f5","version":4,"fields":{"active":false}}
+
+        id: 3f9a0c1e-43
+        event: change
+        data: {"op":"delete","id":"691211b751476ba3fc35b9f6"}
+
+    @apiError (503) TooManyStreams MENU_STREAM_MAX_CLIENTS streams are already open (Retry-After)
+    """
+    from .menu_controller import stream_menu_controller
+    return stream_menu_controller()
+
+
+@menu_bp.route("/changes", methods=["GET"])
+def get_menu_changes_route():
+    """
+    @api {get} /menu/changes Get Menu Changes
+    @apiName GetMenuChanges
+    @apiGroup Menu
+    @apiVersion 1.0.0
+
+    @apiDescription Delta sync. Every menu write gets the next menu-wide
+    revision number; this returns what changed after revision ``since``.
+    Without ``since`` (or with 0) the whole menu is returned, as it also
+    is when the delta is no longer known (deletes are remembered for
+    MENU_TOMBSTONE_DAYS days). Keep ``rev`` and send it as ``since`` next
+    time. Sent with an ETag, so caches can revalidate it cheaply.
+
+    @apiQuery {Number} [since=0] ``rev`` of the last sync
+
+    @apiSuccess {Number} rev Revision the client is now at
+    @apiSuccess {Boolean} full true: ``items`` is the whole menu and replaces the client's copy
+    @apiSuccess {Object[]} [items] Every item (full responses)
+    @apiSuccess {Object[]} [upserted] Items created or changed after ``since``, same format as GET /menu
+    @apiSuccess {String[]} [deleted] Ids of items deleted after ``since``
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        {
+            "rev": 42,
+            "full": false,
+            "upserted": [{"id": "691211b751476ba3fc35b9f5", "name": "Aurora Bites", "price": 6.0, "version": 3}],
+            "deleted": ["691211b751476ba3fc35b9f6"]
+        }
+
+    @apiError (400) BadRequest {"error": "since must be a non-negative integer"}
+    """
+    from .menu_controller import get_menu_changes_controller
+    return get_menu_changes_controller()
+
+
 @menu_bp.route("/<item_id>", methods=["GET"])
 def get_menu_item_route(item_id):
     """
@@ -67,15 +316,13 @@ def get_menu_item_route(item_id):
     @apiParam {String} id Menu item MongoDB ObjectId
     
     @apiSuccess {Object} item Menu item object
-    @apiSuccess {String} item._id MongoDB ObjectId
-    @apiSuccess {String} item.id Item ID (string)
+    @apiSuccess {String} item.id Item ID (MongoDB ObjectId as a string)
     @apiSuccess {String} item.name Item name
     @apiSuccess {Number} item.price Item price
     
     @apiSuccessExample Success-Response:
         HTTP/1.1 200 OK
         {
-            "_id": {"$oid": "691211b751476ba3fc35b9f5"},
             "id": "691211b751476ba3fc35b9f5",
             "name": "Aurora Bites",
             "price": 5.50
@@ -86,6 +333,7 @@ def get_menu_item_route(item_id):
         HTTP/1.1 400 Bad Request
         {"error": "Item not found"}
     """
+    from .menu_controller import get_menu_item_controller
     return get_menu_item_controller(item_id)
 
 @menu_bp.route("/",methods = ["POST"])
@@ -119,13 +367,63 @@ def create_menu():
     @apiSuccessExample Success-Response:
         HTTP/1.1 200 OK
         {
-            "_id": {"$oid": "691211b751476ba3fc35b9f5"},
+            "id": "691211b751476ba3fc35b9f5",
             "name": "Aurora Bites",
             "price": 5.50
         }
     """
+    from .menu_controller import create_menu_item_controller
     return create_menu_item_controller()
 
+@menu_bp.route("/bulk", methods=["POST"])
+def bulk_menu():
+    """
+    @api {post} /menu/bulk Bulk Create/Update/Delete Menu Items
+    @apiName BulkMenuItems
+    @apiGroup Menu
+    @apiVersion 1.0.0
+
+    @apiDescription All operations are validated first; if any is invalid
+    nothing is written. Valid batches run as one bulk_write.
+
+    @apiBody {Object[]} operations Array of operations
+    @apiBody {String} operations.op create | update | delete
+    @apiBody {String} [operations.id] Item id (update and delete)
+    @apiBody {Object} [operations.data] Item fields (create) or fields to set (update)
+
+    @apiExample {json} Request-Example:
+        [
+            {"op": "create", "data": {"name": "Birch Latte", "price": 3.75, "category": "drink"}},
+            {"op": "update", "id": "691211b751476ba3fc35b9f5", "data": {"price": 7.99}},
+            {"op": "delete", "id": "691b7569f13b2b3f70dee895"}
+        ]
+
+    @apiSuccess {Object[]} results One result per operation, in request order
+    @apiSuccess {String} results.status created | updated | deleted | not_found | error
+    @apiSuccess {Number} created Number of created items
+    @apiSuccess {Number} updated Number of updated items
+    @apiSuccess {Number} deleted Number of deleted items
+    @apiSuccess {Number} failed Number of operations that were not applied
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        {
+            "results": [
+                {"index": 0, "op": "create", "id": "6920aee1f761a0627fc146a9", "status": "created"},
+                {"index": 1, "op": "update", "id": "691211b751476ba3fc35b9f5", "status": "updated"},
+                {"index": 2, "op": "delete", "id": "691b7569f13b2b3f70dee895", "status": "not_found"}
+            ],
+            "created": 1, "updated": 1, "deleted": 0, "failed": 1
+        }
+
+    @apiError InvalidOperations At least one operation is invalid
+    @apiErrorExample Error-Response:
+        HTTP/1.1 400 Bad Request
+        {"error": "invalid operations", "errors": [{"index": 1, "error": "malformed id"}]}
+    """
+    from .menu_controller import bulk_menu_items_controller
+    return bulk_menu_items_controller()
+
 @menu_bp.route("/<item_id>", methods =["PUT"])
 def update_menu(item_id):
     """
@@ -135,6 +433,10 @@ def update_menu(item_id):
     @apiVersion 1.0.0
     
     @apiParam {String} id Menu item MongoDB ObjectId
+
+    @apiHeader {String} [If-Match] The item's ETag from GET or a previous PUT
+    (e.g. "691211b751476ba3fc35b9f5-3"); the update only applies if the item
+    has not changed since.
     
     @apiBody {String} [name] Item name
     @apiBody {Number} [price] Item price
@@ -151,16 +453,19 @@ def update_menu(item_id):
     @apiSuccessExample Success-Response:
         HTTP/1.1 200 OK
         {
-            "_id": {"$oid": "691211b751476ba3fc35b9f5"},
+            "id": "691211b751476ba3fc35b9f5",
             "name": "Updated Name",
-            "price": 7.99
+            "price": 7.99,
+            "version": 2
         }
     
     @apiError ItemNotFound Item not found
+    @apiError VersionConflict If-Match ETag no longer matches (412)
     @apiErrorExample Error-Response:
         HTTP/1.1 404 Not Found
         {"error": "Item not found"}
     """
+    from .menu_controller import update_menu_item_controller
     return update_menu_item_controller(item_id)
 
 @menu_bp.route("/<item_id>", methods = ["DELETE"])
@@ -184,4 +489,80 @@ def delete_menu(item_id):
         HTTP/1.1 404 Not Found
         {"error": "Item not found"}
     """
-    return delete_menu_item_controller(item_id)
\ No newline at end of file
+    from .menu_controller import delete_menu_item_controller
+    return delete_menu_item_controller(item_id)
+
+
+@menu_bp.route("/cache/stats", methods=["GET"])
+def get_menu_cache_stats():
+    """
+    @api {get} /menu/cache/stats Get Menu Cache Statistics
+    @apiName GetMenuCacheStats
+    @apiGroup Menu
+    @apiVersion 1.0.0
+
+    @apiSuccess {Number} version Current snapshot version (null if not built)
+    @apiSuccess {Number} items Number of items in the snapshot
+    @apiSuccess {Number} age_seconds Age of the snapshot
+    @apiSuccess {Number} ttl_seconds Configured TTL (MENU_CACHE_TTL)
+    @apiSuccess {Number} hits Reads served from memory
+    @apiSuccess {Number} misses Reads that rebuilt the snapshot from MongoDB
+    @apiSuccess {Number} invalidations Snapshot invalidations caused by writes
+    @apiSuccess {Number} hit_ratio hits / (hits + misses)
+    @apiSuccess {Object} weekday_index Active items per day, rebuilds and patches of the weekday index
+    @apiSuccess {Object} bitset_index Items, rebuilds and patches of the dietary/allergen bitset index
+    @apiSuccess {Object} search_index Items, tokens, rebuilds, patches and queries of the search index
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        {
+            "version": 3,
+            "items": 16,
+            "age_seconds": 12.4,
+            "ttl_seconds": 300.0,
+            "hits": 1520,
+            "misses": 3,
+            "invalidations": 2,
+            "hit_ratio": 0.998
+        }
+    """
+    from .menu_controller import get_menu_cache_stats_controller
+    return get_menu_cache_stats_controller()
+
+
+@menu_bp.route("/admin/indexes", methods=["GET"])
+def get_menu_index_report():
+    """
+    @api {get} /menu/admin/indexes Get Menu Index Usage Report
+    @apiName GetMenuIndexReport
+    @apiGroup Menu
+    @apiVersion 1.0.0
+
+    @apiDescription Runs explain() on each query shape issued by
+    GET /menu and reports whether the winning plan uses an index.
+
+    @apiSuccess {String[]} indexes Index names on the collection
+    @apiSuccess {Object} queries Explain summary per query shape
+    @apiSuccess {String[]} queries.stages Plan stages, root first
+    @apiSuccess {Boolean} queries.uses_index Plan contains an index scan
+    @apiSuccess {Boolean} queries.collection_scan Plan contains a COLLSCAN
+    @apiSuccess {Boolean} queries.in_memory_sort Plan contains a blocking SORT
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        {
+            "indexes": ["_id_", "active_category", "allergens", "days_of_week", "dietary"],
+            "queries": {
+                "day": {
+                    "query": {"day": "monday"},
+                    "stages": ["FETCH", "IXSCAN"],
+                    "indexes": ["days_of_week"],
+                    "uses_index": true,
+                    "collection_scan": false,
+                    "in_memory_sort": false
+                }
+            }
+        }
+    """
+    from .menu_controller import get_menu_index_report_controller
+    return get_menu_index_report_controller()
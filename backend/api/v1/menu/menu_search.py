@@ -0,0 +1,431 @@
+"""In-memory full-text search over the menu (``GET /api/v1/menu/search``).
+
+Text from ``name``, ``description`` and ``ingredients`` is folded (NFKD,
+combining marks dropped, ``casefold()``) and split into word tokens, so
+"Jäätelö" is indexed as "jaatelo" and matches "JAATELO" or "jäätelö".
+
+Scoring: a token in the name weighs 3, in the ingredients 2, in the
+description 1, summed over its occurrences in the item. The last query
+word is matched as a prefix ("lingon" finds "Lingonberry"), as are earlier
+words of ``MIN_INNER_PREFIX`` letters or more; shorter earlier words must
+match a whole token. A word scores the weight of the item's best matching
+token, doubled when the token is the whole word, so whole words rank
+above completions. An item must match all query words and its score is
+the sum over the words.
+
+``SearchIndex`` holds:
+
+- ``postings``: token -> {weight: {item id: None}}, i.e. each token's items
+  grouped by weight, so the best items for a word are read level by level
+  without scoring everything that matches it,
+- ``prefixes``: the same for every one- and two-letter prefix (weighted by
+  the item's best token starting with it), so "s" is one posting list
+  rather than hundreds of completions,
+- ``vocabulary``: every token, sorted, so the tokens starting with a longer
+  prefix are one ``bisect`` range,
+- ``forward``: item id -> {token: weight}, to take an item out of the
+  postings when it changes.
+
+One-word queries (the typeahead case) walk the weight levels of the
+matching tokens from the top and stop after ``limit`` items. Several words
+visit combinations of one level per word, best total first, intersecting
+their item sets with C-level set operations (see ``top_for_terms``).
+
+``suggest(prefix)`` completes the last word of a typeahead query with the
+indexed words that start with it, most common first.
+
+The index is built from the menu snapshot on first use, patched item by
+item from ``menu_events`` and, once older than ``MENU_CACHE_TTL``, rebuilt
+in a background thread while searches keep using the current copy. Builds
+never hold the index lock, so writes are not held up by them; the changes
+that arrive during a build are replayed onto it before it is used.
+"""
+
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from .menu_events import subscribe
+from .menu_model import menu_cache
+
+
+FIELD_WEIGHTS = (("name", 3), ("ingredients", 2), ("description", 1))
+# Longest query accepted, and most query words used.
+MAX_QUERY_LENGTH = 200
+MAX_QUERY_TERMS = 8
+# A one- or two-letter prefix can match a large share of the vocabulary, so
+# prefixes up to this length get postings of their own instead of being
+# expanded into all their completions.
+SHORT_PREFIX = 2
+# Words before the last one only match as prefixes from this length on
+# ("smo salmon" finds "smoked salmon"; "s salmon" needs the word "s").
+MIN_INNER_PREFIX = 3
+# Level combinations a multi-word query may visit before falling back.
+TOP_K_BUDGET = 300
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fold(text):
+    """Case- and diacritic-fold text: "Crème Brûlée" -> "creme brulee"."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def tokenize(text):
+    """Folded word tokens of ``text``."""
+    return _TOKEN_RE.findall(fold(text))
+
+
+def _field_texts(item, field):
+    value = item.get(field)
+    for text in value if isinstance(value, list) else [value]:
+        if isinstance(text, str):
+            yield text
+
+
+def item_tokens(item):
+    """Return ``{token: weight}`` for one menu item."""
+    weights = {}
+    for field, weight in FIELD_WEIGHTS:
+        for text in _field_texts(item, field):
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0) + weight
+    return weights
+
+
+class SearchIndex:
+    """Inverted index with prefix matching, patched on writes.
+
+    Args:
+        snapshot_source (callable): Returns the current ``MenuSnapshot``.
+        ttl (float): Age after which the index is rebuilt in the background.
+    """
+
+    def __init__(self, snapshot_source, ttl=300):
+        self._snapshot_source = snapshot_source
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._first_build = threading.Lock()
+        self._rebuilding = False
+        self._pending = None    # changes seen while a rebuild runs
+        self._built_at = None
+        self.rebuilds = 0
+        self.patches = 0
+        self.queries = 0
+        self._state = _IndexState()
+
+    def _ensure(self):
+        if self._built_at is None:
+            # The first build runs outside ``_lock`` like a background one, so
+            # writes keep going (and are replayed onto it); concurrent first
+            # searches wait for it on ``_first_build`` instead.
+            with self._first_build:
+                if self._built_at is None:
+                    self._start_rebuild()
+                    self._rebuild()
+        elif self.ttl > 0 and time.monotonic() - self._built_at >= self.ttl and not self._rebuilding:
+            self._start_rebuild()
+            threading.Thread(target=self._rebuild, daemon=True).start()
+
+    def _start_rebuild(self):
+        self._rebuilding = True
+        with self._lock:
+            self._pending = []
+
+    def _rebuild(self):
+        # The new state is built outside the lock, from a snapshot that may
+        # predate writes applied meanwhile; those are replayed onto it, in
+        # order, before it replaces the current one.
+        try:
+            state = _IndexState(self._snapshot_source().items)
+            with self._lock:
+                for change in self._pending:
+                    _apply(state, change)
+                self._state = state
+                self._built_at = time.monotonic()
+                self.rebuilds += 1
+        finally:
+            with self._lock:
+                self._pending = None
+            self._rebuilding = False
+
+    @property
+    def vocabulary(self):
+        return self._state.vocabulary
+
+    def apply(self, change):
+        """``menu_events`` listener: re-index one item."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(change)
+            if self._built_at is None:
+                return  # nothing built yet; the first build replays it
+            _apply(self._state, change)
+            self.patches += 1
+
+    def search(self, query, limit=20):
+        """
+        Rank the items matching every word of ``query``.
+
+        Args:
+            query (str): Free text typed by the user.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list[tuple[int, dict]]: ``(score, item)`` pairs, best first.
+        """
+        self._ensure()
+        self.queries += 1
+        words = list(dict.fromkeys(tokenize(query[:MAX_QUERY_LENGTH])))[:MAX_QUERY_TERMS]
+        if not words:
+            return []
+        # The last word is still being typed; earlier ones are complete.
+        terms = [(word, len(word) >= MIN_INNER_PREFIX) for word in words[:-1]] + [(words[-1], True)]
+        with self._lock:
+            state = self._state
+            if len(terms) == 1:
+                best = state.top_for_term(words[0], limit)
+            else:
+                best = state.top_for_terms(terms, limit)
+            return [(score, state.items[item_id]) for item_id, score in best]
+
+    def suggest(self, query, limit=10):
+        """
+        Complete the last word of ``query`` with indexed words, most common first.
+
+        Returns:
+            list[str]: Words as written in the menu (lower case).
+        """
+        self._ensure()
+        terms = tokenize(query[:MAX_QUERY_LENGTH])
+        if not terms:
+            return []
+        with self._lock:
+            state = self._state
+            tokens = state.expand(terms[-1])
+            best = heapq.nsmallest(limit, tokens, key=lambda token: (-state.frequency[token], token))
+            return [state.surface.get(token, token) for token in best]
+
+    def stats(self):
+        state = self._state
+        return {
+            "items": len(state.items),
+            "tokens": len(state.vocabulary),
+            "age_seconds": round(time.monotonic() - self._built_at, 3) if self._built_at is not None else None,
+            "rebuilds": self.rebuilds,
+            "patches": self.patches,
+            "queries": self.queries,
+        }
+
+
+def _apply(state, change):
+    """Re-index the item of one ``MenuChange`` in ``state``."""
+    state.remove(change.item_id)
+    if change.op != "delete":
+        state.add(change.item)
+
+
+class _IndexState:
+    """The index data for one build; mutated only under ``SearchIndex._lock``."""
+
+    def __init__(self, items=()):
+        self.items = {}
+        self.postings = {}
+        self.prefixes = {}      # short prefix -> {weight: {item id: None}}
+        self.frequency = {}     # token -> number of items containing it
+        self.forward = {}
+        self.surface = {}       # token -> the word as written, for suggestions
+        self.vocabulary = []
+        for item in items:
+            self.add(item, sort=False)
+        self.vocabulary = sorted(self.postings)
+
+    def add(self, item, sort=True):
+        item_id = item["id"]
+        weights = item_tokens(item)
+        self.items[item_id] = item
+        self.forward[item_id] = weights
+        for token, weight in weights.items():
+            levels = self.postings.get(token)
+            if levels is None:
+                levels = self.postings[token] = {}
+                self.frequency[token] = 0
+                if sort:
+                    self.vocabulary.insert(bisect_left(self.vocabulary, token), token)
+            level = levels.get(weight)
+            if level is None:
+                level = levels[weight] = {}
+            level[item_id] = None
+            self.frequency[token] += 1
+        for prefix, weight in _short_prefixes(weights).items():
+            self.prefixes.setdefault(prefix, {}).setdefault(weight, {})[item_id] = None
+        for field, _ in FIELD_WEIGHTS:
+            for text in _field_texts(item, field):
+                for word in _TOKEN_RE.findall(text.lower()):
+                    if word not in self.surface:
+                        self.surface.setdefault(fold(word), word)
+
+    def remove(self, item_id):
+        weights = self.forward.pop(item_id, None)
+        self.items.pop(item_id, None)
+        for token, weight in (weights or {}).items():
+            levels = self.postings[token]
+            level = levels[weight]
+            del level[item_id]
+            if not level:
+                del levels[weight]
+            self.frequency[token] -= 1
+            if not levels:
+                del self.postings[token]
+                del self.frequency[token]
+                self.surface.pop(token, None)
+                position = bisect_left(self.vocabulary, token)
+                if position < len(self.vocabulary) and self.vocabulary[position] == token:
+                    del self.vocabulary[position]
+        for prefix, weight in _short_prefixes(weights or {}).items():
+            levels = self.prefixes[prefix]
+            del levels[weight][item_id]
+            if not levels[weight]:
+                del levels[weight]
+            if not levels:
+                del self.prefixes[prefix]
+
+    def expand(self, prefix):
+        """Tokens starting with ``prefix``, in order."""
+        vocabulary = self.vocabulary
+        start = bisect_left(vocabulary, prefix)
+        end = bisect_left(vocabulary, prefix + "\U0010ffff", start)
+        return vocabulary[start:end]
+
+    def matching_tokens(self, term, prefix=True):
+        """
+        Tokens a query word matches: its completions, or only itself when
+        ``prefix`` is off. ``None`` stands for "every token starting with
+        ``term``" when ``term`` is a short prefix with postings of its own.
+        """
+        if not prefix:
+            return [term] if term in self.postings else []
+        if len(term) <= SHORT_PREFIX:
+            return None
+        return self.expand(term)
+
+    def _levels(self, term, tokens):
+        """``[(score, {item id: None}), ...]`` of ``tokens``, best score first."""
+        levels = []
+        if tokens is None:
+            levels.extend(self.prefixes.get(term, {}).items())
+            tokens = [term] if term in self.postings else []
+        for token in tokens:
+            factor = 2 if token == term else 1
+            levels.extend((weight * factor, ids) for weight, ids in self.postings[token].items())
+        levels.sort(key=lambda level: -level[0])
+        return levels
+
+    def top_for_term(self, term, limit, prefix=True):
+        """Best ``limit`` ``(item id, score)`` for one word, reading levels from the top."""
+        best, seen = [], set()
+        for score, ids in self._levels(term, self.matching_tokens(term, prefix)):
+            for item_id in ids:
+                if item_id not in seen:
+                    seen.add(item_id)
+                    best.append((item_id, score))
+                    if len(best) == limit:
+                        return best
+        return best
+
+    @staticmethod
+    def _term_scores(levels):
+        scores = {}
+        for score, ids in reversed(levels):
+            scores.update(dict.fromkeys(ids, score))
+        return scores
+
+    def top_for_terms(self, terms, limit):
+        """Best ``limit`` ``(item id, score)`` matching all of ``terms``.
+
+        Args:
+            terms (list[tuple[str, bool]]): ``(word, match as prefix)`` pairs.
+            limit (int): Maximum number of results.
+
+        Each word's items come in weight levels, so a combination of one
+        level per word has a known total score, and the items it holds are
+        one C-level intersection of the levels' key views. Combinations are
+        visited best total first (a heap over level positions); an item's
+        first combination is its best one, so the first ``limit`` new items
+        are the answer and no matching item is scored in Python code.
+        When the words rarely occur together many combinations come up
+        empty; after ``TOP_K_BUDGET`` of them the rarest word's items are
+        intersected with the other words' levels instead.
+        """
+        words = []
+        for term, prefix in terms:
+            levels = self._levels(term, self.matching_tokens(term, prefix))
+            if not levels:
+                return []
+            words.append(levels)
+        words.sort(key=lambda levels: sum(len(ids) for _, ids in levels))
+
+        start = (0,) * len(words)
+        pending = [(-sum(levels[0][0] for levels in words), start)]
+        queued = {start}
+        best, seen = [], set()
+        for _ in range(TOP_K_BUDGET):
+            if not pending:
+                return best
+            total, combination = heapq.heappop(pending)
+            keys = sorted((words[n][level][1].keys() for n, level in enumerate(combination)), key=len)
+            hits = keys[0] & keys[1]
+            for other in keys[2:]:
+                if not hits:
+                    break
+                hits &= other
+            for item_id in sorted(hits - seen):
+                seen.add(item_id)
+                best.append((item_id, -total))
+                if len(best) == limit:
+                    return best
+            for n, level in enumerate(combination):
+                if level + 1 < len(words[n]):
+                    following = combination[:n] + (level + 1,) + combination[n + 1:]
+                    if following not in queued:
+                        queued.add(following)
+                        heapq.heappush(pending, (total + words[n][level][0] - words[n][level + 1][0], following))
+
+        # Candidates are the items of the rarest word; each other word keeps
+        # the ones found in its levels (best level first, so each survivor
+        # gets that word's best score).
+        totals = self._term_scores(words[0])
+        for levels in words[1:]:
+            remaining, matched = set(totals), {}
+            for score, ids in levels:
+                hits = remaining & ids.keys()
+                if hits:
+                    remaining -= hits
+                    matched.update({item_id: totals[item_id] + score for item_id in hits})
+                    if not remaining:
+                        break
+            if not matched:
+                return []
+            totals = matched
+        return heapq.nsmallest(limit, totals.items(), key=lambda entry: (-entry[1], entry[0]))
+
+
+def _short_prefixes(weights):
+    """``{prefix: weight}``: the best weight among the tokens starting with each short prefix."""
+    best = {}
+    for token, weight in weights.items():
+        for length in range(1, min(len(token), SHORT_PREFIX) + 1):
+            prefix = token[:length]
+            if weight > best.get(prefix, 0):
+                best[prefix] = weight
+    return best
+
+
+search_index = SearchIndex(menu_cache.get, ttl=menu_cache.ttl)
+subscribe(search_index.apply)
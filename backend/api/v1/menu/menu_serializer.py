@@ -0,0 +1,50 @@
+"""Wire-format serialization for menu items.
+
+Menu items are projected straight from raw MongoDB documents (as returned
+by ``QuerySet.as_pymongo()``) into the JSON shape the API sends, then
+encoded to bytes once. This replaces the old
+``to_json() -> json.loads() -> jsonify()`` round trip, which walked the
+data three times and built a throwaway dict tree on every request.
+
+Wire format of an item:
+    {"id": "691211b751476ba3fc35b9f5", "name": "Aurora Bites", "price": 5.5, ...}
+
+``id`` is the ObjectId as a string; there is no ``_id.$oid`` wrapper.
+"""
+
+import json
+
+# Compact separators: no whitespace on the wire.
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def project_item(raw, fields):
+    """
+    Project a raw MongoDB document into the API wire format.
+
+    Args:
+        raw (dict): Document as stored in MongoDB (with ``_id``).
+        fields (Iterable[str]): Document fields to copy, in output order.
+                                Fields missing from ``raw`` are skipped.
+
+    Returns:
+        dict: ``{"id": <str>, <field>: <value>, ...}``
+    """
+    item = {"id": str(raw["_id"])}
+    for field in fields:
+        if field in raw:
+            item[field] = raw[field]
+    return item
+
+
+def encode_json(obj):
+    """
+    Encode a wire-format object (item or list of items) to UTF-8 JSON bytes.
+
+    Args:
+        obj (dict | list): Value produced by ``project_item`` (or a list of them).
+
+    Returns:
+        bytes: Compact JSON document.
+    """
+    return _encoder.encode(obj).encode("utf-8")
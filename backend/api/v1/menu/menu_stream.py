@@ -0,0 +1,364 @@
+"""Live menu changes for ``GET /api/v1/menu/stream`` (Server-Sent Events).
+
+``MenuChangeBroker`` turns every menu write into one compact event::
+
+    id: 3f9a0c1e-42
+    event: change
+    data: {"op":"update","id":"6912...","version":4,"fields":{"active":false}}
+
+- ``create``: ``fields`` holds the whole item,
+- ``update``: only the fields the write set, plus the new ``version``,
+- ``delete``: just the id.
+
+Each event is encoded once and kept in a ring of the last
+``MENU_STREAM_BACKLOG`` events (default 256); open streams read from the
+ring, nothing is queued or copied per client. A browser that reconnects
+sends the last id it saw (``Last-Event-ID``) and gets the events it
+missed. When those have left the ring, or the id comes from another
+worker process (ids start with a per-process prefix), it gets a ``reset``
+event instead and reloads the menu.
+
+Connections:
+
+- Under ASGI (``asgi.py``) a stream is a coroutine waiting on a single
+  future per event loop, which a write resolves once. Thousands of idle
+  streams cost no threads; a write costs one ``call_soon_threadsafe``
+  per loop plus one wake-up per stream.
+- Under WSGI (``app.py``) an open stream would hold a worker thread, and
+  a few of them stall a server with sync workers. So by default
+  (``MENU_STREAM_WSGI=poll``) the response carries the events the client
+  missed and a ``retry:`` of ``MENU_STREAM_POLL_SECONDS`` (default 30) and
+  ends: the browser reconnects then, polling. ``MENU_STREAM_WSGI=hold``
+  keeps streams open, all waiting on one shared ``Condition``; only for
+  threaded or gevent workers. The menu page subscribes only when served
+  by ``asgi.py`` (``MENU_STREAM_LIVE``).
+- A comment line every ``MENU_STREAM_HEARTBEAT`` seconds (default 15)
+  keeps proxies from closing idle streams and lets WSGI servers notice
+  clients that are gone. ``MENU_STREAM_MAX_CLIENTS`` (default 1000) caps
+  the streams per process; more are answered with ``503``.
+
+Where the changes come from (``MENU_STREAM_SOURCE``):
+
+- ``events`` (default): the in-process ``menu_events`` notifications, so
+  a stream sees the writes made by its own worker process only.
+- ``change_stream``: a MongoDB change stream on the menu collection,
+  watched by one thread per process, so every stream sees every write
+  whichever worker made it. Needs a replica set (a single-node one is
+  enough).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from pymongo.errors import PyMongoError
+
+from .menu_events import MenuChange, subscribe
+from .menu_model import MenuItem, WIRE_FIELDS
+from .menu_serializer import encode_json, project_item
+
+
+MENU_STREAM_BACKLOG = int(os.getenv("MENU_STREAM_BACKLOG", "256"))
+MENU_STREAM_HEARTBEAT = float(os.getenv("MENU_STREAM_HEARTBEAT", "15"))
+MENU_STREAM_MAX_CLIENTS = int(os.getenv("MENU_STREAM_MAX_CLIENTS", "1000"))
+MENU_STREAM_SOURCE = os.getenv("MENU_STREAM_SOURCE", "events")
+MENU_STREAM_WSGI = os.getenv("MENU_STREAM_WSGI", "poll")
+MENU_STREAM_POLL_SECONDS = float(os.getenv("MENU_STREAM_POLL_SECONDS", "30"))
+
+# Browsers wait this long (ms) before reconnecting a dropped stream.
+RETRY_MS = 3000
+
+PING = b": ping\n\n"
+
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache, no-transform",
+    # Stops nginx from buffering the stream.
+    "X-Accel-Buffering": "no",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def change_event(change):
+    """
+    Build the compact event of one ``MenuChange``.
+
+    Returns:
+        dict: ``{"op", "id"}`` plus ``"version"`` and ``"fields"`` unless
+              the item was deleted.
+    """
+    event = {"op": change.op, "id": change.item_id}
+    if change.op == "delete" or change.item is None:
+        return event
+    item = change.item
+    event["version"] = item.get("version")
+    if change.op == "create" or change.fields is None:
+        event["fields"] = {name: value for name, value in item.items() if name not in ("id", "version")}
+    else:
+        event["fields"] = {name: item.get(name) for name in change.fields}
+    return event
+
+
+class MenuChangeBroker:
+    """Fan-out of menu change events to any number of open streams.
+
+    Args:
+        backlog (int): Events kept for clients that reconnect.
+        heartbeat (float): Seconds between keep-alive comments.
+        max_clients (int): Open streams allowed in this process.
+    """
+
+    def __init__(self, backlog=256, heartbeat=15, max_clients=1000):
+        self.heartbeat = heartbeat
+        self.max_clients = max_clients
+        # Event ids are "<prefix>-<seq>"; the prefix tells a reconnecting
+        # client's id apart from another process's.
+        self.prefix = os.urandom(4).hex()
+        self._events = deque(maxlen=backlog)   # (seq, encoded frame)
+        self._seq = 0
+        self._condition = threading.Condition()
+        self._waiters = {}   # event loop -> future resolved by the next event
+        self.clients = 0
+        self.published = 0
+        self.resets = 0
+        self.polls = 0
+
+    def on_change(self, change):
+        """``menu_events`` listener."""
+        self.publish(change_event(change))
+
+    def publish(self, event):
+        """Append one event to the ring and wake every open stream."""
+        data = encode_json(event).decode("utf-8")
+        with self._condition:
+            self._seq += 1
+            frame = f"id: {self.prefix}-{self._seq}\nevent: change\ndata: {data}\n\n".encode("utf-8")
+            self._events.append((self._seq, frame))
+            self.published += 1
+            self._condition.notify_all()
+            loops = list(self._waiters)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._wake, loop)
+            except RuntimeError:
+                # The loop was closed without its streams ending.
+                self._waiters.pop(loop, None)
+
+    def _wake(self, loop):
+        # Runs on ``loop``: resolve the future its streams wait on and
+        # install a fresh one for the next event.
+        future = self._waiters.get(loop)
+        if future is not None:
+            self._waiters[loop] = loop.create_future()
+            future.set_result(None)
+
+    def _waiter(self, loop):
+        future = self._waiters.get(loop)
+        if future is None:
+            with self._condition:
+                future = self._waiters[loop] = loop.create_future()
+        return future
+
+    def accepting(self):
+        return self.clients < self.max_clients
+
+    def _resume(self, last_event_id, retry_ms=RETRY_MS):
+        """
+        Return ``(seq, first chunk)`` for a new stream: the events after
+        ``last_event_id``, or a ``reset`` event when they are not known.
+        """
+        chunk = f"retry: {retry_ms}\n\n".encode("utf-8")
+        with self._condition:
+            if not last_event_id:
+                return self._seq, chunk
+            prefix, _, seq = last_event_id.strip().rpartition("-")
+            if prefix == self.prefix and seq.isdigit() and int(seq) <= self._seq:
+                frames, seq = self._after(int(seq))
+                if frames is not None:
+                    return seq, chunk + frames
+            return self._seq, chunk + self._reset()
+
+    def _after(self, seq):
+        """Frames of the events after ``seq`` (caller holds the lock), or None if they left the ring."""
+        if seq == self._seq:
+            return b"", seq
+        if not self._events or self._events[0][0] > seq + 1:
+            return None, self._seq
+        return b"".join(frame for number, frame in self._events if number > seq), self._seq
+
+    def _reset(self):
+        # Also moves the client's Last-Event-ID forward, so its next
+        # reconnect resumes from here.
+        self.resets += 1
+        return f"id: {self.prefix}-{self._seq}\nevent: reset\ndata: {{}}\n\n".encode("utf-8")
+
+    def _next(self, seq):
+        """Return ``(chunk, seq)`` with what a stream at ``seq`` has not sent yet (``b""`` if nothing)."""
+        with self._condition:
+            frames, seq = self._after(seq)
+            if frames is None:
+                frames = self._reset()
+            return frames, seq
+
+    def poll(self, last_event_id=None, retry_ms=RETRY_MS):
+        """
+        WSGI body of a stream that ends right away: the events after
+        ``last_event_id``, a ``retry:`` telling the browser when to
+        reconnect, and the current id, which the browser sends back as
+        ``Last-Event-ID`` then. Holds no thread.
+
+        Args:
+            last_event_id (str | None): The client's ``Last-Event-ID`` header.
+            retry_ms (int): Reconnect delay for the browser.
+        """
+        self.polls += 1
+        seq, chunk = self._resume(last_event_id, retry_ms)
+        # An id with no data moves Last-Event-ID without firing an event.
+        return chunk + f"id: {self.prefix}-{seq}\n\n".encode("utf-8")
+
+    def _connected(self, delta):
+        with self._condition:
+            self.clients += delta
+
+    def stream(self, last_event_id=None):
+        """
+        WSGI body of one stream: yields event frames as they are published.
+
+        Args:
+            last_event_id (str | None): The client's ``Last-Event-ID`` header.
+        """
+        self._connected(1)
+        try:
+            seq, chunk = self._resume(last_event_id)
+            yield chunk
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._seq != seq, timeout=self.heartbeat)
+                chunk, seq = self._next(seq)
+                yield chunk or PING
+        finally:
+            self._connected(-1)
+
+    async def serve_asgi(self, scope, receive, send, last_event_id=None):
+        """
+        ASGI response of one stream, for ``asgi.py``.
+
+        Args:
+            scope, receive, send: The ASGI connection.
+            last_event_id (str | None): The client's ``Last-Event-ID`` header.
+        """
+        headers = [(b"content-type", b"text/event-stream; charset=utf-8")]
+        headers += [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in STREAM_HEADERS.items()]
+        if not self.accepting():
+            await send({"type": "http.response.start", "status": 503,
+                        "headers": [(b"content-type", b"application/json"), (b"retry-after", b"5")]})
+            await send({"type": "http.response.body", "body": b'{"error":"Too many open menu streams"}\n'})
+            return
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        loop = asyncio.get_running_loop()
+        disconnected = loop.create_task(_disconnect(receive))
+        self._connected(1)
+        try:
+            seq, chunk = self._resume(last_event_id)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            while not disconnected.done():
+                waiter = self._waiter(loop)
+                if self._seq == seq:
+                    await asyncio.wait((waiter, disconnected), timeout=self.heartbeat,
+                                       return_when=asyncio.FIRST_COMPLETED)
+                    if disconnected.done():
+                        break
+                chunk, seq = self._next(seq)
+                await send({"type": "http.response.body", "body": chunk or PING, "more_body": True})
+        except OSError:
+            pass   # the client went away mid-send
+        finally:
+            self._connected(-1)
+            disconnected.cancel()
+
+    def stats(self):
+        return {
+            "clients": self.clients,
+            "published": self.published,
+            "resets": self.resets,
+            "polls": self.polls,
+            "backlog": len(self._events),
+            "source": MENU_STREAM_SOURCE,
+        }
+
+
+async def _disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def _change_stream_event(event):
+    """Compact event of one MongoDB change stream document, or None to skip it."""
+    operation = event["operationType"]
+    if operation == "delete":
+        return {"op": "delete", "id": str(event["documentKey"]["_id"])}
+    document = event.get("fullDocument")
+    if document is None or operation not in ("insert", "update", "replace"):
+        # Deleted again before the lookup, or not a document change.
+        return None
+    item = project_item(document, WIRE_FIELDS)
+    fields = None
+    if operation == "update":
+        updated = event["updateDescription"]
+        names = {name.split(".", 1)[0] for name in list(updated["updatedFields"]) + updated["removedFields"]}
+        fields = [name for name in WIRE_FIELDS if name in names and name != "version"]
+    op = "create" if operation == "insert" else "update"
+    return change_event(MenuChange(op, item["id"], item, fields))
+
+
+def watch_change_stream(broker):
+    """
+    Publish the menu collection's change stream into ``broker``; runs forever.
+
+    Reconnects after errors, resuming after the last event seen.
+    """
+    resume_token = None
+    while True:
+        try:
+            with MenuItem._get_collection().watch(full_document="updateLookup",
+                                                  resume_after=resume_token) as changes:
+                for change in changes:
+                    resume_token = changes.resume_token
+                    event = _change_stream_event(change)
+                    if event is not None:
+                        broker.publish(event)
+        except PyMongoError:
+            logger.exception("menu change stream failed; reconnecting")
+            time.sleep(1)
+
+
+menu_stream = MenuChangeBroker(MENU_STREAM_BACKLOG, MENU_STREAM_HEARTBEAT, MENU_STREAM_MAX_CLIENTS)
+if MENU_STREAM_SOURCE != "change_stream":
+    subscribe(menu_stream.on_change)
+
+_watcher_pid = None
+_watcher_lock = threading.Lock()
+
+
+def start_menu_stream():
+    """
+    Start the change stream thread when ``MENU_STREAM_SOURCE=change_stream``.
+
+    Safe to call on every request: the thread is started once per
+    process, also after a fork.
+    """
+    global _watcher_pid
+    if MENU_STREAM_SOURCE != "change_stream" or _watcher_pid == os.getpid():
+        return
+    with _watcher_lock:
+        if _watcher_pid != os.getpid():
+            threading.Thread(target=watch_change_stream, args=(menu_stream,),
+                             name="menu-change-stream", daemon=True).start()
+            _watcher_pid = os.getpid()
@@ -0,0 +1,181 @@
+"""Weekday -> items index behind ``/api/v1/menu/today`` and ``?day=``.
+
+Every item lists the days it is served in ``days_of_week`` (stored as
+"monday" or "Monday"). Instead of filtering the whole menu on each request,
+``WeekdayIndex`` keeps, for each weekday, the items served that day, and
+separately the active ones among them, keyed by id. A lookup touches only
+the items it returns; the encoded JSON body and its ETag are cached per
+(day, active) until a write changes that day.
+
+Keeping it current:
+
+- Built from the menu snapshot (``menu_cache``) on first use.
+- Patched item by item from ``menu_events`` when this process writes an
+  item: the item is removed from every day and re-added to the days it now
+  lists, so only the affected days are touched.
+- Rebuilt from the snapshot once older than ``MENU_CACHE_TTL`` so writes
+  made by other worker processes show up as well.
+
+"Today" is computed in the restaurant's time zone, ``RESTAURANT_TIMEZONE``
+(an IANA name such as ``Europe/Helsinki``; default ``UTC``).
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+from .menu_cache import content_etag
+from .menu_events import subscribe
+from .menu_model import WEEKDAYS, menu_cache
+from .menu_serializer import encode_json
+
+
+def restaurant_timezone(name):
+    """Return the tzinfo for an IANA zone name, falling back to UTC."""
+    if name.upper() == "UTC":
+        return timezone.utc
+    if ZoneInfo is None:
+        print(f"zoneinfo is unavailable; RESTAURANT_TIMEZONE={name} ignored, using UTC")
+        return timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        # On Windows the zone database comes from the "tzdata" package.
+        print(f"Unknown time zone RESTAURANT_TIMEZONE={name}; using UTC (pip install tzdata?)")
+        return timezone.utc
+
+
+RESTAURANT_TIMEZONE = os.getenv("RESTAURANT_TIMEZONE", "UTC")
+RESTAURANT_TZ = restaurant_timezone(RESTAURANT_TIMEZONE)
+
+
+def today_name(now=None):
+    """Lower-case weekday name of ``now`` (default: the current time) in the restaurant's zone."""
+    now = now or datetime.now(timezone.utc)
+    return WEEKDAYS[now.astimezone(RESTAURANT_TZ).weekday()]
+
+
+_WEEKDAY_SET = frozenset(WEEKDAYS)
+
+
+def item_days(item):
+    """Weekdays an item lists, lower-cased; unknown names are ignored."""
+    days = item.get("days_of_week") or ()
+    return {day.strip().lower() for day in days if isinstance(day, str)} & _WEEKDAY_SET
+
+
+class WeekdayIndex:
+    """Items per weekday, patched on writes and rebuilt after ``ttl`` seconds.
+
+    Args:
+        snapshot_source (callable): Returns the current ``MenuSnapshot``.
+        ttl (float): Maximum age of the index before a full rebuild.
+    """
+
+    def __init__(self, snapshot_source, ttl=300):
+        self._snapshot_source = snapshot_source
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._all = None        # day -> {item id: item}
+        self._active = None     # day -> {item id: item}, active items only
+        # (day, active_only) -> (bucket it was encoded from, payload, etag)
+        self._payloads = {}
+        self._built_at = 0.0
+        self.rebuilds = 0
+        self.patches = 0
+
+    def _fresh(self):
+        return self._all is not None and self.ttl > 0 and time.monotonic() - self._built_at < self.ttl
+
+    def _rebuild(self):
+        snapshot = self._snapshot_source()
+        every = {day: {} for day in WEEKDAYS}
+        active = {day: {} for day in WEEKDAYS}
+        for item in snapshot.items:
+            for day in item_days(item):
+                every[day][item["id"]] = item
+                if item.get("active"):
+                    active[day][item["id"]] = item
+        self._all, self._active, self._payloads = every, active, {}
+        self._built_at = time.monotonic()
+        self.rebuilds += 1
+
+    def _ensure(self):
+        if not self._fresh():
+            with self._lock:
+                if not self._fresh():
+                    self._rebuild()
+
+    def _bucket(self, day, active_only):
+        self._ensure()
+        return (self._active if active_only else self._all)[day]
+
+    def items(self, day, active_only=True):
+        """
+        Return the items served on ``day``, ordered by id.
+
+        Args:
+            day (str): Lower-case weekday name.
+            active_only (bool): Leave out inactive items.
+
+        Returns:
+            list[dict]: Items in wire format.
+        """
+        bucket = self._bucket(day, active_only)
+        return [bucket[item_id] for item_id in sorted(bucket)]
+
+    def payload(self, day, active_only=True):
+        """Return ``(json_bytes, etag)`` for ``items(day, active_only)``, cached until the day changes."""
+        key = (day, active_only)
+        bucket = self._bucket(day, active_only)
+        entry = self._payloads.get(key)
+        if entry is None or entry[0] is not bucket:
+            payload = encode_json([bucket[item_id] for item_id in sorted(bucket)])
+            entry = (bucket, payload, content_etag(payload))
+            self._payloads[key] = entry
+        return entry[1], entry[2]
+
+    def apply(self, change):
+        """``menu_events`` listener: move one item between the day buckets."""
+        with self._lock:
+            if self._all is None:
+                return  # nothing built yet; the first read loads everything
+            item = change.item
+            days = item_days(item) if item is not None else set()
+            for day in WEEKDAYS:
+                listed = day in days
+                self._patch(self._all, day, change.item_id, item if listed else None)
+                self._patch(self._active, day, change.item_id, item if listed and item.get("active") else None)
+            self.patches += 1
+
+    @staticmethod
+    def _patch(buckets, day, item_id, item):
+        # Buckets are never mutated in place: readers iterate them without
+        # the lock, and a cached payload stays valid while its bucket does.
+        bucket = buckets[day]
+        if item is None:
+            if item_id not in bucket:
+                return
+            bucket = dict(bucket)
+            del bucket[item_id]
+        else:
+            bucket = {**bucket, item_id: item}
+        buckets[day] = bucket
+
+    def stats(self):
+        return {
+            "days": {day: len(self._active[day]) for day in WEEKDAYS} if self._all is not None else None,
+            "age_seconds": round(time.monotonic() - self._built_at, 3) if self._all is not None else None,
+            "rebuilds": self.rebuilds,
+            "patches": self.patches,
+        }
+
+
+weekday_index = WeekdayIndex(menu_cache.get, ttl=menu_cache.ttl)
+subscribe(weekday_index.apply)
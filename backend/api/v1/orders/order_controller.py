@@ -0,0 +1,119 @@
+"""Controller helpers for the cart and orders JSON API.
+
+These functions are thin wrappers around the model and the write-behind
+queue and return (response, status) tuples. They are invoked by the
+Flask route functions in ``order_routes.py``.
+"""
+
+from flask import request
+from mongoengine import ValidationError
+
+from .order_model import price_cart, new_order, serialize_order
+from .order_queue import order_queue, OrderQueueFull
+
+
+def _read_cart():
+    """Return the request body and its priced cart.
+
+    Raises:
+        ValueError: If the body is not an object with an ``items`` array.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        raise ValueError("body must be an object with an items array")
+    priced, errors = price_cart(data.get("items"))
+    return data, priced, errors
+
+
+def price_cart_controller():
+    """
+    Controller: POST /api/v1/cart
+
+    Prices a cart from the current menu without saving anything.
+
+    Process:
+    1. Check the body is ``{"items": [...]}`` with at most CART_MAX_LINES lines
+    2. Price all lines with one database query (see ``price_cart``)
+    3. Return the priced lines, the total and the per-line errors with
+       HTTP 200; ``valid`` tells whether the cart can be ordered as is
+
+    Request body example:
+        {"items": [{"id": "691211b751476ba3fc35b9f5", "quantity": 2}]}
+
+    Returns:
+        tuple: (response dict, HTTP status code)
+               - (priced cart, 200)
+               - (error dict, 400) if the body is malformed
+
+    Example responses:
+        Success (200): {"lines": [{"item_id": "...", "name": "Aurora Bites", "unit_price": 5.5,
+                                   "quantity": 2, "line_total": 11.0}],
+                        "total": 11.0, "valid": true, "errors": []}
+        Error (400): {"error": "items must be a non-empty array"}
+    """
+    try:
+        _, priced, errors = _read_cart()
+    except ValueError as e:
+        return {"error": str(e)},400
+    return dict(priced, valid=not errors, errors=errors),200
+
+
+def create_order_controller():
+    """
+    Controller: POST /api/v1/orders
+
+    Prices the cart like ``POST /api/v1/cart`` and, if every line is
+    valid, queues the order for writing (see ``order_queue.py``). The
+    order id is returned right away; the database write follows within
+    ORDER_FLUSH_INTERVAL_MS or so, in a batch with other orders.
+
+    Process:
+    1. Price the cart; if the body or any line is invalid, return 400
+       listing the errors and queue nothing
+    2. Build the order document (id and timestamps assigned here)
+    3. Journal and queue it; if the queue is full, return 503 with
+       Retry-After
+    4. Return the order with HTTP 202
+
+    Request body example:
+        {
+            "items": [{"id": "691211b751476ba3fc35b9f5", "quantity": 2}],
+            "customer_name": "Aino",
+            "note": "No onions please"
+        }
+
+    Returns:
+        tuple: (response dict, HTTP status code[, headers])
+               - (order JSON, 202) if the order was accepted
+               - (error dict, 400) if the body or a line is invalid
+               - (error dict, 503) with Retry-After if the queue is full
+
+    Example responses:
+        Accepted (202): {"id": "...", "status": "received", "lines": [...], "total": 11.0, ...}
+        Error (400): {"error": "invalid cart", "errors": [{"index": 0, "id": "...", "error": "item not found"}]}
+        Error (503): {"error": "too many orders right now, please retry"}
+    """
+    try:
+        data, priced, errors = _read_cart()
+        if errors:
+            return {"error": "invalid cart", "errors": errors},400
+        document = new_order(priced, data)
+    except (ValueError, ValidationError) as e:
+        return {"error": str(e)},400
+
+    try:
+        order_queue.submit(document)
+    except OrderQueueFull as e:
+        return {"error": "too many orders right now, please retry"},503,{"Retry-After": str(e.retry_after)}
+
+    return serialize_order(document),202
+
+
+def get_order_queue_stats_controller():
+    """
+    Controller: GET /api/v1/orders/queue/stats
+
+    Returns:
+        tuple: (write-behind queue depth and counters, 200)
+    """
+    return order_queue.stats(),200
@@ -0,0 +1,248 @@
+"""Order model and cart pricing for the orders API.
+
+- ``price_cart(lines)`` validates cart lines and prices them against
+  ``MenuItem`` with a single ``$in`` query, whatever the number of lines.
+- ``new_order(priced, ...)`` builds the MongoDB document of an order; it
+  is written later, in a batch, by the write-behind queue
+  (``order_queue.py``) through ``insert_orders``.
+
+Prices always come from the database: the prices a browser keeps in its
+``localStorage`` cart are ignored.
+"""
+
+import datetime
+import os
+
+from bson import ObjectId
+from mongoengine import (
+    Document, EmbeddedDocument, EmbeddedDocumentField, DateTimeField, FloatField, IntField,
+    ListField, ObjectIdField, StringField,
+)
+from pymongo.errors import BulkWriteError
+
+from api.v1.menu.menu_model import MenuItem
+
+
+ORDER_STATUSES = ["received", "preparing", "ready", "served", "cancelled"]
+
+# Largest cart accepted (distinct items) and largest quantity per line.
+CART_MAX_LINES = int(os.getenv("CART_MAX_LINES", "50"))
+CART_MAX_QUANTITY = int(os.getenv("CART_MAX_QUANTITY", "99"))
+
+# Longest free-text customer name / note kept on an order.
+ORDER_TEXT_MAX = 500
+
+# MongoDB duplicate key error: the order was already written (journal replay).
+DUPLICATE_KEY = 11000
+
+
+class OrderLine(EmbeddedDocument):
+    """One priced cart line, frozen at the price charged when the order was placed."""
+
+    item_id = ObjectIdField(required=True)
+    name = StringField(required=True)
+    unit_price = FloatField(required=True)
+    quantity = IntField(required=True, min_value=1)
+    line_total = FloatField(required=True)
+
+
+class Order(Document):
+
+    lines = ListField(EmbeddedDocumentField(OrderLine), required=True)
+    total = FloatField(required=True)
+    status = StringField(required=True, choices=ORDER_STATUSES, default="received")
+    customer_name = StringField(max_length=ORDER_TEXT_MAX)
+    note = StringField(max_length=ORDER_TEXT_MAX)
+    created_at = DateTimeField(required=True)
+
+    # The kitchen lists open orders oldest first.
+    meta = {
+        "indexes": [
+            {"fields": ["status", "created_at"], "name": "status_created_at"},
+        ],
+    }
+
+
+def _money(value):
+    return round(value + 0.0, 2)
+
+
+def price_cart(lines):
+    """
+    Validate cart lines and price them from the menu in one query.
+
+    Lines for the same item are merged (their quantities added up). The
+    prices, names and availability of all items are read with a single
+    ``find({"_id": {"$in": [...]}})`` instead of one lookup per line.
+
+    Args:
+        lines (list[dict]): ``[{"id": "<MenuItem ObjectId>", "quantity": 2}, ...]``,
+            the shape of the items ``cart.js`` stores (extra keys are ignored).
+
+    Returns:
+        tuple: (priced, errors)
+               - priced (dict): ``{"lines": [{"item_id", "name", "unit_price",
+                 "quantity", "line_total"}, ...], "total": float}`` for the
+                 valid lines, in cart order
+               - errors (list[dict]): ``{"index": i, "id": ..., "error": "..."}``
+                 for every invalid line (empty when the cart is valid)
+
+    Raises:
+        ValueError: If ``lines`` is not a non-empty list of at most
+            CART_MAX_LINES entries.
+
+    Example:
+        priced, errors = price_cart([{"id": "691211b751476ba3fc35b9f5", "quantity": 2}])
+        # priced == {"lines": [{"item_id": "6912...", "name": "Aurora Bites", "unit_price": 5.5,
+        #                       "quantity": 2, "line_total": 11.0}], "total": 11.0}
+    """
+    if not isinstance(lines, list) or not lines:
+        raise ValueError("items must be a non-empty array")
+    if len(lines) > CART_MAX_LINES:
+        raise ValueError(f"too many items (max {CART_MAX_LINES})")
+
+    errors = []
+    quantities = {}   # ObjectId -> (first index, quantity); dicts keep cart order
+    for index, line in enumerate(lines):
+        item_id = line.get("id") if isinstance(line, dict) else None
+        quantity = line.get("quantity", 1) if isinstance(line, dict) else None
+        if not isinstance(item_id, str) or not ObjectId.is_valid(item_id):
+            errors.append({"index": index, "id": item_id, "error": "malformed id"})
+            continue
+        # bool is an int subclass; "quantity": true is not a quantity.
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or not 1 <= quantity <= CART_MAX_QUANTITY:
+            errors.append({"index": index, "id": item_id,
+                           "error": f"quantity must be an integer between 1 and {CART_MAX_QUANTITY}"})
+            continue
+        key = ObjectId(item_id)
+        first, previous = quantities.get(key, (index, 0))
+        quantities[key] = (first, previous + quantity)
+
+    menu = {}
+    if quantities:
+        menu = {
+            raw["_id"]: raw
+            for raw in MenuItem._get_collection().find(
+                {"_id": {"$in": list(quantities)}}, {"name": 1, "price": 1, "active": 1},
+            )
+        }
+
+    priced_lines = []
+    for item_id, (index, quantity) in quantities.items():
+        raw = menu.get(item_id)
+        if raw is None:
+            errors.append({"index": index, "id": str(item_id), "error": "item not found"})
+            continue
+        if raw.get("active") is False or raw.get("price") is None:
+            errors.append({"index": index, "id": str(item_id), "error": "item is not available"})
+            continue
+        if quantity > CART_MAX_QUANTITY:
+            errors.append({"index": index, "id": str(item_id),
+                           "error": f"quantity must be an integer between 1 and {CART_MAX_QUANTITY}"})
+            continue
+        unit_price = _money(raw["price"])
+        priced_lines.append({
+            "item_id": str(item_id),
+            "name": raw.get("name", ""),
+            "unit_price": unit_price,
+            "quantity": quantity,
+            "line_total": _money(unit_price * quantity),
+        })
+
+    errors.sort(key=lambda error: error["index"])
+    total = _money(sum(line["line_total"] for line in priced_lines))
+    return {"lines": priced_lines, "total": total}, errors
+
+
+def _optional_text(data, name):
+    value = data.get(name)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value.strip()[:ORDER_TEXT_MAX] or None
+
+
+def new_order(priced, data):
+    """
+    Build the document of a new order from a priced cart.
+
+    The id and ``created_at`` are assigned here, so the client gets them
+    back immediately even though the write happens later, in a batch.
+
+    Args:
+        priced (dict): The ``priced`` result of ``price_cart`` (no errors).
+        data (dict): The request body; optional ``customer_name`` and ``note``.
+
+    Returns:
+        dict: The validated MongoDB document, ``_id`` included.
+
+    Raises:
+        ValueError | ValidationError: If ``customer_name`` or ``note`` is invalid.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    order = Order(
+        lines=[
+            OrderLine(
+                item_id=ObjectId(line["item_id"]), name=line["name"], unit_price=line["unit_price"],
+                quantity=line["quantity"], line_total=line["line_total"],
+            )
+            for line in priced["lines"]
+        ],
+        total=priced["total"],
+        customer_name=_optional_text(data, "customer_name"),
+        note=_optional_text(data, "note"),
+        # Millisecond precision: what MongoDB stores (and the journal keeps).
+        created_at=now.replace(microsecond=now.microsecond // 1000 * 1000),
+    )
+    order.validate()
+    document = order.to_mongo().to_dict()
+    document["_id"] = ObjectId()
+    return document
+
+
+def serialize_order(document):
+    """
+    Convert an order document into the API wire format.
+
+    Returns:
+        dict: ``{"id", "status", "lines", "total", "created_at", ...}``
+    """
+    return {
+        "id": str(document["_id"]),
+        "status": document["status"],
+        "lines": [dict(line, item_id=str(line["item_id"])) for line in document["lines"]],
+        "total": document["total"],
+        "customer_name": document.get("customer_name"),
+        "note": document.get("note"),
+        "created_at": document["created_at"].isoformat() + "Z",
+    }
+
+
+def insert_orders(documents):
+    """
+    Write a batch of orders with one unordered ``insert_many``.
+
+    Orders that already exist (same ``_id``, e.g. replayed from the
+    journal after a crash that happened after the write) are skipped, so
+    writing a batch twice is harmless.
+
+    Args:
+        documents (list[dict]): Documents built by ``new_order``.
+
+    Raises:
+        PyMongoError: If the batch could not be written (other than
+            duplicates); the caller retries it.
+    """
+    try:
+        Order._get_collection().insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        if any(error.get("code") != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+            raise
+        if e.details.get("writeConcernErrors"):
+            raise
+
+
+def ensure_order_indexes():
+    """Create the indexes declared in ``Order.meta`` if they are missing."""
+    Order.ensure_indexes()
@@ -0,0 +1,410 @@
+"""Write-behind queue for new orders, backed by a local journal.
+
+``POST /api/v1/orders`` does not write to MongoDB while the client waits.
+``order_queue.submit()`` appends the order to a journal file on local disk,
+fsyncs it, puts it on a bounded in-memory queue and returns; the client
+gets ``202 Accepted`` with the order id. A background thread writes the
+queue to MongoDB in batches (one ``insert_many`` per batch), so a burst of
+orders costs a handful of round trips instead of one write each.
+
+Backpressure: at most ``ORDER_QUEUE_MAX`` orders may be waiting (queued or
+being written). A request that finds the queue full waits up to
+``ORDER_QUEUE_WAIT_MS`` for room, then ``submit`` raises ``OrderQueueFull``
+and the API answers ``503`` with a ``Retry-After`` header. If MongoDB is
+down the writer keeps retrying the same batch with a growing delay, the
+queue fills up and new orders are turned away instead of piling up in
+memory.
+
+Crash safety: an order is acknowledged only once its journal line is on
+disk. Written batches are marked done in the journal, and the file is
+emptied whenever everything in it has been written. When a worker starts
+the queue (on its first orders API request) it takes over the journals
+of dead processes and re-queues the orders they had not written yet. A replayed order keeps the
+id it was acknowledged with and ``insert_orders`` skips ids that already
+exist, so an order written just before a crash is not written twice.
+
+Each process writes its own journal file in ``ORDER_JOURNAL_DIR`` and holds
+an exclusive ``flock`` on it, which is how other workers tell a live
+journal from an abandoned one. Where ``fcntl`` is not available (Windows)
+every other journal in the directory is treated as abandoned, which is
+only correct with a single server process (``flask run``, waitress).
+
+Settings (environment variables):
+
+- ``ORDER_QUEUE_MAX``          (default 1000) orders waiting to be written
+- ``ORDER_QUEUE_WAIT_MS``      (default 200)  wait for room before answering 503
+- ``ORDER_BATCH_SIZE``         (default 100)  orders per insert_many
+- ``ORDER_FLUSH_INTERVAL_MS``  (default 50)   how long the writer waits to fill a batch
+- ``ORDER_RETRY_AFTER``        (default 2)    Retry-After seconds sent with 503
+- ``ORDER_JOURNAL_DIR``        (default ``<instance folder>/order_journal``)
+- ``ORDER_JOURNAL_FSYNC``      (default 1)    0 skips fsync: faster, not crash-safe
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, see the module docstring
+    fcntl = None
+
+from api.utils.db import mongo_connect
+
+
+ORDER_QUEUE_MAX = int(os.getenv("ORDER_QUEUE_MAX", "1000"))
+ORDER_QUEUE_WAIT_MS = int(os.getenv("ORDER_QUEUE_WAIT_MS", "200"))
+ORDER_BATCH_SIZE = int(os.getenv("ORDER_BATCH_SIZE", "100"))
+ORDER_FLUSH_INTERVAL_MS = int(os.getenv("ORDER_FLUSH_INTERVAL_MS", "50"))
+ORDER_RETRY_AFTER = int(os.getenv("ORDER_RETRY_AFTER", "2"))
+ORDER_JOURNAL_FSYNC = os.getenv("ORDER_JOURNAL_FSYNC", "1") != "0"
+
+# Longest pause between two attempts to write a failed batch.
+MAX_RETRY_DELAY = 5.0
+
+
+class OrderQueueFull(Exception):
+    """Raised by ``submit`` when the queue stayed full for ``ORDER_QUEUE_WAIT_MS``.
+
+    Attributes:
+        retry_after (int): Seconds the client should wait before retrying.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__("order queue is full")
+        self.retry_after = retry_after
+
+
+def _pending_orders(lines):
+    """Orders in journal lines that no later ``done`` line covers, in journal order."""
+    from bson import json_util
+
+    orders = {}
+    for line in lines:
+        try:
+            record = json_util.loads(line)
+        except ValueError:
+            # Torn last line of a crashed process: never acknowledged.
+            continue
+        if "order" in record:
+            orders[record["order"]["_id"]] = record["order"]
+        for order_id in record.get("done", ()):
+            orders.pop(order_id, None)
+    return list(orders.values())
+
+
+class OrderJournal:
+    """Append-only JSON-lines file of accepted orders and written batches.
+
+    Lines are ``{"order": <document>}`` or ``{"done": [<ids>]}`` (MongoDB
+    extended JSON). Appends are buffered and made durable by ``sync``;
+    concurrent ``sync`` calls share one fsync (group commit).
+    """
+
+    def __init__(self, directory, fsync=True):
+        self.directory = directory
+        self.fsync = fsync
+        self.path = None
+        self.syncs = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._appended = 0
+        self._synced = 0
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"orders-{os.getpid()}-{time.time_ns()}.jsonl")
+        self._file = open(self.path, "ab")
+        if fcntl is not None:
+            # Held until this process exits; tells other workers we are alive.
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+
+    def append(self, records):
+        """
+        Append records (not yet durable).
+
+        Returns:
+            int: Sequence number to pass to ``sync``.
+        """
+        # bson (ObjectId, dates) loads with the first order, not with the app.
+        from bson import json_util
+
+        data = b"".join(json_util.dumps(record).encode() + b"\n" for record in records)
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+            self._appended += 1
+            return self._appended
+
+    def sync(self, sequence):
+        """Return once the append numbered ``sequence`` is on disk."""
+        if not self.fsync:
+            return
+        with self._sync_lock:
+            if self._synced >= sequence:
+                # Another thread's fsync already covered it.
+                return
+            with self._lock:
+                target = self._appended
+            os.fsync(self._file.fileno())
+            self._synced = target
+            self.syncs += 1
+
+    def truncate(self):
+        """Empty the journal; only call when every order in it has been written."""
+        with self._lock:
+            self._file.truncate(0)
+
+    def close(self, remove):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if remove:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def recover(self):
+        """
+        Take over the journals of dead processes.
+
+        Their unwritten orders are appended to this journal and synced
+        before the old files are deleted, so a crash in the middle loses
+        nothing (at worst an order is replayed twice, which is harmless).
+
+        Returns:
+            list[dict]: Order documents to re-queue.
+        """
+        recovered = []
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if path == self.path or not (name.startswith("orders-") and name.endswith(".jsonl")):
+                continue
+            try:
+                handle = open(path, "rb")
+            except OSError:
+                continue
+            with handle:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue   # its process is alive
+                if os.fstat(handle.fileno()).st_nlink == 0:
+                    continue       # another worker claimed it first
+                orders = _pending_orders(handle.read().splitlines())
+                if orders:
+                    self.sync(self.append({"order": order} for order in orders))
+                    recovered.extend(orders)
+                os.remove(path)
+        return recovered
+
+
+class OrderWriteQueue:
+    """Bounded in-process queue of orders written to MongoDB in batches.
+
+    Started lazily in each process (the first orders API request, or
+    ``submit``, calls ``start``), so the writer thread is created after a
+    pre-forking server forks.
+    """
+
+    def __init__(self, write_batch, directory=None, max_size=ORDER_QUEUE_MAX, wait=ORDER_QUEUE_WAIT_MS / 1000,
+                 batch_size=ORDER_BATCH_SIZE, flush_interval=ORDER_FLUSH_INTERVAL_MS / 1000,
+                 retry_after=ORDER_RETRY_AFTER, fsync=ORDER_JOURNAL_FSYNC):
+        self.write_batch = write_batch
+        self.directory = directory
+        self.max_size = max_size
+        self.wait = wait
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_after = retry_after
+        self.fsync = fsync
+        self.journal = None
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._reset()
+
+    def _reset(self):
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._in_flight = 0
+        self._stopping = False
+        self._stop_requested = threading.Event()
+        self._thread = None
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.batches = 0
+        self.recovered = 0
+        self.write_failures = 0
+        self.last_error = None
+
+    def init_app(self, app, blueprint="orders"):
+        """
+        Use the app's instance folder for the journal (unless
+        ``ORDER_JOURNAL_DIR`` is set), start the queue on the first orders
+        API request of each worker and drain it when the process exits.
+
+        Args:
+            app (Flask): The application.
+            blueprint (str): Name of the blueprint whose requests start the
+                queue; other requests (pages, menu, probes) never touch it.
+        """
+        self.directory = os.getenv("ORDER_JOURNAL_DIR", os.path.join(app.instance_path, "order_journal"))
+        app.before_request_funcs.setdefault(blueprint, []).append(self.start)
+        atexit.register(self.stop)
+
+    def start(self):
+        """Open this process's journal, re-queue abandoned orders and start the writer (once per process)."""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # A forked child must not reuse the parent's queue or thread.
+            self._reset()
+            self.journal = OrderJournal(self.directory or os.path.join("instance", "order_journal"), self.fsync)
+            self.journal.open()
+            recovered = self.journal.recover()
+            if recovered:
+                print(f"Re-queued {len(recovered)} unwritten orders from the order journal")
+            self._pending.extend(recovered)
+            self.recovered = len(recovered)
+            self._thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def submit(self, document):
+        """
+        Journal an order durably and queue it for writing.
+
+        Args:
+            document (dict): An order document from ``new_order``.
+
+        Raises:
+            OrderQueueFull: If no room freed up within the wait time.
+        """
+        self.start()
+        deadline = time.monotonic() + self.wait
+        with self._cond:
+            while len(self._pending) + self._in_flight >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected += 1
+                    raise OrderQueueFull(self.retry_after)
+                self._cond.wait(remaining)
+            sequence = self.journal.append([{"order": document}])
+            self._pending.append(document)
+            self.accepted += 1
+            # Wake the writer only when it waits for a first order or its
+            # batch is full, not once per order while it lingers.
+            if len(self._pending) == 1 or len(self._pending) == self.batch_size:
+                self._cond.notify_all()
+        self.journal.sync(sequence)
+
+    def _next_batch(self):
+        """Wait for orders, give a burst ``flush_interval`` to fill a batch, then take it."""
+        with self._cond:
+            while not self._pending and not self._stopping:
+                self._cond.wait()
+            if not self._pending:
+                return None
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._pending) < self.batch_size and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            self._in_flight = len(batch)
+            return batch
+
+    def _write(self, batch):
+        """Write one batch, retrying until it succeeds; False if stopped first."""
+        delay = 0.1
+        while True:
+            try:
+                self.write_batch(batch)
+                return True
+            except Exception as e:
+                self.write_failures += 1
+                self.last_error = str(e)
+                print("Could not write orders, retrying:", str(e))
+            if self._stop_requested.wait(delay):
+                return False
+            delay = min(delay * 2, MAX_RETRY_DELAY)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            if not self._write(batch):
+                break
+            with self._cond:
+                self._in_flight = 0
+                self.written += len(batch)
+                self.batches += 1
+                self.journal.append([{"done": [document["_id"] for document in batch]}])
+                if not self._pending:
+                    self.journal.truncate()
+                self._cond.notify_all()
+
+    def stop(self, timeout=10):
+        """
+        Write what is queued (waiting at most ``timeout`` seconds) and stop.
+
+        The journal is deleted only when everything in it was written;
+        otherwise the next process to start re-queues the rest.
+        """
+        if self._pid != os.getpid():
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._stop_requested.set()
+        self._thread.join(timeout)
+        with self._cond:
+            drained = not self._pending and not self._in_flight
+        self.journal.close(remove=drained and not self._thread.is_alive())
+        self._pid = None
+
+    def stats(self):
+        """Return queue depth and counters."""
+        with self._cond:
+            return {
+                "queued": len(self._pending),
+                "in_flight": self._in_flight,
+                "max_size": self.max_size,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "written": self.written,
+                "batches": self.batches,
+                "recovered": self.recovered,
+                "write_failures": self.write_failures,
+                "last_error": self.last_error,
+                "journal": self.journal.path if self.journal is not None else None,
+                "journal_syncs": self.journal.syncs if self.journal is not None else 0,
+            }
+
+
+def write_orders(documents):
+    """
+    Batch writer of ``order_queue``: ``insert_orders``, imported on first use.
+
+    The queue is set up with the app, and may replay a journal before any
+    request has configured the connection, so this makes sure it exists.
+    """
+    from .order_model import insert_orders
+
+    mongo_connect()
+    return insert_orders(documents)
+
+
+# Process-wide queue used by POST /api/v1/orders.
+order_queue = OrderWriteQueue(write_orders)
@@ -0,0 +1,129 @@
+"""Flask Blueprint exposing the cart and orders JSON API.
+
+Routes:
+- POST /api/v1/cart                 -> price and validate a cart (nothing is saved)
+- POST /api/v1/orders               -> place an order (queued, written in batches)
+- GET  /api/v1/orders/queue/stats   -> write-behind queue depth and counters
+
+As in the menu API, route functions stay tiny and delegate to the
+controller helpers in ``order_controller.py``, imported when a route
+is first called.
+"""
+
+from flask import Blueprint
+
+
+order_bp = Blueprint("orders", __name__, url_prefix="/api/v1")
+
+
+@order_bp.route("/cart", methods=["POST"])
+def price_cart_route():
+    """
+    @api {post} /cart Price a Cart
+    @apiName PriceCart
+    @apiGroup Orders
+    @apiVersion 1.0.0
+
+    @apiDescription Prices every line from the current menu (one database
+    query for the whole cart) and reports the lines that cannot be
+    ordered. Lines for the same item are merged. Prices sent by the client
+    are ignored.
+
+    @apiBody {Object[]} items Cart lines (the objects cart.js stores are accepted as is)
+    @apiBody {String} items.id Menu item ID
+    @apiBody {Number} [items.quantity=1] Quantity (1-99)
+
+    @apiSuccess {Object[]} lines Valid lines, priced
+    @apiSuccess {String} lines.item_id Menu item ID
+    @apiSuccess {String} lines.name Item name
+    @apiSuccess {Number} lines.unit_price Current item price
+    @apiSuccess {Number} lines.quantity Quantity
+    @apiSuccess {Number} lines.line_total unit_price x quantity
+    @apiSuccess {Number} total Sum of the valid lines
+    @apiSuccess {Boolean} valid True when every line can be ordered
+    @apiSuccess {Object[]} errors Invalid lines: index (in the request), id, error
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        {
+            "lines": [
+                {"item_id": "691211b751476ba3fc35b9f5", "name": "Aurora Bites",
+                 "unit_price": 5.5, "quantity": 2, "line_total": 11.0}
+            ],
+            "total": 11.0,
+            "valid": false,
+            "errors": [{"index": 1, "id": "691b7569f13b2b3f70dee895", "error": "item is not available"}]
+        }
+
+    @apiError (400) BadRequest Body is not {"items": [...]} or has too many lines
+    """
+    from .order_controller import price_cart_controller
+    return price_cart_controller()
+
+
+@order_bp.route("/orders", methods=["POST"])
+def create_order_route():
+    """
+    @api {post} /orders Place an Order
+    @apiName CreateOrder
+    @apiGroup Orders
+    @apiVersion 1.0.0
+
+    @apiDescription The cart is priced as in POST /cart and must be fully
+    valid. The order is journaled to disk and queued; it is written to the
+    database shortly after, in a batch with other orders. Under overload
+    the server answers 503 with a Retry-After header instead of queuing
+    without bound.
+
+    @apiBody {Object[]} items Cart lines, as for POST /cart
+    @apiBody {String} [customer_name] Name for the order
+    @apiBody {String} [note] Note for the kitchen
+
+    @apiSuccess (202) {String} id Order ID
+    @apiSuccess (202) {String} status "received"
+    @apiSuccess (202) {Object[]} lines Priced lines, as in POST /cart
+    @apiSuccess (202) {Number} total Order total
+    @apiSuccess (202) {String} created_at ISO 8601 timestamp (UTC)
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 202 ACCEPTED
+        {
+            "id": "6920a1f4c2b5e8a1d4f0a9b3",
+            "status": "received",
+            "lines": [{"item_id": "691211b751476ba3fc35b9f5", "name": "Aurora Bites",
+                       "unit_price": 5.5, "quantity": 2, "line_total": 11.0}],
+            "total": 11.0,
+            "customer_name": "Aino",
+            "note": null,
+            "created_at": "2025-11-21T11:32:04.512000Z"
+        }
+
+    @apiError (400) InvalidCart {"error": "invalid cart", "errors": [...]} as in POST /cart
+    @apiError (503) Busy The order queue is full; retry after Retry-After seconds
+    """
+    from .order_controller import create_order_controller
+    return create_order_controller()
+
+
+@order_bp.route("/orders/queue/stats", methods=["GET"])
+def get_order_queue_stats_route():
+    """
+    @api {get} /orders/queue/stats Get Order Queue Statistics
+    @apiName GetOrderQueueStats
+    @apiGroup Orders
+    @apiVersion 1.0.0
+
+    @apiDescription Counters of this worker process's write-behind queue.
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        {
+            "queued": 0, "in_flight": 12, "max_size": 1000,
+            "accepted": 4210, "rejected": 0, "written": 4198, "batches": 388,
+            "recovered": 0, "write_failures": 0, "last_error": null,
+            "journal": "instance/order_journal/orders-4242-1763724724000000000.jsonl",
+            "journal_syncs": 3107
+        }
+    """
+    from .order_controller import get_order_queue_stats_controller
+    return get_order_queue_stats_controller()
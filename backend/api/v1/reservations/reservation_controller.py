@@ -0,0 +1,104 @@
+"""Controller helpers for the reservations JSON API.
+
+These functions are thin wrappers around the model and the availability
+index and return (response, status) tuples. They are invoked by the Flask
+route functions in ``reservation_routes.py``.
+"""
+
+from flask import request
+from mongoengine import ValidationError
+
+from .reservation_index import availability_index, book_table
+from .reservation_model import (
+    DURATION_MINUTES, SLOT_MINUTES, earliest_slot, parse_date, parse_guests, serialize_reservation, slot_time,
+    validate_reservation,
+)
+
+
+def get_availability_controller():
+    """
+    Controller: GET /api/v1/reservations/availability?date=&guests=
+
+    Lists the times at which a party can still be seated on a day,
+    answered from the in-memory availability index.
+
+    Process:
+    1. Validate ``date`` (required) and ``guests`` (default 2); 400 if invalid
+    2. Combine the free slots of every table large enough for the party
+    3. Return the start times with HTTP 200
+
+    Returns:
+        tuple: (response dict, HTTP status code)
+               - ({"date", "guests", "duration_minutes", "times": [...]}, 200)
+               - (error dict, 400) if a parameter is invalid
+
+    Example responses:
+        Success (200): {"date": "2025-12-24", "guests": 4, "duration_minutes": 90,
+                        "slot_minutes": 15, "times": ["17:00", "17:15", "20:30"]}
+        Error (400): {"error": "date is in the past"}
+    """
+    try:
+        date = parse_date(request.args.get("date"))
+        guests = parse_guests(request.args.get("guests", "2"))
+    except ValueError as e:
+        return {"error": str(e)},400
+
+    starts = availability_index.available_starts(date, guests, earliest_slot(date))
+    return {
+        "date": date,
+        "guests": guests,
+        "duration_minutes": DURATION_MINUTES,
+        "slot_minutes": SLOT_MINUTES,
+        "times": [slot_time(start) for start in starts],
+    },200
+
+
+def create_reservation_controller():
+    """
+    Controller: POST /api/v1/reservations
+
+    Books the smallest free table that seats the party at the requested
+    time. Double bookings are impossible: each table is claimed with an
+    atomic conditional update (see ``claim_table``).
+
+    Process:
+    1. Validate the body; if invalid, return 400
+    2. Claim a table (see ``book_table``); if none is free, return 409
+    3. Return the reservation with HTTP 201
+
+    Request body example:
+        {"name": "Aino", "email": "aino@example.com", "date": "2025-12-24",
+         "time": "19:00", "guests": 4, "note": "Window seat if possible"}
+
+    Returns:
+        tuple: (response dict, HTTP status code)
+               - (reservation JSON, 201) if a table was booked
+               - (error dict, 400) if the body is invalid
+               - (error dict, 409) if no table is free at that time
+
+    Example responses:
+        Created (201): {"id": "...", "date": "2025-12-24", "time": "19:00", "end_time": "20:30",
+                        "table": "T4", "guests": 4, ...}
+        Error (409): {"error": "No table is available at that time"}
+    """
+    try:
+        booking = validate_reservation(request.get_json(silent=True))
+        booked = book_table(booking)
+    except (ValueError, ValidationError) as e:
+        return {"error": str(e)},400
+
+    if booked is None:
+        return {"error": "No table is available at that time"},409
+
+    table, reservation = booked
+    return serialize_reservation(booking["date"], table, reservation),201
+
+
+def get_availability_index_stats_controller():
+    """
+    Controller: GET /api/v1/reservations/index/stats
+
+    Returns:
+        tuple: (availability index counters, 200)
+    """
+    return availability_index.stats(),200
@@ -0,0 +1,199 @@
+"""In-memory availability index behind ``/api/v1/reservations/availability``.
+
+For each day that is asked about, ``AvailabilityIndex`` keeps one bitmask
+of taken slots per table (bit n = slot n, see ``reservation_model.py``),
+loaded with a single query. Free start times are then a few integer
+operations per table instead of a scan of the bookings:
+
+    free   = ~taken & opening hours          # free slots of one table
+    starts = free & free >> 1 & ... & free >> (k - 1)
+                                             # starts with k free slots after them
+
+OR-ed over the tables big enough for the party, ``starts`` has a bit set
+for every time at which the party can be seated.
+
+Keeping it current:
+
+- A day is loaded on first use and reloaded once older than
+  ``RESERVATION_INDEX_TTL`` seconds (default 30), so bookings made by
+  other worker processes show up.
+- Bookings made by this process are added to the masks at once.
+- The index is only a guide: the booking itself is a conditional update
+  in MongoDB (``claim_table``). A booking that loses a race, or trusted a
+  stale mask, reloads the day and tries the next table (``book_table``).
+  When the index has no table left for a time, the request is turned
+  down without a database round trip.
+"""
+
+import os
+import threading
+import time
+
+from .reservation_model import (
+    CLOSE_SLOT, OPEN_SLOT, SLOTS_PER_RESERVATION, TABLES, claim_table, load_day, new_reservation, slot_mask,
+)
+
+
+RESERVATION_INDEX_TTL = float(os.getenv("RESERVATION_INDEX_TTL", "30"))
+
+# Slots inside opening hours.
+OPEN_MASK = slot_mask(OPEN_SLOT, CLOSE_SLOT - OPEN_SLOT)
+
+
+def free_starts(taken, count=SLOTS_PER_RESERVATION):
+    """Bitmask of the slots where ``count`` consecutive free slots begin."""
+    free = ~taken & OPEN_MASK
+    starts = free
+    for shift in range(1, count):
+        starts &= free >> shift
+    return starts
+
+
+def mask_slots(mask):
+    """Set bits of ``mask`` as a sorted list of slot numbers."""
+    slots = []
+    while mask:
+        low = mask & -mask
+        slots.append(low.bit_length() - 1)
+        mask ^= low
+    return slots
+
+
+class AvailabilityIndex:
+    """Taken-slot bitmasks per (day, table), loaded per day and reloaded after ``ttl`` seconds.
+
+    Args:
+        loader (callable): ``loader(date)`` -> ``{table: taken mask}``.
+        tables (dict): ``{table: seats}``, smallest first.
+        ttl (float): Maximum age of a day before it is reloaded.
+    """
+
+    def __init__(self, loader, tables, ttl=30):
+        self._loader = loader
+        self.tables = tables
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._days = {}   # date -> (loaded at, {table: taken mask})
+        self.loads = 0
+        self.hits = 0
+        self.bookings = 0
+
+    def _fresh(self, entry):
+        return entry is not None and self.ttl > 0 and time.monotonic() - entry[0] < self.ttl
+
+    def _masks(self, date):
+        entry = self._days.get(date)
+        if self._fresh(entry):
+            self.hits += 1
+            return entry[1]
+        with self._lock:
+            entry = self._days.get(date)
+            if self._fresh(entry):
+                self.hits += 1
+                return entry[1]
+            return self._load(date)
+
+    def _load(self, date):
+        started = time.monotonic()
+        masks = self._loader(date)
+        # Days in the past are never asked about again.
+        for old in [day for day in self._days if day < date and not self._fresh(self._days[day])]:
+            del self._days[old]
+        self._days[date] = (started, masks)
+        self.loads += 1
+        return masks
+
+    def refresh(self, date, since):
+        """
+        Reload ``date`` unless a load that started after ``since`` (a
+        ``time.monotonic()`` value) already did; a crowd of bookers that
+        lost the same race reloads the day once, not once each.
+        """
+        with self._lock:
+            entry = self._days.get(date)
+            if entry is None or entry[0] < since:
+                self._load(date)
+
+    def _fitting(self, guests):
+        return [table for table, seats in self.tables.items() if seats >= guests]
+
+    def available_starts(self, date, guests, earliest=OPEN_SLOT):
+        """
+        Return the start slots at which a party of ``guests`` can be seated on ``date``.
+
+        Args:
+            date (str): ISO date.
+            guests (int): Party size.
+            earliest (int): Leave out earlier slots (e.g. those already past today).
+
+        Returns:
+            list[int]: Start slots, ascending.
+        """
+        masks = self._masks(date)
+        starts = 0
+        for table in self._fitting(guests):
+            starts |= free_starts(masks.get(table, 0))
+        return mask_slots(starts & ~((1 << earliest) - 1))
+
+    def candidates(self, date, guests, start):
+        """
+        Return the tables that look free for a booking, best fit (fewest seats) first.
+        """
+        masks = self._masks(date)
+        need = slot_mask(start)
+        return [table for table in self._fitting(guests) if not masks.get(table, 0) & need]
+
+    def occupy(self, date, table, start):
+        """Record a booking this process just made."""
+        with self._lock:
+            entry = self._days.get(date)
+            if entry is not None:
+                # Copy on write: readers use the masks without the lock.
+                masks = dict(entry[1])
+                masks[table] = masks.get(table, 0) | slot_mask(start)
+                self._days[date] = (entry[0], masks)
+            self.bookings += 1
+
+    def stats(self):
+        return {
+            "days": len(self._days),
+            "loads": self.loads,
+            "hits": self.hits,
+            "bookings": self.bookings,
+        }
+
+
+availability_index = AvailabilityIndex(load_day, TABLES, ttl=RESERVATION_INDEX_TTL)
+
+
+def book_table(booking, index=availability_index):
+    """
+    Book the smallest free table that seats the party.
+
+    Tables the index shows as free are claimed in turn, smallest first.
+    After the first lost claim the day is reloaded once, so a crowd of
+    bookers racing for the same time stops trying tables that are gone.
+
+    Args:
+        booking (dict): Output of ``validate_reservation``.
+        index (AvailabilityIndex): The index to consult and update.
+
+    Returns:
+        tuple | None: ``(table, reservation document)``, or None when no
+                      table is free at that time.
+    """
+    date, start = booking["date"], booking["start"]
+    reservation = new_reservation(booking)
+    tables = index.candidates(date, booking["guests"], start)
+    refreshed = False
+    while tables:
+        table = tables.pop(0)
+        attempt = time.monotonic()
+        if claim_table(date, table, reservation):
+            index.occupy(date, table, start)
+            return table, reservation
+        if not refreshed:
+            index.refresh(date, attempt)
+            refreshed = True
+            tables = [other for other in index.candidates(date, booking["guests"], start) if other != table]
+    return None
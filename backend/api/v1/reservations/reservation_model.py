@@ -0,0 +1,338 @@
+"""Reservation model: tables, opening hours, time slots and bookings.
+
+The day is cut into ``RESERVATION_SLOT_MINUTES`` slots, numbered from
+midnight (with 15-minute slots, 19:00 is slot 76). A reservation holds one
+table for ``RESERVATION_DURATION_MINUTES``, i.e. a run of consecutive slots.
+
+Bookings are stored per table and day: one ``TableSchedule`` document
+holds the slots taken on that table that day and the reservations that
+took them, under a unique ``(date, table)`` index. Booking a table is a
+single conditional update, "add these slots if none of them is taken"
+(``claim_table``), which MongoDB applies atomically to the one document,
+so two concurrent bookings can never both get the same table and time:
+the second one simply does not match. No read-then-write, no locks.
+
+Settings (environment variables):
+
+- ``RESERVATION_TABLES``            (default ``T1:2,T2:2,T3:2,T4:4,T5:4,T6:4,T7:4,T8:6,T9:6,T10:8``)
+                                    table name and seats
+- ``RESERVATION_HOURS``             (default ``11:00-22:00``) first seating and closing time
+- ``RESERVATION_SLOT_MINUTES``      (default 15)
+- ``RESERVATION_DURATION_MINUTES``  (default 90) how long a table is held
+- ``RESERVATION_DAYS_AHEAD``        (default 60) how far ahead bookings are taken
+
+Dates and times are local to the restaurant (``RESTAURANT_TIMEZONE``).
+"""
+
+import datetime
+import os
+import re
+import threading
+
+from bson import ObjectId
+from mongoengine import (
+    Document, EmbeddedDocument, EmbeddedDocumentField, DateTimeField, IntField, ListField,
+    ObjectIdField, StringField,
+)
+from pymongo.errors import DuplicateKeyError
+
+from api.v1.menu.menu_weekdays import RESTAURANT_TZ
+
+
+def parse_tables(spec):
+    """Parse ``"T1:2,T2:4"`` into ``{"T1": 2, "T2": 4}``, smallest tables first."""
+    tables = {}
+    for entry in spec.split(","):
+        name, _, seats = entry.strip().partition(":")
+        if not name or not seats.isdigit() or int(seats) < 1:
+            raise ValueError(f"RESERVATION_TABLES entries must look like T1:4 (got {entry!r})")
+        tables[name] = int(seats)
+    return dict(sorted(tables.items(), key=lambda table: (table[1], table[0])))
+
+
+def parse_minutes(text):
+    """Parse ``"HH:MM"`` into minutes since midnight; ValueError if malformed."""
+    match = re.fullmatch(r"(\d{1,2}):(\d{2})", text.strip()) if isinstance(text, str) else None
+    if match is None or int(match.group(1)) > 24 or int(match.group(2)) > 59:
+        raise ValueError("time must look like 19:30")
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+TABLES = parse_tables(os.getenv("RESERVATION_TABLES", "T1:2,T2:2,T3:2,T4:4,T5:4,T6:4,T7:4,T8:6,T9:6,T10:8"))
+MAX_PARTY = max(TABLES.values())
+
+SLOT_MINUTES = int(os.getenv("RESERVATION_SLOT_MINUTES", "15"))
+DURATION_MINUTES = int(os.getenv("RESERVATION_DURATION_MINUTES", "90"))
+DAYS_AHEAD = int(os.getenv("RESERVATION_DAYS_AHEAD", "60"))
+
+# Slots a reservation holds, and the first / one-past-last slot of the day.
+SLOTS_PER_RESERVATION = -(-DURATION_MINUTES // SLOT_MINUTES)
+_opening, _, _closing = os.getenv("RESERVATION_HOURS", "11:00-22:00").partition("-")
+OPEN_SLOT = parse_minutes(_opening) // SLOT_MINUTES
+CLOSE_SLOT = parse_minutes(_closing) // SLOT_MINUTES
+
+TEXT_MAX = 200
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+def slot_mask(start, count=SLOTS_PER_RESERVATION):
+    """Bitmask of ``count`` slots from ``start`` (bit n = slot n)."""
+    return ((1 << count) - 1) << start
+
+
+def slot_time(slot):
+    """Slot number -> ``"HH:MM"``."""
+    minutes = slot * SLOT_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class Reservation(EmbeddedDocument):
+
+    reservation_id = ObjectIdField(required=True)
+    name = StringField(required=True, max_length=TEXT_MAX)
+    email = StringField(required=True, max_length=TEXT_MAX)
+    guests = IntField(required=True, min_value=1)
+    # Slots [start, end) held on the table.
+    start = IntField(required=True)
+    end = IntField(required=True)
+    note = StringField(max_length=TEXT_MAX)
+    created_at = DateTimeField(required=True)
+
+
+class TableSchedule(Document):
+    """Bookings of one table on one day."""
+
+    date = StringField(required=True)    # YYYY-MM-DD, restaurant time
+    table = StringField(required=True)
+    slots = ListField(IntField())        # every slot taken by the reservations below
+    reservations = ListField(EmbeddedDocumentField(Reservation))
+
+    meta = {
+        "indexes": [
+            {"fields": ["date", "table"], "unique": True, "name": "date_table"},
+        ],
+    }
+
+
+def restaurant_now():
+    """The current time in the restaurant's time zone."""
+    return datetime.datetime.now(datetime.timezone.utc).astimezone(RESTAURANT_TZ)
+
+
+def earliest_slot(date, now=None):
+    """
+    First slot still bookable on ``date``: the opening slot, or for today
+    the first slot that has not started yet.
+    """
+    now = now or restaurant_now()
+    if date != now.date().isoformat():
+        return OPEN_SLOT
+    return max(OPEN_SLOT, -(-(now.hour * 60 + now.minute + 1) // SLOT_MINUTES))
+
+
+def parse_date(text, now=None):
+    """
+    Validate a ``YYYY-MM-DD`` booking date.
+
+    Returns:
+        str: The date in ISO format.
+
+    Raises:
+        ValueError: If it is malformed, in the past or more than
+            DAYS_AHEAD days ahead.
+    """
+    try:
+        date = datetime.date.fromisoformat(text)
+    except (TypeError, ValueError):
+        raise ValueError("date must look like 2025-12-24")
+    today = (now or restaurant_now()).date()
+    if date < today:
+        raise ValueError("date is in the past")
+    if date > today + datetime.timedelta(days=DAYS_AHEAD):
+        raise ValueError(f"reservations are taken at most {DAYS_AHEAD} days ahead")
+    return date.isoformat()
+
+
+def parse_guests(value):
+    """Validate a party size (int or numeric string); ValueError if out of range."""
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= MAX_PARTY:
+        raise ValueError(f"guests must be a number between 1 and {MAX_PARTY}")
+    return value
+
+
+def _text(data, name, required):
+    value = data.get(name)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValueError(f"{name} is required")
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    value = value.strip()
+    if len(value) > TEXT_MAX:
+        raise ValueError(f"{name} is too long (max {TEXT_MAX} characters)")
+    return value
+
+
+def validate_reservation(data, now=None):
+    """
+    Validate the body of ``POST /api/v1/reservations``.
+
+    Args:
+        data (dict): ``{"name", "email", "date", "time", "guests", "note"?}``
+        now (datetime | None): Current restaurant time (for tests/benchmarks).
+
+    Returns:
+        dict: ``{"date", "start", "guests", "name", "email", "note"}`` with
+              ``start`` as a slot number.
+
+    Raises:
+        ValueError: With a message for the first invalid field.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("body must be an object")
+    name = _text(data, "name", required=True)
+    email = _text(data, "email", required=True)
+    if not EMAIL_PATTERN.fullmatch(email):
+        raise ValueError("email is not valid")
+    date = parse_date(data.get("date"), now)
+    minutes = parse_minutes(data.get("time"))
+    if minutes % SLOT_MINUTES:
+        raise ValueError(f"time must be on a {SLOT_MINUTES}-minute boundary")
+    start = minutes // SLOT_MINUTES
+    if start < OPEN_SLOT or start + SLOTS_PER_RESERVATION > CLOSE_SLOT:
+        raise ValueError(f"time must be between {slot_time(OPEN_SLOT)} and "
+                         f"{slot_time(CLOSE_SLOT - SLOTS_PER_RESERVATION)}")
+    if start < earliest_slot(date, now):
+        raise ValueError("time is in the past")
+    return {
+        "date": date,
+        "start": start,
+        "guests": parse_guests(data.get("guests")),
+        "name": name,
+        "email": email,
+        "note": _text(data, "note", required=False),
+    }
+
+
+def new_reservation(booking):
+    """
+    Build the embedded reservation document for a validated booking.
+
+    Returns:
+        dict: The MongoDB sub-document, ``reservation_id`` included.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    reservation = Reservation(
+        reservation_id=ObjectId(),
+        name=booking["name"],
+        email=booking["email"],
+        guests=booking["guests"],
+        start=booking["start"],
+        end=booking["start"] + SLOTS_PER_RESERVATION,
+        note=booking["note"],
+        created_at=now.replace(microsecond=now.microsecond // 1000 * 1000),
+    )
+    reservation.validate()
+    return reservation.to_mongo().to_dict()
+
+
+def serialize_reservation(date, table, reservation):
+    """
+    Convert a stored reservation into the API wire format.
+
+    Returns:
+        dict: ``{"id", "date", "time", "end_time", "table", "guests", ...}``
+    """
+    return {
+        "id": str(reservation["reservation_id"]),
+        "date": date,
+        "time": slot_time(reservation["start"]),
+        "end_time": slot_time(reservation["end"]),
+        "table": table,
+        "guests": reservation["guests"],
+        "name": reservation["name"],
+        "email": reservation["email"],
+        "note": reservation.get("note"),
+        "created_at": reservation["created_at"].isoformat() + "Z",
+    }
+
+
+def load_day(date):
+    """
+    Read the taken slots of every table on ``date`` in one query.
+
+    Returns:
+        dict: ``{table: bitmask of taken slots}`` for the tables with bookings.
+    """
+    masks = {}
+    for raw in TableSchedule._get_collection().find({"date": date}, {"table": 1, "slots": 1}):
+        mask = 0
+        for slot in raw.get("slots", ()):
+            mask |= 1 << slot
+        masks[raw["table"]] = mask
+    return masks
+
+
+def claim_table(date, table, reservation):
+    """
+    Atomically book ``table`` for a reservation, if all its slots are free.
+
+    One conditional update: it matches the table's schedule for the day
+    only when none of the reservation's slots is taken, and then adds the
+    slots and the reservation. A schedule that does not exist yet is
+    created by the upsert; if the update matched nothing because a slot is
+    taken, the upsert's insert hits the unique ``(date, table)`` index
+    instead, which means the same thing.
+
+    Args:
+        date (str): ISO date.
+        table (str): Table name.
+        reservation (dict): Document from ``new_reservation``.
+
+    Returns:
+        bool: True if the table was booked, False if a slot was taken.
+
+    Raises:
+        Exception: If the unique index is missing and cannot be created;
+                   nothing is booked then.
+    """
+    ensure_reservation_indexes()
+    slots = list(range(reservation["start"], reservation["end"]))
+    collection = TableSchedule._get_collection()
+    # A duplicate key on the first try can also mean another booking
+    # created the schedule a moment earlier; the retry then matches it.
+    for _ in range(2):
+        try:
+            collection.update_one(
+                {"date": date, "table": table, "slots": {"$nin": slots}},
+                {"$push": {"slots": {"$each": slots}, "reservations": reservation}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            continue
+    return False
+
+
+_indexes_ready = False
+_indexes_lock = threading.Lock()
+
+
+def ensure_reservation_indexes():
+    """
+    Create the indexes declared in ``TableSchedule.meta``, once per process.
+
+    ``claim_table`` is only atomic with the unique ``(date, table)`` index
+    in place, so it calls this before booking: the first booking waits for
+    the index (or fails if it cannot be created), later ones pay nothing.
+    """
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    with _indexes_lock:
+        if not _indexes_ready:
+            TableSchedule.ensure_indexes()
+            _indexes_ready = True
@@ -0,0 +1,120 @@
+"""Flask Blueprint exposing the reservations JSON API.
+
+Routes:
+- GET  /api/v1/reservations/availability?date=&guests= -> free times on a day
+- POST /api/v1/reservations                           -> book a table
+- GET  /api/v1/reservations/index/stats               -> availability index counters
+
+As in the menu API, route functions stay tiny and delegate to the
+controller helpers in ``reservation_controller.py``, imported when a route
+is first called.
+"""
+
+from flask import Blueprint
+
+
+reservation_bp = Blueprint("reservations", __name__, url_prefix="/api/v1/reservations")
+
+
+@reservation_bp.route("/availability", methods=["GET"])
+def get_availability_route():
+    """
+    @api {get} /reservations/availability Get Available Times
+    @apiName GetAvailability
+    @apiGroup Reservations
+    @apiVersion 1.0.0
+
+    @apiDescription Times at which a party can be seated on a day, in the
+    restaurant's time zone. Answered from an in-memory index of the taken
+    slots per table, refreshed from the database every
+    RESERVATION_INDEX_TTL seconds; a time shown here can still be taken by
+    the time it is booked (POST then answers 409).
+
+    @apiQuery {String} date Day, e.g. 2025-12-24 (today up to RESERVATION_DAYS_AHEAD days ahead)
+    @apiQuery {Number} [guests=2] Party size
+
+    @apiSuccess {String} date Day
+    @apiSuccess {Number} guests Party size
+    @apiSuccess {Number} duration_minutes How long the table is held
+    @apiSuccess {Number} slot_minutes Granularity of the times
+    @apiSuccess {String[]} times Free start times (HH:MM), ascending
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        {
+            "date": "2025-12-24",
+            "guests": 4,
+            "duration_minutes": 90,
+            "slot_minutes": 15,
+            "times": ["11:00", "11:15", "17:00", "20:30"]
+        }
+
+    @apiError (400) BadRequest Missing or invalid date or guests
+    """
+    from .reservation_controller import get_availability_controller
+    return get_availability_controller()
+
+
+@reservation_bp.route("", methods=["POST"])
+def create_reservation_route():
+    """
+    @api {post} /reservations Book a Table
+    @apiName CreateReservation
+    @apiGroup Reservations
+    @apiVersion 1.0.0
+
+    @apiDescription Books the smallest free table that seats the party for
+    RESERVATION_DURATION_MINUTES from the given time. Each table is claimed
+    with one atomic conditional update, so concurrent requests can never
+    book the same table twice.
+
+    @apiBody {String} name Name for the reservation
+    @apiBody {String} email Contact email
+    @apiBody {String} date Day, e.g. 2025-12-24
+    @apiBody {String} time Start time (HH:MM) on a slot boundary
+    @apiBody {Number} guests Party size
+    @apiBody {String} [note] Note for the restaurant
+
+    @apiSuccess (201) {String} id Reservation ID
+    @apiSuccess (201) {String} table Table booked
+    @apiSuccess (201) {String} time Start time
+    @apiSuccess (201) {String} end_time When the table is needed again
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 201 CREATED
+        {
+            "id": "6920b3c1c2b5e8a1d4f0a9c7",
+            "date": "2025-12-24",
+            "time": "19:00",
+            "end_time": "20:30",
+            "table": "T4",
+            "guests": 4,
+            "name": "Aino",
+            "email": "aino@example.com",
+            "note": null,
+            "created_at": "2025-11-21T11:32:04.512000Z"
+        }
+
+    @apiError (400) BadRequest Invalid body, e.g. {"error": "time is in the past"}
+    @apiError (409) Conflict {"error": "No table is available at that time"}
+    """
+    from .reservation_controller import create_reservation_controller
+    return create_reservation_controller()
+
+
+@reservation_bp.route("/index/stats", methods=["GET"])
+def get_availability_index_stats_route():
+    """
+    @api {get} /reservations/index/stats Get Availability Index Statistics
+    @apiName GetAvailabilityIndexStats
+    @apiGroup Reservations
+    @apiVersion 1.0.0
+
+    @apiDescription Counters of this worker process's availability index.
+
+    @apiSuccessExample Success-Response:
+        HTTP/1.1 200 OK
+        {"days": 3, "loads": 41, "hits": 5120, "bookings": 230}
+    """
+    from .reservation_controller import get_availability_index_stats_controller
+    return get_availability_index_stats_controller()
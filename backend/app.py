@@ -1,49 +1,271 @@
-import os
 """Flask application entrypoint for the Restaurant Website project.
 
 This module creates the Flask application, registers API blueprints and
 serves the frontend templates and static assets located in the `frontend`
 folder. The app is intentionally simple: the single-page menu front-end is
-served from `menu.html` and uses the JSON endpoints under
-`/api/v1/menu` to load data via XHR/Fetch.
+served from `menu.html`, with the card grid and the menu data rendered
+into the page on the server; the JSON endpoints under `/api/v1/menu`
+serve everything else via XHR/Fetch.
 
 Run options are read from environment variables when starting locally.
 
 Key routes:
-- GET /            -> serves index.html
-- GET /menu        -> serves menu.html (single page app)
+- GET /healthz     -> liveness probe (+ DB pool/command statistics)
+- GET /readyz      -> readiness probe (pings MongoDB)
+- GET /metrics     -> request latency/status/size metrics (Prometheus format)
+- GET /media/<name>?w= -> resized menu photo (WebP/AVIF/JPEG)
+- GET /            -> serves index.html (full-page cached, like /about,
+                      /contact, /reservation and /login)
+- GET /menu        -> serves menu.html, card grid rendered server-side
 - GET /menu/<id>   -> serves menu.html (friendly deep-link for an item)
+- GET /cart        -> serves cart.html (checkout posts to /api/v1/orders)
 
 Notes:
 - The API endpoints are provided by the `menu_bp` blueprint
-  (see backend/api/v1/menu/*).
+  (see backend/api/v1/menu/*) and, for the cart and orders, the
+  `order_bp` blueprint (see backend/api/v1/orders/*), for table
+  bookings the `reservation_bp` blueprint (backend/api/v1/reservations/*).
+- `create_app()` builds the app; `app` below is the one WSGI servers load
+  (`gunicorn app:app`). Building it loads no MongoDB code and opens no
+  connection: the API controllers and models (and with them MongoEngine
+  and PyMongo) are imported by the first request that needs them, which
+  also configures the connection and builds the indexes
+  (`init_database`). Template pages, static files and the probes never
+  load them. `python -m benchmarks.bench_startup` measures this.
+- `asgi.py` serves this same app under an ASGI server, answering the
+  menu list/item reads on the event loop with the async MongoDB driver
+  and holding the live menu streams (/api/v1/menu/stream) without a
+  thread each.
 """
 
-from flask import Flask, render_template,request
+import os
+import threading
+
+from flask import Flask, current_app, render_template,request
 from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
+
+# Load .env before importing the API modules: some of them read their
+# settings (e.g. MENU_CACHE_TTL) at import time.
+load_dotenv()
+
 from api.v1.menu.menu_routes import menu_bp
+from api.health.health_routes import health_bp
+from api.media.media_routes import media_bp
+from api.utils.compression import CompressionMiddleware
 from api.utils.db import mongo_connect
+from api.utils.metrics import init_metrics, metric_lines, request_metrics
+from api.utils.page_cache import page_cache
+from api.utils.static_assets import static_assets
+from api.v1.orders.order_routes import order_bp
+from api.v1.orders.order_queue import order_queue
+from api.v1.reservations.reservation_routes import reservation_bp
 
+# Blueprints whose requests use MongoDB; the first one runs init_database.
+DATABASE_BLUEPRINTS = {"menu", "orders", "reservations"}
 
-load_dotenv()
 
-app = Flask(
-    __name__,
-    template_folder="../frontend/templates",
-    static_folder="../frontend/static",
-    static_url_path="/static",
-)
+def create_app():
+    """Build the Flask application.
 
-# If the app is running behind a proxy (nginx, etc) ProxyFix preserves
-# original client scheme and path prefix. Adjust values when deploying.
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_prefix=1)
-
-# Register REST API blueprint for menu endpoints
-app.register_blueprint(menu_bp)
+    Registers the blueprints, middleware and page routes. The caches,
+    metrics and order queue it hooks up are process-wide, so call it once
+    per process (WSGI servers load the ``app`` built below).
 
+    Returns:
+        Flask: The application.
+    """
+    app = Flask(
+        __name__,
+        template_folder="../frontend/templates",
+        static_folder="../frontend/static",
+        static_url_path="/static",
+    )
+
+    # If the app is running behind a proxy (nginx, etc) ProxyFix preserves
+    # original client scheme and path prefix. Adjust values when deploying.
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_prefix=1)
+
+    # gzip/brotli for JSON, HTML, CSS and JS; compressed variants of responses
+    # with a strong ETag (menu snapshot, static files) are cached in memory.
+    compression = CompressionMiddleware(app.wsgi_app)
+    app.wsgi_app = compression
+    app.extensions["compression"] = compression
+
+    # Register REST API blueprint for menu endpoints
+    app.register_blueprint(menu_bp)
+    # Cart pricing and orders (/api/v1/cart, /api/v1/orders)
+    app.register_blueprint(order_bp)
+    # Table reservations (/api/v1/reservations)
+    app.register_blueprint(reservation_bp)
+    # Liveness/readiness probes (/healthz, /readyz)
+    app.register_blueprint(health_bp)
+    # Resized WebP/AVIF/JPEG menu photos (/media/<name>?w=)
+    app.register_blueprint(media_bp)
+
+    # Whether the menu page subscribes to live changes (/api/v1/menu/stream).
+    # Only asgi.py holds those streams without a thread each; it turns this on.
+    app.config["MENU_STREAM_LIVE"] = False
+
+    # MongoDB is set up by the first request that needs it.
+    app.before_request(_database_for_request)
+
+    # Fingerprinted /static URLs (see api/utils/static_assets.py for the build step)
+    static_assets.init_app(app)
+
+    # Cached full-page responses for the template-only routes below.
+    page_cache.init_app(app)
+
+    # Per-route latency, status, size and Mongo-time metrics at /metrics.
+    init_metrics(app)
+
+    # Orders are journaled locally and written to MongoDB in batches.
+    order_queue.init_app(app)
+
+    request_metrics.register_collector(_menu_cache_metrics)
+    request_metrics.register_collector(lambda: _compression_metrics(compression))
+    request_metrics.register_collector(_page_cache_metrics)
+    request_metrics.register_collector(_order_queue_metrics)
+    request_metrics.register_collector(_reservation_metrics)
+    request_metrics.register_collector(_menu_stream_metrics)
+
+    # Page routes (view functions below).
+    app.add_url_rule("/", view_func=home, methods=["GET"])
+    app.add_url_rule("/menu", view_func=menu, methods=["GET"])
+    app.add_url_rule("/menu/<item_id>", view_func=menu_item, methods=["GET"])
+    app.add_url_rule("/about", view_func=about, methods=["GET"])
+    app.add_url_rule("/contact", view_func=contact, methods=["GET"])
+    app.add_url_rule("/reservation", view_func=reservation, methods=["GET"])
+    app.add_url_rule("/login", view_func=login, methods=["GET"])
+    app.add_url_rule("/cart", view_func=cart_page)
+    return app
+
+
+_database_pid = None
+_database_lock = threading.Lock()
+
+
+def init_database():
+    """Configure the MongoDB connection and build the indexes (once per process).
+
+    Runs on the first request that needs the database (and from
+    ``asgi.py``), not at import: starting a worker then costs no MongoDB
+    imports or round trips. The connection is registered right away
+    (the client connects lazily on the first query); the index builds,
+    a round trip per index, run in a background thread so that request
+    does not wait for them. The one index correctness depends on, the
+    unique reservation index, is also built by the first booking before
+    it books (see ``reservation_model.claim_table``).
 
-@app.get("/")
+    Returns:
+        threading.Thread | None: The index build thread, if this call
+        started it.
+    """
+    global _database_pid
+    if _database_pid == os.getpid():
+        return None
+    with _database_lock:
+        if _database_pid == os.getpid():
+            return None
+        mongo_connect()
+        thread = threading.Thread(target=_ensure_indexes, name="ensure-indexes", daemon=True)
+        thread.start()
+        _database_pid = os.getpid()
+        return thread
+
+
+def _ensure_indexes():
+    from api.v1.menu.menu_indexes import ensure_menu_indexes
+    from api.v1.orders.order_model import ensure_order_indexes
+    from api.v1.reservations.reservation_model import ensure_reservation_indexes
+
+    # One at a time, so a failure in one does not skip the others.
+    for ensure in (ensure_menu_indexes, ensure_order_indexes, ensure_reservation_indexes):
+        try:
+            ensure()
+        except Exception as e:
+            print(f"Could not create indexes ({ensure.__name__}):", str(e))
+
+
+def _database_for_request():
+    if request.blueprint in DATABASE_BLUEPRINTS:
+        init_database()
+
+
+# The collectors import what they report on when /metrics is first
+# scraped, not with the app.
+def _menu_cache_metrics():
+    from api.v1.menu.menu_model import menu_cache
+
+    stats = menu_cache.stats()
+    return (
+        metric_lines("menu_cache_hits_total", "counter", "Menu snapshot cache hits.", stats["hits"])
+        + metric_lines("menu_cache_misses_total", "counter", "Menu snapshot cache misses.", stats["misses"])
+        + metric_lines("menu_cache_items", "gauge", "Items in the current menu snapshot.", stats["items"])
+    )
+
+
+def _compression_metrics(compression):
+    stats = compression.stats()
+    return (
+        metric_lines("compression_cache_hits_total", "counter",
+                     "Responses served from the compressed-variant cache.", stats["hits"])
+        + metric_lines("compression_cache_misses_total", "counter",
+                       "Responses compressed on the fly.", stats["misses"])
+        + metric_lines("compression_cache_bytes", "gauge",
+                       "Bytes held by the compressed-variant cache.", stats["bytes"])
+    )
+
+
+def _page_cache_metrics():
+    stats = page_cache.stats()
+    return (
+        metric_lines("page_cache_hits_total", "counter", "Pages served from the page cache.", stats["hits"])
+        + metric_lines("page_cache_misses_total", "counter", "Cacheable pages rendered.", stats["misses"])
+        + metric_lines("page_cache_bytes", "gauge", "Bytes held by the page cache.", stats.get("bytes", 0))
+    )
+
+
+def _order_queue_metrics():
+    stats = order_queue.stats()
+    return (
+        metric_lines("order_queue_depth", "gauge", "Orders waiting to be written.",
+                     stats["queued"] + stats["in_flight"])
+        + metric_lines("order_queue_accepted_total", "counter", "Orders accepted.", stats["accepted"])
+        + metric_lines("order_queue_rejected_total", "counter",
+                       "Orders turned away with 503 because the queue was full.", stats["rejected"])
+        + metric_lines("order_queue_written_total", "counter", "Orders written to MongoDB.", stats["written"])
+        + metric_lines("order_queue_write_failures_total", "counter",
+                       "Failed order batch writes (retried).", stats["write_failures"])
+    )
+
+
+def _reservation_metrics():
+    from api.v1.reservations.reservation_index import availability_index
+
+    stats = availability_index.stats()
+    return (
+        metric_lines("reservation_index_loads_total", "counter",
+                     "Days loaded into the availability index.", stats["loads"])
+        + metric_lines("reservation_index_hits_total", "counter",
+                       "Availability lookups served from memory.", stats["hits"])
+        + metric_lines("reservation_bookings_total", "counter", "Tables booked.", stats["bookings"])
+    )
+
+
+def _menu_stream_metrics():
+    from api.v1.menu.menu_stream import menu_stream
+
+    stats = menu_stream.stats()
+    return (
+        metric_lines("menu_stream_clients", "gauge", "Open menu change streams.", stats["clients"])
+        + metric_lines("menu_stream_events_total", "counter", "Menu change events published.", stats["published"])
+        + metric_lines("menu_stream_resets_total", "counter",
+                       "Streams told to reload the menu because missed events were gone.", stats["resets"])
+    )
+
+
+@page_cache.cached()
 def home():
     """Render the root page (`index.html`).
 
@@ -52,66 +274,101 @@ def home():
     return render_template("index.html")
 
 
-@app.get("/menu")
+# Render the menu grid on the server (MENU_SSR=0 serves the empty shell
+# that menu.js fills in from /api/v1/menu).
+MENU_SSR = os.getenv("MENU_SSR", "1") != "0"
+
+
+def render_menu_page(open_item_id=None):
+    """Render `menu.html`, with the card grid pre-rendered when SSR is on.
+
+    Args:
+        open_item_id (str | None): Item whose detail modal the page should
+            open on load (deep links).
+
+    Returns:
+        str: The rendered page.
+    """
+    live_menu = current_app.config["MENU_STREAM_LIVE"]
+    if not MENU_SSR:
+        return render_template("menu.html", open_item_id=open_item_id, live_menu=live_menu)
+    from api.v1.menu.menu_render import menu_fragments
+
+    init_database()
+    menu_html, menu_data = menu_fragments.page()
+    return render_template(
+        "menu.html", menu_html=menu_html, menu_data=menu_data, open_item_id=open_item_id,
+        live_menu=live_menu,
+    )
+
+
 def menu():
-    """Render the SPA that lists the menu items.
+    """Render the menu page.
 
-    The front-end JavaScript will call the JSON API to populate content.
+    With SSR (the default) the category grid is rendered on the server
+    from the menu snapshot and the menu JSON is embedded in the page, so
+    the front-end hydrates it without calling the JSON API.
     """
-    return render_template("menu.html")
+    return render_menu_page()
 
 
-@app.get("/menu/<int:item_id>")
 def menu_item(item_id):
-    """Render the menu SPA for a deep link to a specific item.
+    """Render the menu page for a deep link to a specific item.
 
-    This endpoint intentionally returns the same `menu.html` file so the
-    frontend can detect the path and open the item detail modal for
-    `item_id` by calling `/api/v1/menu/<item_id>`.
+    Returns the same page as `/menu`, marked so the frontend opens the
+    item detail modal for `item_id` on load (from the embedded menu data
+    when SSR is on, otherwise via `/api/v1/menu/<item_id>`).
 
     Args:
-        item_id (int): menu item id parsed from the URL.
+        item_id (str): menu item id (MongoDB ObjectId) parsed from the URL.
 
     Returns:
-        A rendered HTML page (menu.html) — the frontend handles fetching
-        of the item details as JSON.
+        A rendered HTML page (menu.html); 404 when SSR knows the item does
+        not exist.
     """
-    return render_template("menu.html")
+    page = render_menu_page(open_item_id=item_id)
+    if MENU_SSR:
+        from api.v1.menu.menu_model import menu_cache
 
+        if menu_cache.get().by_id.get(item_id) is None:
+            return page,404
+    return page
 
-@app.get("/about")
+
+@page_cache.cached()
 def about():
     """Render the About Us page."""
     return render_template("about.html")
 
 
-@app.get("/contact")
+@page_cache.cached()
 def contact():
     """Render the Contact Us page."""
     return render_template("contact.html")
 
 
-@app.get("/reservation")
+@page_cache.cached()
 def reservation():
     """Render the Reservation/Reserve a Table page."""
     return render_template("reservation.html")
 
 
-@app.get("/login")
+@page_cache.cached()
 def login():
     """Render the Login page."""
     return render_template("login.html")
 
 
-@app.route('/cart')
 def cart_page():
     item_id = request.args.get('item')
     return render_template('cart.html',added_item_id=item_id)
 
 
+app = create_app()
+
+
 if __name__ == "__main__":
     # When run directly, read run settings from environment variables.
-    mongo_connect()
     app.run(
         host="127.0.0.1",
         port=os.getenv("PORT"),
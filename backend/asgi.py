@@ -0,0 +1,207 @@
+"""ASGI entry point: the Flask app plus an async read path for the menu API.
+
+Run it with any ASGI server from the ``backend`` folder, e.g.::
+
+    uvicorn asgi:app --workers 2
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker --workers 2
+
+``app.py`` stays the WSGI entry point; this module imports it and serves:
+
+- ``GET``/``HEAD`` ``/api/v1/menu/`` and ``/api/v1/menu/<item_id>`` on the
+  event loop (``api/v1/menu/menu_async.py``), reading MongoDB with PyMongo's
+  ``AsyncMongoClient``. While one request waits for the database the
+  worker keeps serving others, so one process holds many concurrent
+  requests with a single connection pool instead of one thread each.
+  Responses are the same as Flask's: ETag/Last-Modified and ``304``,
+  gzip/brotli through the same ``CompressionMiddleware`` (sharing its
+  cache) and ``X-Forwarded-*`` handling as in ``app.py``.
+- ``GET /api/v1/menu/stream`` (live menu changes, Server-Sent Events) as
+  a coroutine per connection (``MenuChangeBroker.serve_asgi``), so idle
+  streams hold no threads; through ``WsgiToAsgi`` each would hold one.
+  Only then does the menu page subscribe to it (``MENU_STREAM_LIVE``).
+- Everything else (the template pages, static files, media, probes, the
+  other menu routes and all writes) through the unchanged Flask app,
+  mounted with asgiref's ``WsgiToAsgi``, which runs each request in a
+  thread pool.
+
+Requests are routed with Flask's own URL map, so a path is served natively
+exactly when Flask would have dispatched it to ``get_all_menu_route`` or
+``get_menu_item_route``. The native routes are recorded in ``/metrics``
+under the same endpoint names; their MongoDB time is not attributed.
+
+Needs ``pip install asgiref uvicorn`` (not in requirements.txt: the WSGI
+deployment does not use them). Without asgiref only the native routes are
+served and everything else answers ``501``.
+"""
+
+import io
+import sys
+import time
+
+from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.wrappers import Request
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # optional: pip install asgiref
+    WsgiToAsgi = None
+
+from app import app as flask_app, init_database
+from api.utils.compression import CompressionMiddleware
+from api.utils.metrics import request_metrics
+from api.v1.menu import menu_async
+from api.v1.menu.menu_stream import menu_stream, start_menu_stream
+
+
+# Flask endpoints answered on the event loop instead of in a thread.
+NATIVE_ROUTES = {
+    "menu.get_all_menu_route": menu_async.get_menu,
+    "menu.get_menu_item_route": menu_async.get_menu_item,
+}
+
+# Long-lived responses, streamed by the handler itself.
+STREAM_ROUTES = {
+    "menu.menu_stream_route",
+}
+
+# Streams cost no thread here, so the menu page may subscribe to them.
+flask_app.config["MENU_STREAM_LIVE"] = True
+
+_url_adapter = flask_app.url_map.bind("localhost")
+
+# Same X-Forwarded-* handling as app.py; the wrapped app just hands the
+# adjusted environ back.
+_proxy_fix = ProxyFix(lambda environ, start_response: environ, x_proto=1, x_prefix=1)
+
+
+def _conditional(environ, start_response):
+    # Runs inside the compression middleware, which strips the encoding
+    # suffix from If-None-Match first.
+    response = environ["menu_async.response"]
+    return response.make_conditional(environ)(environ, start_response)
+
+
+_compressed = CompressionMiddleware(_conditional)
+_compressed.cache = flask_app.extensions["compression"].cache
+
+if WsgiToAsgi is not None:
+    _flask_asgi = WsgiToAsgi(flask_app)
+else:
+    print("asgiref is not installed; only GET /api/v1/menu is served (pip install asgiref)")
+    _flask_asgi = None
+
+
+def native_route(path):
+    """
+    Return ``(endpoint, view arguments)`` when a GET of ``path`` is served
+    natively, else ``(None, None)``.
+    """
+    try:
+        endpoint, kwargs = _url_adapter.match(path, method="GET")
+    except HTTPException:
+        # 404, 405 and slash redirects are left to Flask.
+        return None, None
+    if endpoint not in NATIVE_ROUTES and endpoint not in STREAM_ROUTES:
+        return None, None
+    return endpoint, kwargs
+
+
+def _environ(scope):
+    """Build a WSGI environ for a body-less request from an ASGI HTTP scope."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        # WSGI strings carry the raw bytes as latin-1.
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = f"HTTP_{name}"
+        value = value.decode("latin-1")
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+async def _serve_native(endpoint, kwargs, scope, send):
+    start = time.perf_counter()
+    init_database()
+    environ = _proxy_fix(_environ(scope), None)
+    request = Request(environ)
+    environ["menu_async.response"] = await NATIVE_ROUTES[endpoint](request, **kwargs)
+
+    captured = []
+
+    def start_response(status, headers, exc_info=None):
+        captured[:] = [status, headers]
+
+    body = b"".join(_compressed(environ, start_response))
+    status, headers = captured
+    status_code = int(status.split(" ", 1)[0])
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+    request_metrics.record(endpoint, request.method, status_code, time.perf_counter() - start, len(body), 0, 0)
+
+
+async def _serve_stream(scope, receive, send):
+    init_database()
+    start_menu_stream()
+    last_event_id = None
+    for name, value in scope["headers"]:
+        if name == b"last-event-id":
+            last_event_id = value.decode("latin-1")
+    await menu_stream.serve_asgi(scope, receive, send, last_event_id)
+
+
+async def _not_implemented(send):
+    await send({
+        "type": "http.response.start",
+        "status": 501,
+        "headers": [(b"content-type", b"application/json")],
+    })
+    await send({"type": "http.response.body", "body": b'{"error":"asgiref is not installed"}'})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await menu_async.menu_reader.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """The ASGI application."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+        endpoint, kwargs = native_route(scope["path"])
+        if endpoint in STREAM_ROUTES:
+            await _serve_stream(scope, receive, send)
+            return
+        if endpoint is not None:
+            await _serve_native(endpoint, kwargs, scope, send)
+            return
+    if _flask_asgi is None:
+        await _not_implemented(send)
+        return
+    await _flask_asgi(scope, receive, send)
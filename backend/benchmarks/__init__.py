@@ -0,0 +1,10 @@
+"""Micro-benchmarks and load tests for the backend.
+
+Run them from the ``backend`` folder, e.g.::
+
+    python -m benchmarks.bench_menu_serialization
+    python -m benchmarks.bench_menu_api --sizes 16 1000 100000
+
+They use an in-memory mongomock database unless ``--mongo-url`` is given;
+install it with ``pip install -r benchmarks/requirements.txt``.
+"""
@@ -0,0 +1,181 @@
+"""Benchmark: concurrent menu reads, WSGI (threads) vs ASGI (event loop).
+
+Models ONE worker process serving ``--concurrency`` clients that each send
+their next request as soon as the previous answer arrives:
+
+- ``wsgi``  the Flask app (``app.py``) on a pool of ``--threads`` threads,
+  like ``gunicorn -k gthread --threads N``; requests beyond that wait,
+- ``asgi``  ``asgi.app`` on one event loop, the native menu routes
+  awaiting the database (``api/v1/menu/menu_async.py``).
+
+Routes:
+
+- ``query``     ``GET /api/v1/menu/?category=...&limit=20``: one database
+  round trip per request, the case async serving is for,
+- ``snapshot``  ``GET /api/v1/menu/`` with a warm snapshot: no database,
+  pure CPU, where an event loop cannot help.
+
+By default the database is mongomock with a simulated ``--rtt-ms`` round
+trip: ``time.sleep`` in the WSGI threads (``simulate_round_trips``) and
+``asyncio.sleep`` behind the async collection in ASGI mode. mongomock
+runs queries in this process, CPU a real server spends elsewhere, so the
+default menu is small to keep that from dominating. With
+``--mongo-url`` both modes use a real, disposable mongod (MongoEngine and
+``AsyncMongoClient``) and nothing is simulated.
+
+Both modes are driven in process (no sockets or HTTP parsing), so the
+numbers compare the serving models, not servers.
+
+Usage (from the ``backend`` folder)::
+
+    python -m benchmarks.bench_asgi [--items 20] [--rtt-ms 5] [--threads 8]
+                                    [--concurrency 1 8 32 128] [--requests 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import CATEGORIES, connect_database, seed_menu_items, simulate_round_trips, summarize
+
+API = "/api/v1/menu/"
+
+
+class _AsyncCursor:
+    """mongomock cursor behind the async cursor API, one simulated round trip per query."""
+
+    def __init__(self, cursor, delay):
+        self._cursor = cursor
+        self._delay = delay
+
+    def sort(self, *args):
+        self._cursor = self._cursor.sort(*args)
+        return self
+
+    def limit(self, count):
+        self._cursor = self._cursor.limit(count)
+        return self
+
+    async def _documents(self):
+        await asyncio.sleep(self._delay)
+        for document in self._cursor:
+            yield document
+
+    def __aiter__(self):
+        return self._documents()
+
+
+class _AsyncCollection:
+    def __init__(self, collection, delay):
+        self._collection = collection
+        self._delay = delay
+
+    def find(self, *args, **kwargs):
+        return _AsyncCursor(self._collection.find(*args, **kwargs), self._delay)
+
+
+def query_paths(count):
+    return [f"{API}?category={CATEGORIES[n % len(CATEGORIES)]}&limit=20" for n in range(count)]
+
+
+async def drive(send_one, paths, concurrency):
+    """Run ``paths`` from ``concurrency`` clients; return (seconds, latencies in ms)."""
+    pending = iter(paths)
+    samples = []
+
+    async def client():
+        for path in pending:
+            start = time.perf_counter()
+            await send_one(path)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, samples
+
+
+def asgi_sender(asgi_app):
+    async def send_one(path):
+        target, _, query = path.partition("?")
+        scope = {
+            "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": target, "root_path": "", "query_string": query.encode(),
+            "headers": [(b"host", b"localhost")], "server": ("localhost", 80), "client": ("127.0.0.1", 0),
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        await asgi_app(scope, receive, send)
+        if messages[0]["status"] != 200:
+            raise SystemExit(f"{path}: HTTP {messages[0]['status']}")
+
+    return send_one
+
+
+def wsgi_sender(flask_app, threads):
+    pool = ThreadPoolExecutor(max_workers=threads)
+
+    def request(path):
+        response = flask_app.test_client().get(path)
+        if response.status_code != 200:
+            raise SystemExit(f"{path}: HTTP {response.status_code}")
+
+    async def send_one(path):
+        await asyncio.get_running_loop().run_in_executor(pool, request, path)
+
+    return send_one
+
+
+def run(mode, send_one, args, results):
+    for route, paths in (("query", query_paths(args.requests)), ("snapshot", [API] * args.requests)):
+        for concurrency in args.concurrency:
+            seconds, samples = asyncio.run(drive(send_one, paths, concurrency))
+            results.append((mode, route, concurrency, len(paths) / seconds, summarize(samples)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--rtt-ms", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--mongo-url", default=None, help="real, disposable mongod (database is dropped)")
+    args = parser.parse_args()
+
+    connect_database(args.mongo_url)
+    if args.mongo_url:
+        os.environ["DATABASE_URL"] = args.mongo_url
+    from app import app as flask_app
+    import asgi
+    from api.v1.menu.menu_async import menu_reader
+    from api.v1.menu.menu_model import MenuItem
+
+    seed_menu_items(args.items)
+    if not args.mongo_url:
+        menu_reader.collection = _AsyncCollection(MenuItem._get_collection(), args.rtt_ms / 1000)
+
+    results = []
+    # ASGI first: simulate_round_trips() patches mongomock for good, and
+    # its time.sleep must not run on the event loop.
+    run("asgi", asgi_sender(asgi.app), args, results)
+    if not args.mongo_url:
+        simulate_round_trips(args.rtt_ms)
+    run(f"wsgi x{args.threads}", wsgi_sender(flask_app, args.threads), args, results)
+
+    print(f"{args.items} items, {args.requests} requests per run, "
+          + (f"mongod at {args.mongo_url}" if args.mongo_url else f"simulated round trip {args.rtt_ms} ms"))
+    print(f"{'route':<9} {'clients':>7} {'mode':<8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode, route, concurrency, throughput, stats in sorted(results, key=lambda row: (row[1], row[2], row[0])):
+        print(f"{route:<9} {concurrency:>7} {mode:<8} {throughput:>8.0f} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Load test: throughput and p50/p95/p99 latency for every menu API route.
+
+For each menu size N (``--sizes``, 16 up to 100k) the collection is
+re-seeded with N generated items and every route of ``menu_routes.py`` is
+driven through the real Flask ``app`` (WSGI, in process) for
+``--requests`` requests. Reads run before writes so they measure the warm
+snapshot; ``GET / (cold)`` invalidates the snapshot before every request
+to measure the rebuild cost at size N.
+
+By default the database is an in-memory mongomock stand-in, optionally
+with a simulated network round trip (``--rtt-ms``). Pass ``--mongo-url``
+to run against a real, disposable mongod instead (the benchmark database
+is dropped and re-seeded).
+
+Results are written as JSON (``--output``) together with the git commit
+and Python version. ``--compare`` checks a run against an earlier result
+file and exits non-zero when a route's p95 regressed by more than
+``--threshold``, so it can gate a release.
+
+Usage (from the ``backend`` folder)::
+
+    python -m benchmarks.bench_menu_api [--sizes 16 1000 10000] [--requests 200]
+    python -m benchmarks.bench_menu_api --sizes 100000 --requests 50 --concurrency 8
+    python -m benchmarks.bench_menu_api --output new.json --compare old.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import count
+
+from benchmarks.common import (
+    connect_database, make_menu_document, round_trips, seed_menu_items,
+    simulate_round_trips, summarize,
+)
+
+API = "/api/v1/menu"
+
+
+class Scenario:
+    """One benchmarked route.
+
+    Args:
+        name (str): Label used in the report.
+        method (str): HTTP method.
+        build (callable): ``build(context, i)`` returns ``(path, kwargs)``
+            for the i-th request; kwargs go to the Flask test client.
+        share (float): Fraction of ``--requests`` to run (expensive routes).
+        before (callable | None): Called before every request, untimed.
+    """
+
+    def __init__(self, name, method, build, share=1.0, before=None):
+        self.name = name
+        self.method = method
+        self.build = build
+        self.share = share
+        self.before = before
+
+
+def _new_item(i):
+    document = make_menu_document(i)
+    del document["_id"], document["version"]
+    return document
+
+
+def _invalidate_snapshot():
+    from api.v1.menu.menu_model import menu_cache
+
+    menu_cache.invalidate()
+
+
+def build_scenarios():
+    """Return the scenarios in run order: reads first, then writes."""
+    return [
+        Scenario("GET /", "GET", lambda ctx, i: (f"{API}/", {})),
+        Scenario("GET / (If-None-Match)", "GET",
+                 lambda ctx, i: (f"{API}/", {"headers": {"If-None-Match": ctx["etag"]}})),
+        Scenario("GET / (cold)", "GET", lambda ctx, i: (f"{API}/", {}),
+                 share=0.1, before=_invalidate_snapshot),
+        Scenario("GET /?category&limit", "GET",
+                 lambda ctx, i: (f"{API}/?category=main&active=true&limit=50", {})),
+        Scenario("GET /<item_id>", "GET",
+                 lambda ctx, i: (f"{API}/{ctx['ids'][i % len(ctx['ids'])]}", {})),
+        Scenario("GET /cache/stats", "GET", lambda ctx, i: (f"{API}/cache/stats", {})),
+        Scenario("GET /admin/indexes", "GET", lambda ctx, i: (f"{API}/admin/indexes", {}), share=0.1),
+        Scenario("POST /", "POST", lambda ctx, i: (f"{API}/", {"json": _new_item(i)})),
+        Scenario("PUT /<item_id>", "PUT",
+                 lambda ctx, i: (f"{API}/{ctx['ids'][i % len(ctx['ids'])]}", {"json": {"price": 9.5 + i % 7}})),
+        Scenario("POST /bulk", "POST", lambda ctx, i: (f"{API}/bulk", {"json": [
+            {"op": "update", "id": ctx["ids"][(i * 10 + k) % len(ctx["ids"])], "data": {"price": 7.5}}
+            for k in range(10)
+        ]}), share=0.5),
+        # Deletes the items created by "POST /" so N stays constant.
+        Scenario("DELETE /<item_id>", "DELETE", lambda ctx, i: (f"{API}/{ctx['created'][i]}", {})),
+    ]
+
+
+def run_scenario(app, scenario, context, requests, concurrency):
+    """
+    Drive one scenario and return its latency summary.
+
+    Returns:
+        dict: summarize() figures plus ``throughput_rps``, ``statuses`` and
+              ``round_trips`` (database calls per request).
+    """
+    total = max(1, int(requests * scenario.share))
+    counter = count()
+    statuses = Counter()
+    samples = []
+
+    def worker(_):
+        client = app.test_client()
+        local, local_statuses = [], Counter()
+        while True:
+            i = next(counter)
+            if i >= total:
+                return local, local_statuses
+            if scenario.before:
+                scenario.before()
+            path, kwargs = scenario.build(context, i)
+            start = time.perf_counter()
+            response = client.open(path, method=scenario.method, **kwargs)
+            local.append((time.perf_counter() - start) * 1000)
+            local_statuses[response.status_code] += 1
+            if scenario.name == "POST /" and response.status_code == 200:
+                context["created"].append(response.get_json()["id"])
+            response.close()
+
+    trips_before = round_trips.count
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for local, local_statuses in pool.map(worker, range(concurrency)):
+            samples.extend(local)
+            statuses.update(local_statuses)
+    elapsed = time.perf_counter() - started
+    return {
+        **summarize(samples),
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else None,
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "round_trips": round((round_trips.count - trips_before) / len(samples), 2),
+    }
+
+
+def run_size(app, size, args):
+    """Seed ``size`` items and run every scenario; returns {route: result}."""
+    ids = seed_menu_items(size)
+    client = app.test_client()
+    etag = client.get(f"{API}/").headers["ETag"]
+    context = {"ids": ids, "etag": etag, "created": []}
+    results = {}
+    for scenario in build_scenarios():
+        if args.routes and scenario.name not in args.routes:
+            continue
+        requests = args.requests
+        if scenario.name == "DELETE /<item_id>":
+            requests = len(context["created"])
+            if not requests:
+                continue
+        results[scenario.name] = result = run_scenario(app, scenario, context, requests, args.concurrency)
+        print(f"{size:>8} {scenario.name:<24} {result['throughput_rps']:>9} "
+              f"{result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9}  {result['statuses']}")
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """
+    Print p95 changes against a previous result file.
+
+    Returns:
+        list[str]: "size route" labels whose p95 grew by more than ``threshold``.
+    """
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = json.load(fh)["results"]
+    regressions = []
+    print(f"\np95 vs {baseline_path}:")
+    for size, routes in results.items():
+        for route, result in routes.items():
+            old = baseline.get(size, {}).get(route)
+            if not old or not old.get("p95_ms") or result["p95_ms"] is None:
+                continue
+            ratio = result["p95_ms"] / old["p95_ms"]
+            flag = "  REGRESSION" if ratio > 1 + threshold else ""
+            print(f"{size:>8} {route:<24} {old['p95_ms']:>9} -> {result['p95_ms']:>9} ({ratio:.2f}x){flag}")
+            if flag:
+                regressions.append(f"{size} {route}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 1000, 10000],
+                        help="menu sizes to seed (16 .. 100000)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route and size")
+    parser.add_argument("--concurrency", type=int, default=1, help="client threads")
+    parser.add_argument("--routes", nargs="+", help="only run these scenario names")
+    parser.add_argument("--mongo-url", help="real, disposable mongod instead of mongomock")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated round trip (mongomock)")
+    parser.add_argument("--output", default="benchmarks/results/menu_api.json")
+    parser.add_argument("--compare", help="earlier result file to compare p95 against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p95 growth (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    connect_database(args.mongo_url)
+    if not args.mongo_url:
+        simulate_round_trips(args.rtt_ms)
+    # Imported after connecting so app.init_database() reuses the benchmark
+    # connection instead of DATABASE_URL.
+    from app import app
+
+    print(f"{'items':>8} {'route':<24} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    results = {str(size): run_size(app, size, args) for size in args.sizes}
+
+    report = {
+        "benchmark": "menu_api",
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "database": "mongod" if args.mongo_url else "mongomock",
+        "settings": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\nwrote {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark: picking up a few menu changes, full refetch vs delta sync.
+
+A client holds the menu at some revision; ``--changes`` items are then
+updated. To catch up it either
+
+- ``full``   downloads the menu again (``GET /api/v1/menu/``, new ETag),
+- ``delta``  asks ``GET /api/v1/menu/changes?since=<rev>``.
+
+Reported per change count: response bytes (gzip, as browsers ask for
+it) and latency through the Flask app. Also reported: the write cost of
+keeping revisions (``update_menu_item`` round trips and latency with
+``--rtt-ms`` per simulated database round trip). Revisions are numbered
+by a background thread; before reading the delta the benchmark runs one
+numbering pass itself (``assign_revisions``), off the clock.
+
+The full menu is served from the in-process snapshot; a delta costs at
+least one read of the revision counter (the encoded delta itself is
+reused by every client at the same revision), so delta wins on bytes
+and full stays ahead on latency while the snapshot is warm.
+
+By default the database is mongomock (``simulate_round_trips``); pass
+``--mongo-url`` for a real, disposable mongod.
+
+Usage (from the ``backend`` folder)::
+
+    python -m benchmarks.bench_menu_changes [--items 300] [--changes 1 10 100]
+                                            [--repeats 50] [--rtt-ms 0.5]
+"""
+
+import argparse
+import time
+
+from benchmarks.common import connect_database, round_trips, seed_menu_items, simulate_round_trips, summarize
+
+HEADERS = {"Accept-Encoding": "gzip"}
+
+
+def timed_get(client, url, repeats):
+    """GET ``url`` ``repeats`` times; return (body bytes, latency summary)."""
+    samples = []
+    size = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = client.get(url, headers=HEADERS)
+        samples.append((time.perf_counter() - start) * 1000)
+        size = len(response.data)
+    return size, summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--changes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    parser.add_argument("--mongo-url", default=None, help="real, disposable mongod (database is dropped)")
+    args = parser.parse_args()
+
+    connect_database(args.mongo_url)
+    from api.v1.menu.menu_model import update_menu_item
+    from api.v1.menu.menu_revisions import assign_revisions
+    from app import app
+
+    ids = seed_menu_items(args.items)
+    client = app.test_client()
+    if not args.mongo_url:
+        simulate_round_trips(args.rtt_ms)
+
+    print(f"{args.items} items, " + (f"mongod at {args.mongo_url}" if args.mongo_url
+                                      else f"simulated round trip {args.rtt_ms} ms"))
+    print(f"{'changes':>7} {'full bytes':>10} {'full p50 ms':>11} {'delta bytes':>11} {'delta p50 ms':>12}")
+    write_samples = []
+    write_trips = 0
+    price = 10.0
+    update_menu_item(ids[0], {"price": price})   # revision 0 would mean "send everything"
+    assign_revisions()
+    for changes in args.changes:
+        rev = client.get("/api/v1/menu/changes").get_json()["rev"]
+        start_trips = round_trips.thread_count()
+        for n in range(changes):
+            price += 0.5
+            start = time.perf_counter()
+            update_menu_item(ids[n % len(ids)], {"price": price})
+            write_samples.append((time.perf_counter() - start) * 1000)
+        write_trips += round_trips.thread_count() - start_trips
+        assign_revisions()
+
+        full_bytes, full = timed_get(client, "/api/v1/menu/", args.repeats)
+        delta_bytes, delta = timed_get(client, f"/api/v1/menu/changes?since={rev}", args.repeats)
+        print(f"{changes:>7} {full_bytes:>10} {full['p50_ms']:>11.3f} {delta_bytes:>11} {delta['p50_ms']:>12.3f}")
+
+    writes = summarize(write_samples)
+    if not args.mongo_url:
+        print(f"update_menu_item: {write_trips / len(write_samples):.1f} round trips, p50 {writes['p50_ms']:.2f} ms")
+    else:
+        print(f"update_menu_item: p50 {writes['p50_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
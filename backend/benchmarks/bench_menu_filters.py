@@ -0,0 +1,106 @@
+"""Micro-benchmark: dietary/allergen filtering, list scan vs bitsets.
+
+Three ways to answer filters such as "vegan AND no nuts AND no gluten"
+over the same in-memory catalog:
+
+- ``list scan``  loop over the items and test their ``dietary`` /
+  ``allergens`` lists (what the frontend and a naive endpoint do),
+- ``mask scan``  loop over the per-item masks in the index's arrays
+  (``BitsetIndex.scan``),
+- ``bitsets``    whole-catalog bitwise operations on the label columns
+  (``BitsetIndex.filter``, what ``GET /api/v1/menu/filter`` uses).
+
+All three must return the same items; the script checks that. No
+database is needed.
+
+Usage (from the ``backend`` folder)::
+
+    python -m benchmarks.bench_menu_filters [--items 100000] [--repeat 7]
+"""
+
+import argparse
+import random
+import time
+
+from api.v1.menu.menu_bitsets import BitsetIndex
+from api.v1.menu.menu_model import WIRE_FIELDS
+from api.v1.menu.menu_serializer import project_item
+from benchmarks.common import make_menu_document
+
+DIETARY = ("vegetarian", "vegan", "gluten-free", "dairy-free", "pescatarian")
+ALLERGENS = ("gluten", "egg", "fish", "milk", "nuts", "sesame", "soy", "celery", "mustard")
+
+# name -> BitsetIndex.filter kwargs
+FILTERS = {
+    "vegan": {"dietary": ["vegan"]},
+    "vegan, no nuts, no gluten": {"dietary": ["vegan"], "exclude_allergens": ["nuts", "gluten"]},
+    "gluten-free+dairy-free, active": {"dietary": ["gluten-free", "dairy-free"], "active": True},
+    "no milk/egg/nuts/fish/sesame": {"exclude_allergens": ["milk", "egg", "nuts", "fish", "sesame"]},
+    "contains fish, not pescatarian": {"allergens": ["fish"], "exclude_dietary": ["pescatarian"]},
+}
+
+
+class _Snapshot:
+    def __init__(self, items):
+        self.items = items
+
+
+def make_items(count, seed=7):
+    """Wire-format items with 0-2 dietary labels and 0-4 allergens each."""
+    rng = random.Random(seed)
+    items = []
+    for n in range(count):
+        raw = make_menu_document(n)
+        raw["dietary"] = rng.sample(DIETARY, rng.randint(0, 2))
+        raw["allergens"] = rng.sample(ALLERGENS, rng.randint(0, 4))
+        items.append(project_item(raw, WIRE_FIELDS))
+    return items
+
+
+def list_scan(items, dietary=(), exclude_dietary=(), allergens=(), exclude_allergens=(), active=None):
+    """Test every item's lists directly."""
+    return [
+        item for item in items
+        if all(label in item["dietary"] for label in dietary)
+        and not any(label in item["dietary"] for label in exclude_dietary)
+        and all(name in item["allergens"] for name in allergens)
+        and not any(name in item["allergens"] for name in exclude_allergens)
+        and (active is None or item["active"] == active)
+    ]
+
+
+def best_of(func, repeat):
+    """Return (fastest run in ms, result of the last run)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    index = BitsetIndex(lambda: _Snapshot(items))
+    start = time.perf_counter()
+    index.filter()  # builds the index
+    print(f"{args.items} items, index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print(f"{'filter':<32} {'matches':>8} {'list scan':>10} {'mask scan':>10} {'bitsets':>10} {'speedup':>8}")
+    for name, query in FILTERS.items():
+        list_ms, expected = best_of(lambda: list_scan(items, **query), args.repeat)
+        mask_ms, masked = best_of(lambda: index.scan(**query), args.repeat)
+        bits_ms, found = best_of(lambda: index.filter(**query), args.repeat)
+        if not (masked == found == expected):
+            raise SystemExit(f"{name}: results differ ({len(expected)} / {len(masked)} / {len(found)})")
+        print(f"{name:<32} {len(found):>8} {list_ms:>9.2f}ms {mask_ms:>9.2f}ms {bits_ms:>9.2f}ms "
+              f"{list_ms / bits_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
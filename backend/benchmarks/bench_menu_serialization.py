@@ -0,0 +1,80 @@
+"""Micro-benchmark: old vs new serialization of the menu list.
+
+Old path (before the snapshot serializer)::
+
+    json.loads(queryset.to_json()) -> add item["id"] -> jsonify(...)
+
+New path::
+
+    project_item(raw) for each raw document -> encode_json(list) -> bytes
+
+Both paths start from the same raw documents (what ``as_pymongo()``
+yields), so only the serialization work is measured - no database needed.
+
+Usage (from the ``backend`` folder)::
+
+    python -m benchmarks.bench_menu_serialization [--sizes 16 1000 50000] [--repeat 5]
+"""
+
+import argparse
+import json
+import time
+
+from bson import json_util
+from flask import Flask, jsonify
+
+from api.v1.menu.menu_model import WIRE_FIELDS
+from api.v1.menu.menu_serializer import encode_json, project_item
+from benchmarks.common import make_menu_document
+
+
+def make_raw_items(count):
+    """Build ``count`` raw menu documents shaped like the stored ones."""
+    return [make_menu_document(n) for n in range(count)]
+
+
+def old_path(raw_items):
+    """Reproduce the original get_menu() body (QuerySet.to_json is json_util.dumps)."""
+    items_json = json.loads(json_util.dumps(raw_items))
+    for item in items_json:
+        item["id"] = str(item["_id"]["$oid"])
+    return jsonify(items_json).get_data()
+
+
+def new_path(raw_items):
+    """Snapshot build: project to wire format once, encode once."""
+    return encode_json([project_item(raw, WIRE_FIELDS) for raw in raw_items])
+
+
+def best_of(func, arg, repeat):
+    """Return the fastest of ``repeat`` runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 1000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    print(f"{'items':>8} {'old ms':>10} {'new ms':>10} {'speedup':>8} {'old KB':>9} {'new KB':>9}")
+    with app.app_context():
+        for size in args.sizes:
+            raw_items = make_raw_items(size)
+            old_ms = best_of(old_path, raw_items, args.repeat)
+            new_ms = best_of(new_path, raw_items, args.repeat)
+            old_kb = len(old_path(raw_items)) / 1024
+            new_kb = len(new_path(raw_items)) / 1024
+            print(f"{size:>8} {old_ms:>10.3f} {new_ms:>10.3f} {old_ms / new_ms:>7.1f}x {old_kb:>9.1f} {new_kb:>9.1f}")
+    # With the snapshot cache, the new path runs once per menu change; a
+    # cached read just writes the stored bytes.
+
+
+if __name__ == "__main__":
+    main()
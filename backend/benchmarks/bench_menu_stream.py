@@ -0,0 +1,178 @@
+"""Benchmark: fan-out of live menu changes to many idle streams.
+
+``--clients`` streams of ``GET /api/v1/menu/stream`` are opened in ONE
+process, then ``--events`` menu changes are published, ``--interval-ms``
+apart, from another thread (as a write request would):
+
+- ``asgi``  every stream is a coroutine of ``asgi.app`` on one event loop
+  (``MenuChangeBroker.serve_asgi``),
+- ``wsgi``  every stream is the WSGI body (``MenuChangeBroker.stream``)
+  iterated by its own thread, as a threaded WSGI server does. Skipped
+  above ``--wsgi-max`` clients.
+
+Reported per mode and client count: threads and resident memory added by
+the open streams (the publisher thread not counted), time to publish one change, and the delay from publish
+until a client received it (p50/p99 over all clients and events; ``last``
+is the mean delay until the slowest client had it).
+
+The streams are driven in process (no sockets or HTTP parsing), so the
+numbers compare the two serving models, not servers.
+
+Usage (from the ``backend`` folder)::
+
+    python -m benchmarks.bench_menu_stream [--clients 100 1000 5000] [--events 20]
+                                           [--interval-ms 50] [--wsgi-max 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+
+from benchmarks.common import connect_database, summarize
+
+
+def rss_mb():
+    """Resident memory of this process in MB (Linux), or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1 << 20)
+    except (OSError, ValueError):
+        return None
+
+
+class Deliveries:
+    """Receive times per event sequence number, filled by the clients."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.received = {}   # seq -> [perf_counter of each client]
+
+    def record(self, chunk):
+        now = time.perf_counter()
+        for line in chunk.split(b"\n"):
+            if line.startswith(b"id: "):
+                seq = int(line.rsplit(b"-", 1)[1])
+                with self.lock:
+                    self.received.setdefault(seq, []).append(now)
+
+
+def publish_events(broker, count, interval):
+    """Publish ``count`` changes; return ``{seq: publish time}`` and publish durations (ms)."""
+    published, durations = {}, []
+    for n in range(count):
+        time.sleep(interval)
+        event = {"op": "update", "id": "691211b751476ba3fc35b9f5", "version": n + 2, "fields": {"price": 10 + n}}
+        start = time.perf_counter()
+        broker.publish(event)
+        durations.append((time.perf_counter() - start) * 1000)
+        # One publisher, so the event's sequence number is the published count.
+        published[broker.published] = start
+    return published, durations
+
+
+def report(mode, clients, stream_threads, base_rss, published, durations, deliveries):
+    delays, last = [], []
+    for seq, start in published.items():
+        times = deliveries.received.get(seq, [])
+        delays += [(t - start) * 1000 for t in times]
+        if times:
+            last.append((max(times) - start) * 1000)
+    stats = summarize(delays)
+    rss = rss_mb()
+    added_mb = f"{rss - base_rss:>8.1f}" if rss is not None and base_rss is not None else f"{'n/a':>8}"
+    delivered = len(delays) / (len(published) * clients) if published else 0
+    print(f"{mode:<5} {clients:>7} {stream_threads:>8} {added_mb} "
+          f"{summarize(durations)['p50_ms']:>10.3f} {stats['p50_ms'] or 0:>8.2f} {stats['p99_ms'] or 0:>8.2f} "
+          f"{sum(last) / max(len(last), 1):>8.2f} {delivered:>9.0%}")
+
+
+def run_asgi(broker, clients, events, interval):
+    import asgi
+
+    deliveries = Deliveries()
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/menu/stream", "headers": [], "query_string": b""}
+
+    async def main():
+        base_threads, base_rss = threading.active_count(), rss_mb()
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                deliveries.record(message["body"])
+
+        tasks = [asyncio.create_task(asgi.app(scope, receive, send)) for _ in range(clients)]
+        while broker.clients < clients:
+            await asyncio.sleep(0.01)
+        stream_threads = threading.active_count() - base_threads
+        published, durations = await asyncio.to_thread(publish_events, broker, events, interval)
+        await asyncio.sleep(max(interval, 0.2))
+        report("asgi", clients, stream_threads, base_rss, published, durations, deliveries)
+        disconnect.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+
+
+def run_wsgi(broker, clients, events, interval):
+    deliveries = Deliveries()
+    stop = threading.Event()
+    base_threads, base_rss = threading.active_count(), rss_mb()
+
+    def client():
+        body = broker.stream()
+        try:
+            for chunk in body:
+                deliveries.record(chunk)
+                if stop.is_set():
+                    break
+        finally:
+            body.close()
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    while broker.clients < clients:
+        time.sleep(0.01)
+    stream_threads = threading.active_count() - base_threads
+    published, durations = publish_events(broker, events, interval)
+    time.sleep(max(interval, 0.2))
+    report("wsgi", clients, stream_threads, base_rss, published, durations, deliveries)
+    stop.set()
+    broker.publish({"op": "delete", "id": "0"})   # wake the threads so they see ``stop``
+    for thread in threads:
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--interval-ms", type=float, default=50.0)
+    parser.add_argument("--wsgi-max", type=int, default=2000, help="largest client count run with a thread each")
+    args = parser.parse_args()
+
+    connect_database()
+    from api.v1.menu.menu_stream import menu_stream
+
+    # Idle streams only ping every heartbeat; keep that out of the numbers.
+    menu_stream.heartbeat = 3600
+    menu_stream.max_clients = max(args.clients)
+    interval = args.interval_ms / 1000
+
+    print(f"{args.events} changes, {args.interval_ms} ms apart")
+    print(f"{'mode':<5} {'clients':>7} {'threads':>8} {'+RSS MB':>8} {'publish ms':>10} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'last ms':>8} {'delivered':>9}")
+    for clients in args.clients:
+        run_asgi(menu_stream, clients, args.events, interval)
+        if clients <= args.wsgi_max:
+            run_wsgi(menu_stream, clients, args.events, interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark: PUT/DELETE model paths before and after single-round-trip writes.
+
+Old update: objects.get -> item.update(**data) -> objects.get (3 round trips)
+New update: find_one_and_update(return_document=AFTER)       (1 round trip)
+Old delete: objects.get -> item.delete()                     (2 round trips)
+New delete: find_one_and_delete                              (1 round trip)
+
+The "new" paths also leave the write for a menu revision
+(``GET /api/v1/menu/changes``); the number is assigned by a background
+thread (see ``menu_revisions.py``), whose round trips are not counted.
+A delete also writes its tombstone (1 more round trip).
+
+By default this runs against mongomock with a simulated network round
+trip (``--rtt-ms``), which is what dominates PUT/DELETE latency in
+production. Pass ``--mongo-url`` to use a real, disposable mongod instead.
+
+Usage (from the ``backend`` folder)::
+
+    python -m benchmarks.bench_menu_writes [--items 1000] [--ops 300] [--rtt-ms 0.5]
+    python -m benchmarks.bench_menu_writes --mongo-url mongodb://localhost:27017
+"""
+
+import argparse
+import time
+
+from bson import ObjectId
+
+from api.v1.menu.menu_model import MenuItem, update_menu_item, delete_menu_item
+from benchmarks.common import (
+    connect_database, round_trips, seed_menu_items, simulate_round_trips, summarize,
+)
+
+
+def old_update(item_id, data):
+    """The original update_menu_item body."""
+    item = MenuItem.objects.get(id=ObjectId(item_id))
+    item.update(**data)
+    return MenuItem.objects.get(id=ObjectId(item_id))
+
+
+def old_delete(item_id):
+    """The original delete_menu_item body."""
+    MenuItem.objects.get(id=ObjectId(item_id)).delete()
+
+
+def measure(label, func, ids, make_args):
+    """Run ``func`` once per id and print latency and round trips per call."""
+    samples = []
+    start_trips = round_trips.thread_count()
+    for n, item_id in enumerate(ids):
+        args = make_args(item_id, n)
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    stats = summarize(samples)
+    trips = (round_trips.thread_count() - start_trips) / len(ids)
+    print(f"{label:<14} p50 {stats['p50_ms']:>8.3f} ms  p95 {stats['p95_ms']:>8.3f} ms  "
+          f"p99 {stats['p99_ms']:>8.3f} ms  round trips/op {trips:.1f}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000, help="items seeded before each run")
+    parser.add_argument("--ops", type=int, default=300, help="operations per measurement")
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="simulated round trip (mongomock only)")
+    parser.add_argument("--mongo-url", help="use this (disposable) mongod instead of mongomock")
+    args = parser.parse_args()
+
+    connect_database(args.mongo_url)
+    if not args.mongo_url:
+        simulate_round_trips(args.rtt_ms)
+
+    update = lambda item_id, n: (item_id, {"price": 1.0 + n % 50})
+
+    ids = seed_menu_items(args.items)[:args.ops]
+    measure("PUT old", old_update, ids, update)
+    measure("PUT new", update_menu_item, ids, update)
+
+    ids = seed_menu_items(args.items)[:args.ops]
+    measure("DELETE old", old_delete, ids[: len(ids) // 2], lambda item_id, n: (item_id,))
+    measure("DELETE new", delete_menu_item, ids[len(ids) // 2:], lambda item_id, n: (item_id,))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Benchmark: cart pricing and a lunch-rush burst of POST /api/v1/orders.
+
+1. ``pricing``: one ``--lines``-line cart priced with one lookup per line
+   (the naive way) vs ``price_cart``'s single ``$in`` query.
+2. ``orders``: ``--clients`` threads place ``--orders`` orders each, as
+   fast as they get answers, through the Flask app:
+
+   - ``direct``        every request writes its order itself
+                       (``insert_one``-style, one round trip per order),
+   - ``write-behind``  the journaled, batched queue (``order_queue.py``).
+
+   Reported: request latency, throughput, database round trips per order
+   (pricing included), write commands issued and the time until the last
+   order is in the database.
+
+By default the database is mongomock with a simulated ``--rtt-ms`` round
+trip (``simulate_round_trips``) and ``--write-ms`` more per write command,
+what a replicated, journaled insert (``w: majority``) adds on a busy
+server. mongomock runs in this process, so its CPU competes with the
+request threads; keep ``--items`` small. With ``--mongo-url`` a real,
+disposable mongod is used and nothing is simulated. The journal goes to
+a temporary folder and is fsynced unless ``--no-fsync`` is given.
+
+Usage (from the ``backend`` folder)::
+
+    python -m benchmarks.bench_orders [--items 50] [--lines 8] [--clients 4]
+                                      [--orders 100] [--rtt-ms 5] [--write-ms 5] [--no-fsync]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bson import ObjectId
+
+from benchmarks.common import connect_database, round_trips, seed_menu_items, simulate_round_trips, summarize
+
+
+def make_cart(rng, ids, lines):
+    return [{"id": item_id, "quantity": rng.randint(1, 3)} for item_id in rng.sample(ids, lines)]
+
+
+def price_per_line(lines):
+    """Naive pricing: one find_one per cart line."""
+    from api.v1.menu.menu_model import MenuItem
+
+    collection = MenuItem._get_collection()
+    total = 0.0
+    for line in lines:
+        raw = collection.find_one({"_id": ObjectId(line["id"])}, {"price": 1, "active": 1})
+        if raw is not None and raw.get("active") is not False:
+            total += raw["price"] * line["quantity"]
+    return round(total, 2)
+
+
+def bench_pricing(carts):
+    from api.v1.orders.order_model import price_cart
+
+    print(f"{'pricing':<14} {'p50 ms':>8} {'p99 ms':>8} {'trips/cart':>10}")
+    for label, func in (("per line", price_per_line), ("one $in", price_cart)):
+        samples = []
+        start_trips = round_trips.count
+        for cart in carts:
+            start = time.perf_counter()
+            func(cart)
+            samples.append((time.perf_counter() - start) * 1000)
+        stats = summarize(samples)
+        print(f"{label:<14} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+              f"{(round_trips.count - start_trips) / len(carts):>10.1f}")
+
+
+def burst(flask_app, carts, clients):
+    """Post every cart from ``clients`` threads; return (seconds, latencies in ms)."""
+    samples = []
+    pending = iter(carts)
+
+    def client():
+        http = flask_app.test_client()
+        for cart in pending:
+            start = time.perf_counter()
+            response = http.post("/api/v1/orders", json={"items": cart})
+            samples.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 202:
+                raise SystemExit(f"HTTP {response.status_code}: {response.get_json()}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for future in [pool.submit(client) for _ in range(clients)]:
+            future.result()
+    return time.perf_counter() - start, samples
+
+
+def bench_orders(flask_app, carts, clients, write_ms):
+    from api.v1.orders.order_model import Order, insert_orders
+    from api.v1.orders.order_queue import order_queue
+
+    def write(documents):
+        time.sleep(write_ms / 1000)
+        insert_orders(documents)
+
+    order_queue.write_batch = write
+
+    print(f"{'orders':<14} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'trips/order':>11} {'writes':>8} {'drained s':>9}")
+    queued_submit = order_queue.submit
+    for label in ("direct", "write-behind"):
+        Order._get_collection().delete_many({})
+        if label == "direct":
+            order_queue.submit = lambda document: write([document])
+        else:
+            order_queue.submit = queued_submit
+            order_queue.start()
+        batches = order_queue.batches
+        start_trips = round_trips.count
+
+        start = time.perf_counter()
+        seconds, samples = burst(flask_app, carts, clients)
+        while order_queue.stats()["queued"] or order_queue.stats()["in_flight"]:
+            time.sleep(0.001)
+        drained = time.perf_counter() - start
+        trips = (round_trips.count - start_trips) / len(carts)
+        written = len(carts) if label == "direct" else order_queue.batches - batches
+
+        stored = Order._get_collection().count_documents({})
+        if stored != len(carts):
+            raise SystemExit(f"{label}: {stored} orders stored, expected {len(carts)}")
+        stats = summarize(samples)
+        print(f"{label:<14} {len(carts) / seconds:>8.0f} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+              f"{trips:>11.2f} {written:>8} {drained:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--lines", type=int, default=8, help="lines per cart")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--orders", type=int, default=100, help="orders per client")
+    parser.add_argument("--rtt-ms", type=float, default=5.0)
+    parser.add_argument("--write-ms", type=float, default=5.0)
+    parser.add_argument("--no-fsync", action="store_true")
+    parser.add_argument("--mongo-url", default=None, help="real, disposable mongod (database is dropped)")
+    args = parser.parse_args()
+
+    os.environ["ORDER_JOURNAL_DIR"] = tempfile.mkdtemp(prefix="order_journal_")
+    if args.no_fsync:
+        os.environ["ORDER_JOURNAL_FSYNC"] = "0"
+    connect_database(args.mongo_url)
+    from app import app as flask_app
+
+    ids = [item_id for n, item_id in enumerate(seed_menu_items(args.items)) if n % 10]  # active ones
+    if args.mongo_url:
+        args.write_ms = 0
+    else:
+        simulate_round_trips(args.rtt_ms)
+
+    rng = random.Random(7)
+    carts = [make_cart(rng, ids, args.lines) for _ in range(args.clients * args.orders)]
+    print(f"{args.items} items, {args.lines} lines per cart, {args.clients} clients x {args.orders} orders, "
+          + (f"mongod at {args.mongo_url}" if args.mongo_url else f"simulated round trip {args.rtt_ms} ms + {args.write_ms} ms per write")
+          + (", journal not fsynced" if args.no_fsync else ""))
+    bench_pricing(carts[:300])
+    bench_orders(flask_app, carts, args.clients, args.write_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Benchmark: concurrent byte-range requests against the hero videos.
+
+Compares Flask's default static file handler (``send_from_directory``)
+with ``send_file_range`` from ``api/utils/ranged_files.py`` under many
+concurrent clients, each fetching random ``--range-kb`` slices of a video
+over keep-alive connections. It reports p50/p95/p99 latency, throughput
+and the server's peak memory.
+
+The server is a minimal app exposing the two handlers, started either
+in process (Werkzeug's threaded dev server, chunked reads) or, with
+``--gunicorn``, as a gunicorn subprocess where ``send_file_range`` uses
+``sendfile()``. ``--url`` benchmarks an already running server instead
+(e.g. the real app: ``--url http://127.0.0.1:8000/static``).
+
+Usage (from the ``backend`` folder)::
+
+    python -m benchmarks.bench_range_requests [--clients 16] [--requests 50] [--range-kb 256]
+    python -m benchmarks.bench_range_requests --gunicorn --clients 64
+"""
+
+import argparse
+import http.client
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from flask import Flask, send_from_directory
+
+from api.utils.ranged_files import send_file_range
+from benchmarks.common import summarize
+
+STATIC_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "static"))
+
+bench_app = Flask(__name__)
+
+
+@bench_app.get("/default/<path:filename>")
+def default_handler(filename):
+    return send_from_directory(STATIC_DIR, filename, conditional=True)
+
+
+@bench_app.get("/ranged/<path:filename>")
+def ranged_handler(filename):
+    return send_file_range(os.path.join(STATIC_DIR, filename))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_inprocess_server(port):
+    import logging
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # no per-request log lines
+    server = make_server("127.0.0.1", port, bench_app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_gunicorn(port, workers):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-b", f"127.0.0.1:{port}", "-w", str(workers),
+         "--threads", "16", "--log-level", "warning", "benchmarks.bench_range_requests:bench_app"],
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("gunicorn did not start")
+
+
+def peak_rss_kb(pids):
+    """Peak resident memory (VmHWM) of the given processes, Linux only."""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as fh:
+                for line in fh:
+                    if line.startswith("VmHWM:"):
+                        total += int(line.split()[1])
+        except OSError:
+            pass
+    return total or None
+
+
+def run_clients(base_url, path, size, clients, requests, range_bytes):
+    """Each client issues ``requests`` random range GETs on one connection."""
+    url = urlsplit(base_url)
+    samples, errors, transferred = [], [], [0]
+    lock = threading.Lock()
+
+    def client(seed):
+        rng = random.Random(seed)
+        connection = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+        local, moved = [], 0
+        for _ in range(requests):
+            start = rng.randrange(0, max(1, size - range_bytes))
+            stop = min(size, start + range_bytes) - 1
+            t0 = time.perf_counter()
+            connection.request("GET", f"{url.path}/{path}", headers={"Range": f"bytes={start}-{stop}"})
+            response = connection.getresponse()
+            body = response.read()
+            local.append((time.perf_counter() - t0) * 1000)
+            moved += len(body)
+            if response.status != 206 or len(body) != stop - start + 1:
+                with lock:
+                    errors.append(f"{response.status} {len(body)} bytes")
+        connection.close()
+        with lock:
+            samples.extend(local)
+            transferred[0] += moved
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        **summarize(samples),
+        "requests_per_s": round(len(samples) / elapsed, 1),
+        "mb_per_s": round(transferred[0] / elapsed / (1 << 20), 1),
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", default="videos/green_animation.mp4")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--range-kb", type=int, default=256)
+    parser.add_argument("--gunicorn", action="store_true", help="serve with gunicorn (sendfile)")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--url", help="benchmark a running server: base URL of the static files")
+    args = parser.parse_args()
+
+    size = os.path.getsize(os.path.join(STATIC_DIR, args.file))
+    process = server = None
+    if args.url:
+        targets = {"server": args.url.rstrip("/")}
+    else:
+        port = free_port()
+        if args.gunicorn:
+            process = start_gunicorn(port, args.workers)
+        else:
+            server = start_inprocess_server(port)
+        base = f"http://127.0.0.1:{port}"
+        targets = {"default": f"{base}/default", "ranged": f"{base}/ranged"}
+
+    print(f"{args.file}: {size / 1024:.0f} KB, {args.clients} clients x {args.requests} requests "
+          f"of {args.range_kb} KB ({'gunicorn' if args.gunicorn else args.url or 'werkzeug'})")
+    print(f"{'handler':<9} {'req/s':>8} {'MB/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    try:
+        for name, base_url in targets.items():
+            result = run_clients(base_url, args.file, size, args.clients, args.requests, args.range_kb * 1024)
+            print(f"{name:<9} {result['requests_per_s']:>8} {result['mb_per_s']:>8} {result['p50_ms']:>8} "
+                  f"{result['p95_ms']:>8} {result['p99_ms']:>8} {result['errors']:>7}")
+    finally:
+        if process is not None:
+            children = subprocess.run(["pgrep", "-P", str(process.pid)], capture_output=True, text=True)
+            pids = [process.pid] + [int(pid) for pid in children.stdout.split()]
+            print(f"gunicorn peak RSS: {peak_rss_kb(pids)} KB")
+            process.terminate()
+            process.wait()
+        if server is not None:
+            print(f"server peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss} KB")
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
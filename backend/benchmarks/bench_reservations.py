@@ -0,0 +1,174 @@
+"""Benchmark: table booking under contention, and availability lookups.
+
+1. ``contention``: ``--bookers`` threads, released together, each try to
+   book ``--attempts`` tables at a few hot times (``--times``) on the same
+   day, with parties of 2-6:
+
+   - ``read-then-write``  the naive way: read the day's bookings, pick a
+                          free table, then add the booking,
+   - ``conditional``      ``book_table``: the availability index picks the
+                          table, an atomic conditional update claims it.
+
+   Reported: tables booked, requests turned away, double bookings found
+   in the database afterwards, latency and round trips per attempt.
+2. ``availability``: latency of an availability lookup on a busy day,
+   from the in-memory index vs loading the day's bookings per request.
+
+By default the database is mongomock with a simulated ``--rtt-ms`` round
+trip (``simulate_round_trips``). mongomock does not apply an update
+atomically the way a server applies it to one document, so here every
+update runs under one lock, which gives the same guarantee. With
+``--mongo-url`` a real, disposable mongod is used and nothing is
+simulated.
+
+Usage (from the ``backend`` folder)::
+
+    python -m benchmarks.bench_reservations [--bookers 64] [--attempts 5]
+                                            [--times 17:00 18:30 20:00] [--rtt-ms 2]
+"""
+
+import argparse
+import datetime
+import random
+import threading
+import time
+from functools import wraps
+
+from benchmarks.common import connect_database, round_trips, simulate_round_trips, summarize
+
+
+def serialize_updates():
+    """Apply each mongomock update under one lock, as a server applies it to a document."""
+    import mongomock.collection
+
+    lock = threading.Lock()
+    original = mongomock.collection.Collection.update_one
+
+    @wraps(original)
+    def update_one(self, *args, **kwargs):
+        with lock:
+            return original(self, *args, **kwargs)
+
+    mongomock.collection.Collection.update_one = update_one
+
+
+def read_then_write(booking):
+    """The naive booking: no condition on the write, so a race double-books."""
+    from api.v1.reservations.reservation_index import free_starts
+    from api.v1.reservations.reservation_model import TABLES, TableSchedule, load_day, new_reservation
+
+    masks = load_day(booking["date"])
+    for table, seats in TABLES.items():
+        if seats >= booking["guests"] and free_starts(masks.get(table, 0)) >> booking["start"] & 1:
+            reservation = new_reservation(booking)
+            slots = list(range(reservation["start"], reservation["end"]))
+            TableSchedule._get_collection().update_one(
+                {"date": booking["date"], "table": table},
+                {"$push": {"slots": {"$each": slots}, "reservations": reservation}},
+                upsert=True,
+            )
+            return table, reservation
+    return None
+
+
+def double_bookings(date):
+    """Pairs of reservations that overlap on the same table."""
+    from api.v1.reservations.reservation_model import TableSchedule
+
+    overlaps = 0
+    for schedule in TableSchedule._get_collection().find({"date": date}):
+        spans = sorted((r["start"], r["end"]) for r in schedule.get("reservations", ()))
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            overlaps += start < end
+    return overlaps
+
+
+def contention(label, book, bookings, bookers, date):
+    from api.v1.reservations.reservation_model import TableSchedule
+
+    TableSchedule._get_collection().delete_many({"date": date})
+    barrier = threading.Barrier(bookers)
+    per_thread = [bookings[n::bookers] for n in range(bookers)]
+    samples = []
+    booked = []
+
+    def booker(mine):
+        barrier.wait()
+        for booking in mine:
+            start = time.perf_counter()
+            result = book(booking)
+            samples.append((time.perf_counter() - start) * 1000)
+            if result is not None:
+                booked.append(result)
+
+    start_trips = round_trips.count
+    threads = [threading.Thread(target=booker, args=(mine,)) for mine in per_thread]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    trips = (round_trips.count - start_trips) / len(bookings)
+
+    stats = summarize(samples)
+    print(f"{label:<16} {len(booked):>7} {len(bookings) - len(booked):>7} {double_bookings(date):>7} "
+          f"{stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f} {trips:>9.2f}")
+
+
+def availability(date, lookups):
+    from api.v1.reservations.reservation_index import AvailabilityIndex
+    from api.v1.reservations.reservation_model import TABLES, load_day
+
+    print(f"{'availability':<16} {'p50 ms':>8} {'p99 ms':>8} {'trips/lookup':>12}")
+    for label, index in (("index", AvailabilityIndex(load_day, TABLES, ttl=3600)),
+                         ("load per lookup", AvailabilityIndex(load_day, TABLES, ttl=0))):
+        index.available_starts(date, 2)
+        samples = []
+        start_trips = round_trips.count
+        for n in range(lookups):
+            start = time.perf_counter()
+            index.available_starts(date, 2 + n % 5)
+            samples.append((time.perf_counter() - start) * 1000)
+        stats = summarize(samples)
+        print(f"{label:<16} {stats['p50_ms']:>8.3f} {stats['p99_ms']:>8.3f} "
+              f"{(round_trips.count - start_trips) / lookups:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookers", type=int, default=64)
+    parser.add_argument("--attempts", type=int, default=5, help="bookings per booker")
+    parser.add_argument("--times", nargs="+", default=["17:00", "18:30", "20:00"])
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    parser.add_argument("--mongo-url", default=None, help="real, disposable mongod (database is dropped)")
+    args = parser.parse_args()
+
+    connect_database(args.mongo_url)
+    from api.v1.reservations.reservation_index import AvailabilityIndex, book_table
+    from api.v1.reservations.reservation_model import TABLES, TableSchedule, load_day, validate_reservation
+
+    TableSchedule.ensure_indexes()
+    if not args.mongo_url:
+        serialize_updates()
+        simulate_round_trips(args.rtt_ms)
+
+    date = (datetime.date.today() + datetime.timedelta(days=7)).isoformat()
+    rng = random.Random(5)
+    bookings = [
+        validate_reservation({"name": f"Guest {n}", "email": f"guest{n}@example.com", "date": date,
+                              "time": rng.choice(args.times), "guests": rng.randint(2, 6)})
+        for n in range(args.bookers * args.attempts)
+    ]
+
+    print(f"{len(TABLES)} tables, {args.bookers} bookers x {args.attempts} attempts at {' '.join(args.times)}, "
+          + (f"mongod at {args.mongo_url}" if args.mongo_url else f"simulated round trip {args.rtt_ms} ms"))
+    print(f"{'contention':<16} {'booked':>7} {'refused':>7} {'double':>7} {'p50 ms':>8} {'p99 ms':>8} {'trips/try':>9}")
+    contention("read-then-write", read_then_write, bookings, args.bookers, date)
+    index = AvailabilityIndex(load_day, TABLES, ttl=30)
+    contention("conditional", lambda booking: book_table(booking, index), bookings, args.bookers, date)
+
+    availability(date, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark: cold start of the Flask app (``app.py``).
+
+Every measurement is a fresh ``python`` process, as when a worker starts
+after scaling from zero or a deploy:
+
+1. ``import``: ``python -X importtime -c "import app"``. Reported: the
+   total, the modules first loaded by ``app``'s own imports (slowest
+   first) and whether the MongoDB stack (MongoEngine, PyMongo) was loaded.
+2. ``first response``: per path, the median over ``--runs`` processes of
+   the time from process start until ``app`` is imported, and until the
+   first request (through ``app.test_client()``) is answered. Also shown:
+   whether that first request loaded the MongoDB stack.
+
+``/`` and ``/healthz`` need no database. ``/api/v1/menu/`` does: with
+``--mongo-url`` the processes use that mongod (``DATABASE_URL``); by
+default an empty in-memory mongomock database is registered after ``app``
+is imported, off the clock. mongomock imports PyMongo, so in that mode
+the first API response does not include loading PyMongo; use
+``--mongo-url`` for the full figure.
+
+Usage (from the ``backend`` folder)::
+
+    python -m benchmarks.bench_startup [--runs 5] [--top 12]
+                                       [--paths / /healthz /api/v1/menu/]
+                                       [--mongo-url mongodb://localhost:27017/menu_bench]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DB_MODULES = ("mongoengine", "pymongo")
+
+# Runs in the measured process: import the app, answer one request,
+# print the timings as JSON on the last line.
+CHILD = r"""
+import json, os, sys, time
+spawned = float(os.environ["BENCH_SPAWNED"])
+path = sys.argv[1]
+import app
+imported = time.time()
+if path.startswith("/api/") and os.environ.get("BENCH_MONGOMOCK"):
+    import mongomock
+    from mongoengine import connect
+    connect(db="startup_bench", host="mongodb://localhost", mongo_client_class=mongomock.MongoClient)
+db_before = [name for name in ("mongoengine", "pymongo") if name in sys.modules]
+start = time.time()
+status = app.app.test_client().get(path).status_code
+done = time.time()
+print(json.dumps({
+    "status": status,
+    "import_ms": (imported - spawned) * 1000,
+    "request_ms": (done - start) * 1000,
+    "db_before": db_before,
+    "db_after": [name for name in ("mongoengine", "pymongo") if name in sys.modules],
+}))
+"""
+
+
+def child_env(journal_dir, mongo_url):
+    env = dict(os.environ, ORDER_JOURNAL_DIR=journal_dir)
+    if mongo_url:
+        env["DATABASE_URL"] = mongo_url
+    else:
+        env["BENCH_MONGOMOCK"] = "1"
+    return env
+
+
+def parse_importtime(stderr):
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        list[tuple]: ``(depth, name, self_us, cumulative_us)`` in output order.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_breakdown(env, top):
+    command = [sys.executable, "-X", "importtime", "-c", "import app"]
+    # Warm-up: compile .pyc files and fill the OS file cache.
+    subprocess.run(command, cwd=BACKEND, env=env, capture_output=True)
+    result = subprocess.run(command, cwd=BACKEND, env=env, capture_output=True, text=True)
+    rows = parse_importtime(result.stderr)
+    total = next(cumulative for depth, name, _, cumulative in rows if depth == 0 and name == "app")
+    # -X importtime prints a module after its imports, so app's direct
+    # imports are the depth-1 rows between the previous top-level row
+    # (interpreter startup) and the "app" row.
+    app_row = next(n for n, row in enumerate(rows) if row[0] == 0 and row[1] == "app")
+    first = max((n for n, row in enumerate(rows[:app_row]) if row[0] == 0), default=-1) + 1
+    children = [row for row in rows[first:app_row] if row[0] == 1]
+    loaded = {name: cumulative for depth, name, _, cumulative in rows if name in DB_MODULES}
+
+    print(f"import app: {total / 1000:.1f} ms   MongoDB stack loaded: "
+          + (", ".join(f"{name} ({us / 1000:.1f} ms)" for name, us in loaded.items()) or "no"))
+    print(f"{'module':<44} {'cumulative ms':>13}")
+    for _, name, _, cumulative in sorted(children, key=lambda row: -row[3])[:top]:
+        print(f"{name:<44} {cumulative / 1000:>13.1f}")
+
+
+def first_response(env, path, runs):
+    samples = []
+    for _ in range(runs):
+        env["BENCH_SPAWNED"] = repr(time.time())
+        result = subprocess.run([sys.executable, "-c", CHILD, path], cwd=BACKEND, env=env,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise SystemExit(f"{path}: child failed\n{result.stderr}")
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    import_ms = statistics.median(sample["import_ms"] for sample in samples)
+    request_ms = statistics.median(sample["request_ms"] for sample in samples)
+    last = samples[-1]
+    loaded = "yes" if set(last["db_after"]) - set(last["db_before"]) else ("preloaded" if last["db_before"] else "no")
+    print(f"{path:<20} {last['status']:>6} {import_ms:>10.1f} {request_ms:>12.1f} "
+          f"{import_ms + request_ms:>10.1f}  {loaded}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="processes per path")
+    parser.add_argument("--top", type=int, default=12, help="direct imports of app to list")
+    parser.add_argument("--paths", nargs="+", default=["/", "/healthz", "/api/v1/menu/"])
+    parser.add_argument("--mongo-url", default=None, help="mongod for the API path (DATABASE_URL)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as journal_dir:
+        env = child_env(journal_dir, args.mongo_url)
+        import_breakdown(env, args.top)
+        print()
+        print(f"first response, median of {args.runs} processes "
+              + (f"(mongod at {args.mongo_url})" if args.mongo_url else "(API path on mongomock)"))
+        print(f"{'path':<20} {'status':>6} {'import ms':>10} {'request ms':>12} {'total ms':>10}  loads MongoDB")
+        for path in args.paths:
+            first_response(env, path, args.runs)
+
+
+if __name__ == "__main__":
+    main()
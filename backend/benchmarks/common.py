@@ -0,0 +1,185 @@
+"""Shared helpers for the benchmark scripts.
+
+- ``connect_database`` points MongoEngine at a real mongod (``--mongo-url``)
+  or at an in-memory mongomock stand-in, so benchmarks run anywhere.
+- ``simulate_round_trips`` adds a fixed network delay to every mongomock
+  collection call and counts them, which makes round-trip savings visible
+  even without a real server.
+- ``make_menu_document`` / ``seed_menu_items`` build realistic menu data.
+- ``summarize`` turns latency samples into p50/p95/p99 figures.
+"""
+
+import threading
+import time
+from functools import wraps
+
+from bson import ObjectId
+from mongoengine import connect, disconnect
+from pymongo import monitoring
+
+CATEGORIES = ("starter", "main", "dessert", "side", "drink")
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Collection methods that cost one round trip on a real server.
+ROUND_TRIP_METHODS = (
+    "find", "find_one", "insert_one", "insert_many", "update_one", "update_many",
+    "delete_one", "delete_many", "find_one_and_update", "find_one_and_delete",
+    "bulk_write", "count_documents", "aggregate",
+)
+
+
+class RoundTripCounter(monitoring.CommandListener):
+    """Counts database commands (real mongod) or wrapped calls (mongomock)."""
+
+    def __init__(self):
+        self.count = 0
+        self._local = threading.local()
+
+    def add(self):
+        self.count += 1
+        self._local.count = self.thread_count() + 1
+
+    def thread_count(self):
+        """Round trips made by the calling thread (leaves out background threads)."""
+        return getattr(self._local, "count", 0)
+
+    def started(self, event):
+        self.add()
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+round_trips = RoundTripCounter()
+
+
+def connect_database(mongo_url=None, db_name="menu_bench"):
+    """
+    Connect MongoEngine's default alias for a benchmark run.
+
+    Args:
+        mongo_url (str | None): URL of a real (disposable!) mongod. When None
+            an in-memory mongomock client is used instead.
+        db_name (str): Database to use; it is dropped by ``seed_menu_items``.
+    """
+    disconnect()
+    if mongo_url:
+        connect(db=db_name, host=mongo_url, event_listeners=[round_trips])
+    else:
+        import mongomock
+
+        _patch_mongomock_bulk_update()
+        connect(db=db_name, host="mongodb://localhost", mongo_client_class=mongomock.MongoClient)
+
+
+def _patch_mongomock_bulk_update():
+    """
+    Let mongomock accept the ``sort`` argument newer PyMongo versions pass
+    to bulk updates (``UpdateOne(..., sort=None)``); mongomock predates it.
+    """
+    import inspect
+    import mongomock.collection
+
+    builder = mongomock.collection.BulkOperationBuilder
+    parameters = inspect.signature(builder.add_update, follow_wrapped=False).parameters
+    if "sort" in parameters:
+        return
+    original = builder.add_update
+
+    @wraps(original)
+    def add_update(self, *args, sort=None, **kwargs):
+        return original(self, *args, **kwargs)
+
+    builder.add_update = add_update
+
+
+def simulate_round_trips(rtt_ms):
+    """
+    Make every mongomock collection call sleep ``rtt_ms`` and count it.
+
+    Only affects mongomock; a real mongod already has real latency.
+    """
+    import mongomock.collection
+
+    delay = rtt_ms / 1000.0
+    # mongomock implements some methods on top of others (e.g.
+    # find_one_and_update calls find); only the outermost call is a trip.
+    depth = threading.local()
+    for name in ROUND_TRIP_METHODS:
+        original = getattr(mongomock.collection.Collection, name)
+
+        def wrapper(self, *args, _original=original, **kwargs):
+            nested = getattr(depth, "active", False)
+            if not nested:
+                round_trips.add()
+                if delay:
+                    time.sleep(delay)
+            depth.active = True
+            try:
+                return _original(self, *args, **kwargs)
+            finally:
+                depth.active = nested
+
+        setattr(mongomock.collection.Collection, name, wraps(original)(wrapper))
+
+
+def make_menu_document(n):
+    """Build one raw menu document shaped like the stored ones."""
+    return {
+        "_id": ObjectId(),
+        "name": f"Dish {n}",
+        "description": "Crispy potato bites tossed in northern spice, served with cool dill sauce.",
+        "price": 5.5 + n % 20,
+        "category": CATEGORIES[n % len(CATEGORIES)],
+        "image": "Aurora-Bites.jpg",
+        "dietary": [("vegetarian", "vegan", "gluten-free")[n % 3]],
+        "allergens": [("milk", "gluten", "nuts", "fish")[n % 4]],
+        "ingredients": ["potato", "flour", "egg", "spices", "dill", "butter"],
+        "days_of_week": [DAYS[n % 7], DAYS[(n + 3) % 7]],
+        "active": n % 10 != 0,
+        "version": 1,
+    }
+
+
+def seed_menu_items(count):
+    """
+    Replace the menu collection with ``count`` generated items.
+
+    Returns:
+        list[str]: The ids of the inserted items.
+    """
+    from api.v1.menu.menu_model import MenuItem, menu_cache, dietary_mask, allergen_mask
+
+    collection = MenuItem._get_collection()
+    collection.delete_many({})
+    documents = [make_menu_document(n) for n in range(count)]
+    for document in documents:
+        document["dietary_mask"] = dietary_mask(document["dietary"])
+        document["allergen_mask"] = allergen_mask(document["allergens"])
+    for start in range(0, count, 10000):
+        collection.insert_many(documents[start:start + 10000])
+    menu_cache.invalidate()
+    return [str(document["_id"]) for document in documents]
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return None
+    rank = max(0, min(len(sorted_samples) - 1, round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def summarize(samples_ms):
+    """Return count, mean and p50/p95/p99 (milliseconds) for latency samples."""
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 4) if ordered else None,
+        "p50_ms": round(percentile(ordered, 50), 4) if ordered else None,
+        "p95_ms": round(percentile(ordered, 95), 4) if ordered else None,
+        "p99_ms": round(percentile(ordered, 99), 4) if ordered else None,
+    }
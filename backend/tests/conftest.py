@@ -0,0 +1,29 @@
+"""Shared fixtures: the Flask app on an in-memory mongomock database."""
+
+import os
+import tempfile
+
+import pytest
+
+# Before the app is imported: the order queue reads it in init_app.
+os.environ.setdefault("ORDER_JOURNAL_DIR", tempfile.mkdtemp(prefix="order_journal_"))
+
+
+@pytest.fixture
+def database():
+    """A fresh mongomock database with 5 menu items; yields their ids."""
+    from benchmarks.common import connect_database, seed_menu_items
+
+    connect_database(db_name="menu_test")
+    from api.v1.menu.menu_revisions import MenuRevision, MenuTombstone
+
+    MenuRevision._get_collection().delete_many({})
+    MenuTombstone._get_collection().delete_many({})
+    yield seed_menu_items(5)
+
+
+@pytest.fixture
+def client(database):
+    from app import app
+
+    return app.test_client()
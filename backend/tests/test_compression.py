@@ -0,0 +1,46 @@
+"""Tests for the compressed-variant cache of ``CompressionMiddleware``."""
+
+import gzip
+import json
+
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from api.utils.compression import CompressionMiddleware
+
+
+def json_app(environ, start_response):
+    """Every resource answers its own JSON body, all with the same ETag."""
+    body = json.dumps({"path": environ["PATH_INFO"], "query": environ.get("QUERY_STRING", ""), "padding": "x" * 2048})
+    response = Response(body, mimetype="application/json")
+    response.headers["ETag"] = '"2"'
+    return response(environ, start_response)
+
+
+def gzip_json(client, url, method="GET"):
+    response = client.open(url, method=method, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    return json.loads(gzip.decompress(response.data))
+
+
+def test_resources_sharing_an_etag_get_their_own_body():
+    client = Client(CompressionMiddleware(json_app, min_size=0))
+    for path in ("/api/v1/menu/a", "/api/v1/menu/b", "/api/v1/menu/a", "/api/v1/menu/b"):
+        assert gzip_json(client, path)["path"] == path
+
+
+def test_query_string_is_part_of_the_resource():
+    client = Client(CompressionMiddleware(json_app, min_size=0))
+    assert gzip_json(client, "/api/v1/menu/?page=1")["query"] == "page=1"
+    assert gzip_json(client, "/api/v1/menu/?page=2")["query"] == "page=2"
+
+
+def test_only_get_responses_are_cached():
+    middleware = CompressionMiddleware(json_app, min_size=0)
+    client = Client(middleware)
+    gzip_json(client, "/api/v1/menu/a", method="PUT")
+    assert middleware.cache.stats()["entries"] == 0
+    gzip_json(client, "/api/v1/menu/a")
+    gzip_json(client, "/api/v1/menu/a")
+    assert middleware.cache.stats()["entries"] == 1
+    assert middleware.cache.stats()["hits"] == 1
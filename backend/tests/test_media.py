@@ -0,0 +1,55 @@
+"""Tests for ``GET /media/<name>`` when the variant cache evicts under it."""
+
+import os
+
+import pytest
+from flask import Flask
+
+pytest.importorskip("PIL")
+
+from api.media import media_routes
+from api.media.image_pipeline import SOURCE_DIR, VariantCache
+
+NAME = sorted(name for name in os.listdir(SOURCE_DIR) if name.endswith(".jpg"))[0]
+
+
+@pytest.fixture
+def media(tmp_path, monkeypatch):
+    """A test client on an empty variant cache whose first ``evictions``
+    variants are deleted right after ``get_variant`` returns them."""
+    cache = VariantCache(cache_dir=str(tmp_path))
+    get_variant = cache.get_variant
+    state = {"evictions": 0, "calls": 0}
+
+    def evicting_get_variant(*args):
+        target, key = get_variant(*args)
+        state["calls"] += 1
+        if state["evictions"]:
+            state["evictions"] -= 1
+            os.remove(target)
+        return target, key
+
+    monkeypatch.setattr(cache, "get_variant", evicting_get_variant)
+    monkeypatch.setattr(media_routes, "variant_cache", cache)
+    app = Flask(__name__)
+    app.register_blueprint(media_routes.media_bp)
+    return app.test_client(), cache, state
+
+
+def test_evicted_variant_is_generated_again(media):
+    client, cache, state = media
+    state["evictions"] = 1
+    response = client.get(f"/media/{NAME}?w=320&fmt=jpeg")
+    assert response.status_code == 200
+    assert response.mimetype == "image/jpeg"
+    assert response.data[:2] == b"\xff\xd8"
+    assert state["calls"] == 2
+    assert cache.misses == 2
+
+
+def test_variant_evicted_twice_falls_back_to_the_original(media):
+    client, _, state = media
+    state["evictions"] = 2
+    response = client.get(f"/media/{NAME}?w=320&fmt=jpeg")
+    assert response.status_code == 302
+    assert response.location.endswith("/static/assets/" + NAME.replace(" ", "%20"))
@@ -0,0 +1,47 @@
+"""Tests for POST /api/v1/menu/bulk: per-operation statuses and tombstones."""
+
+import mongomock.collection
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+
+from api.v1.menu.menu_model import MenuItem, bulk_write_menu_items, validate_bulk_operations
+from api.v1.menu.menu_revisions import MenuTombstone
+
+
+def statuses(body):
+    return [result["status"] for result in body["results"]]
+
+
+def test_each_operation_gets_its_own_status(client, database):
+    missing = str(ObjectId())
+    gone = str(ObjectId())
+    response = client.post("/api/v1/menu/bulk", json=[
+        {"op": "create", "data": {"name": "Cloudberry tart", "category": "dessert", "price": 6}},
+        {"op": "update", "id": database[0], "data": {"price": 11.0}},
+        {"op": "update", "id": missing, "data": {"price": 1.0}},
+        {"op": "delete", "id": database[1]},
+        {"op": "delete", "id": gone},
+    ])
+    body = response.get_json()
+    assert response.status_code == 200
+    assert statuses(body) == ["created", "updated", "not_found", "deleted", "not_found"]
+    assert (body["created"], body["updated"], body["deleted"], body["failed"]) == (1, 1, 1, 2)
+
+    assert MenuItem.objects.get(id=database[0]).price == 11.0
+    assert MenuItem.objects(id=database[1]).count() == 0
+    assert MenuItem.objects(name="Cloudberry tart").count() == 1
+    tombstones = {raw["_id"] for raw in MenuTombstone._get_collection().find()}
+    assert tombstones == {ObjectId(database[1])}
+
+
+def test_failed_batch_leaves_no_tombstones(database, monkeypatch):
+    def unreachable(self, *args, **kwargs):
+        raise AutoReconnect("connection reset")
+
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", unreachable)
+    prepared, _ = validate_bulk_operations([{"op": "delete", "id": database[0]}])
+    with pytest.raises(AutoReconnect):
+        bulk_write_menu_items(prepared)
+    assert MenuTombstone._get_collection().count_documents({}) == 0
+    assert MenuItem.objects(id=database[0]).count() == 1
@@ -0,0 +1,109 @@
+"""Tests for menu revisions, tombstones and GET /api/v1/menu/changes."""
+
+import threading
+
+from bson import ObjectId
+
+from api.v1.menu import menu_revisions
+from api.v1.menu.menu_model import MenuItem, menu_changes_since
+from api.v1.menu.menu_revisions import (
+    PENDING, MenuTombstone, assign_revisions, claim_revisions, record_tombstones, revision_state,
+    settle_revisions,
+)
+
+
+def test_changes_since_lists_upserts_and_deletes(client, database):
+    client.put(f"/api/v1/menu/{database[0]}", json={"price": 1.5})
+    assign_revisions()
+    since = revision_state()["settled"]
+
+    client.put(f"/api/v1/menu/{database[1]}", json={"price": 2.5})
+    created = client.post("/api/v1/menu/", json={"name": "Rye bread", "category": "side", "price": 3}).get_json()
+    client.delete(f"/api/v1/menu/{database[2]}")
+    assign_revisions()
+
+    delta = menu_changes_since(since)
+    assert delta["full"] is False
+    assert delta["rev"] == since + 3
+    assert {item["id"] for item in delta["upserted"]} == {database[1], created["id"]}
+    assert delta["deleted"] == [database[2]]
+    assert menu_changes_since(delta["rev"])["upserted"] == []
+
+
+def test_changes_without_since_is_the_full_menu(client, database):
+    client.put(f"/api/v1/menu/{database[0]}", json={"price": 1.5})
+    assign_revisions()
+    body = client.get("/api/v1/menu/changes").get_json()
+    assert body["full"] is True
+    assert len(body["items"]) == len(database)
+
+
+def test_pending_writes_are_not_in_a_delta(database):
+    collection = MenuItem._get_collection()
+    collection.update_one({"_id": ObjectId(database[1])}, {"$set": {"rev": PENDING}})
+    assign_revisions()
+    since = revision_state()["settled"]
+    collection.update_one({"_id": ObjectId(database[0])}, {"$set": {"rev": PENDING}})
+    assert menu_changes_since(since)["upserted"] == []
+    assign_revisions()
+    assert [item["id"] for item in menu_changes_since(since)["upserted"]] == [database[0]]
+
+
+def test_settle_waits_for_earlier_claims(database):
+    first = claim_revisions()
+    second = claim_revisions()
+    waiter = threading.Thread(target=settle_revisions, args=second)
+    waiter.start()
+    waiter.join(0.05)
+    assert revision_state()["settled"] == first[0] - 1
+    assert settle_revisions(*first) is True
+    waiter.join()
+    assert revision_state()["settled"] == second[1]
+
+
+def test_settle_times_out_and_the_late_claim_learns_it(database, monkeypatch):
+    monkeypatch.setattr(menu_revisions, "MENU_REV_SETTLE_TIMEOUT", 0.05)
+    slow = claim_revisions()
+    fast = claim_revisions()
+    assert settle_revisions(*fast) is True
+    assert revision_state()["settled"] == fast[1]
+    assert settle_revisions(*slow) is False
+
+
+def test_skipped_stamps_are_numbered_again(database, monkeypatch):
+    settle = menu_revisions.settle_revisions
+    skipped = []
+
+    def skip_once(first, last):
+        # Only the test's own pass; the sequencer thread settles normally.
+        if threading.current_thread() is threading.main_thread() and not skipped:
+            skipped.append((first, last))
+            settle(first, last)
+            return False
+        return settle(first, last)
+
+    monkeypatch.setattr(menu_revisions, "settle_revisions", skip_once)
+    collection = MenuItem._get_collection()
+    collection.update_one({"_id": ObjectId(database[0])}, {"$set": {"rev": PENDING}})
+    assign_revisions()
+    assert collection.find_one({"_id": ObjectId(database[0])})["rev"] == PENDING
+
+    assign_revisions()
+    assert collection.find_one({"_id": ObjectId(database[0])})["rev"] > skipped[0][1]
+
+
+def test_tombstones_are_idempotent(database):
+    item_id = ObjectId(database[0])
+    record_tombstones([item_id, item_id])
+    record_tombstones([item_id])
+    assert MenuTombstone._get_collection().count_documents({"_id": item_id}) == 1
+
+
+def test_bulk_rejects_an_id_targeted_twice(client, database):
+    response = client.post("/api/v1/menu/bulk", json=[
+        {"op": "delete", "id": database[0]},
+        {"op": "delete", "id": database[0]},
+    ])
+    assert response.status_code == 400
+    assert response.get_json()["errors"] == [{"index": 1, "error": "duplicate id (also at index 0)"}]
+    assert MenuItem.objects(id=database[0]).count() == 1
@@ -0,0 +1,57 @@
+"""Tests for how ``SearchIndex`` builds its first index."""
+
+import threading
+from types import SimpleNamespace
+
+from api.v1.menu.menu_events import MenuChange
+from api.v1.menu.menu_search import SearchIndex
+
+
+def item(item_id, name):
+    return {"id": item_id, "name": name, "description": "", "ingredients": []}
+
+
+def slow_source(items, started, release):
+    def source():
+        started.set()
+        assert release.wait(5)
+        return SimpleNamespace(items=list(items))
+    return source
+
+
+def test_writes_during_the_first_build_are_not_blocked_and_are_replayed():
+    started, release = threading.Event(), threading.Event()
+    index = SearchIndex(slow_source([item("1", "Salmon soup"), item("2", "Pea soup")], started, release))
+    results = {}
+    searcher = threading.Thread(target=lambda: results.update(soup=index.search("soup")))
+    searcher.start()
+    assert started.wait(5)
+
+    # The build is running: writes return at once instead of waiting for it.
+    writer = threading.Thread(target=lambda: [
+        index.apply(MenuChange("create", "3", item("3", "Onion soup"))),
+        index.apply(MenuChange("delete", "2", None)),
+    ])
+    writer.start()
+    writer.join(1)
+    assert not writer.is_alive()
+
+    release.set()
+    searcher.join(5)
+    assert sorted(found["id"] for _, found in results["soup"]) == ["1", "3"]
+    assert index.rebuilds == 1
+
+
+def test_concurrent_first_searches_share_one_build():
+    started, release = threading.Event(), threading.Event()
+    index = SearchIndex(slow_source([item("1", "Salmon soup")], started, release))
+    results = []
+    searchers = [threading.Thread(target=lambda: results.append(index.search("salmon"))) for _ in range(4)]
+    for searcher in searchers:
+        searcher.start()
+    assert started.wait(5)
+    release.set()
+    for searcher in searchers:
+        searcher.join(5)
+    assert [[found["id"] for _, found in result] for result in results] == [["1"]] * 4
+    assert index.rebuilds == 1
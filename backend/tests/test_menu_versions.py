@@ -0,0 +1,62 @@
+"""Tests for the item ETag and If-Match on PUT /api/v1/menu/<id>."""
+
+from bson import ObjectId
+
+from api.v1.menu.menu_model import MenuItem, menu_cache
+
+
+def put(client, item_id, data, if_match=None):
+    headers = {"If-Match": if_match} if if_match else {}
+    return client.put(f"/api/v1/menu/{item_id}", json=data, headers=headers)
+
+
+def test_get_etag_is_accepted_by_put_and_bumps_the_version(client, database):
+    item_id = database[0]
+    etag = client.get(f"/api/v1/menu/{item_id}").headers["ETag"]
+    assert etag == f'"{item_id}-1"'
+
+    response = put(client, item_id, {"price": 9.5}, etag)
+    assert response.status_code == 200
+    assert response.get_json()["version"] == 2
+    assert response.headers["ETag"] == f'"{item_id}-2"'
+    assert client.get(f"/api/v1/menu/{item_id}").headers["ETag"] == response.headers["ETag"]
+
+
+def test_stale_etag_is_rejected_with_412(client, database):
+    item_id = database[0]
+    etag = client.get(f"/api/v1/menu/{item_id}").headers["ETag"]
+    assert put(client, item_id, {"price": 9.5}, etag).status_code == 200
+    response = put(client, item_id, {"price": 7.0}, etag)
+    assert response.status_code == 412
+    assert response.get_json()["version_expected"] == 1
+    assert MenuItem.objects.get(id=item_id).price == 9.5
+
+
+def test_items_at_the_same_version_have_different_etags(client, database):
+    etags = {client.get(f"/api/v1/menu/{item_id}").headers["ETag"] for item_id in database}
+    assert len(etags) == len(database)
+
+
+def test_bad_if_match(client, database):
+    item_id = database[0]
+    assert put(client, item_id, {"price": 1}, '"not-a-version"').status_code == 400
+    assert put(client, item_id, {"price": 1}, f'"{database[1]}-1"').status_code == 400
+    # Weak ETags never match under If-Match.
+    assert put(client, item_id, {"price": 1}, 'W/"x"').status_code == 412
+    assert put(client, ObjectId(), {"price": 1}).status_code == 404
+
+
+def test_item_without_version_field(client, database):
+    item_id = database[0]
+    MenuItem._get_collection().update_one({"_id": ObjectId(item_id)}, {"$unset": {"version": ""}})
+    menu_cache.invalidate()
+
+    etag = client.get(f"/api/v1/menu/{item_id}").headers["ETag"]
+    assert etag == f'"{item_id}-0"'
+    response = put(client, item_id, {"price": 3.0}, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{item_id}-1"'
+
+    # The old ETag no longer matches: no stale 304, no second update.
+    assert client.get(f"/api/v1/menu/{item_id}", headers={"If-None-Match": etag}).status_code == 200
+    assert put(client, item_id, {"price": 4.0}, etag).status_code == 412
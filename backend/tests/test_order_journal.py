@@ -0,0 +1,97 @@
+"""Tests for the order journal: done markers, truncation and recovery."""
+
+import os
+
+from bson import ObjectId, json_util
+
+from api.v1.orders.order_queue import OrderJournal, OrderWriteQueue, _pending_orders
+
+
+def order(n):
+    return {"_id": ObjectId(), "n": n}
+
+
+def lines(*records):
+    return [json_util.dumps(record).encode() for record in records]
+
+
+def write_journal(directory, name, records):
+    path = os.path.join(directory, name)
+    with open(path, "wb") as fh:
+        fh.write(b"".join(line + b"\n" for line in lines(*records)))
+    return path
+
+
+def test_done_lines_cover_written_orders():
+    first, second, third = order(1), order(2), order(3)
+    pending = _pending_orders(lines(
+        {"order": first}, {"order": second}, {"done": [first["_id"]]}, {"order": third},
+    ))
+    assert [document["n"] for document in pending] == [2, 3]
+
+
+def test_torn_last_line_is_ignored():
+    kept = order(1)
+    journal = lines({"order": kept}) + [b'{"order": {"_id": {"$oid": "65']
+    assert _pending_orders(journal) == [kept]
+
+
+def test_recover_takes_over_dead_journals(tmp_path):
+    written, unwritten = order(1), order(2)
+    dead = write_journal(tmp_path, "orders-1-1.jsonl",
+                         [{"order": written}, {"order": unwritten}, {"done": [written["_id"]]}])
+    journal = OrderJournal(str(tmp_path), fsync=False)
+    journal.open()
+
+    assert journal.recover() == [unwritten]
+    assert not os.path.exists(dead)
+    # Re-journaled before the old file was deleted.
+    with open(journal.path, "rb") as fh:
+        assert _pending_orders(fh.read().splitlines()) == [unwritten]
+    journal.close(remove=True)
+
+
+def test_recover_leaves_live_journals_alone(tmp_path):
+    live = OrderJournal(str(tmp_path), fsync=False)
+    live.open()
+    live.sync(live.append([{"order": order(1)}]))
+
+    journal = OrderJournal(str(tmp_path), fsync=False)
+    journal.open()
+    assert journal.recover() == []
+    assert os.path.exists(live.path)
+    journal.close(remove=True)
+    live.close(remove=True)
+
+
+def test_written_batches_empty_the_journal(tmp_path):
+    batches = []
+    queue = OrderWriteQueue(batches.append, directory=str(tmp_path), flush_interval=0, fsync=False)
+    for n in range(3):
+        queue.submit(order(n))
+    path = queue.journal.path
+    queue.stop()
+
+    assert sum(len(batch) for batch in batches) == 3
+    assert queue.stats()["written"] == 3
+    assert not os.path.exists(path)
+
+
+def test_unwritten_orders_are_replayed_by_the_next_queue(tmp_path):
+    def unreachable(batch):
+        raise ConnectionError("database down")
+
+    failing = OrderWriteQueue(unreachable, directory=str(tmp_path), flush_interval=0, fsync=False)
+    documents = [order(n) for n in range(2)]
+    for document in documents:
+        failing.submit(document)
+    failing.stop(timeout=0.5)
+    assert os.listdir(tmp_path)
+
+    batches = []
+    queue = OrderWriteQueue(batches.append, directory=str(tmp_path), flush_interval=0, fsync=False)
+    queue.start()
+    queue.stop()
+    assert queue.recovered == 2
+    assert [document["_id"] for batch in batches for document in batch] == [d["_id"] for d in documents]
+    assert os.listdir(tmp_path) == []
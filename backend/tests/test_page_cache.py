@@ -0,0 +1,43 @@
+"""Tests for the cache key of ``PageCache``."""
+
+from flask import Flask, request
+
+from api.utils.page_cache import MemoryBackend, PageCache
+
+
+def make_app():
+    cache = PageCache()
+    cache.backend = MemoryBackend(1 << 20)
+    cache.version = "test"
+    app = Flask(__name__)
+
+    @app.get("/about")
+    @cache.cached()
+    def about():
+        return "about"
+
+    @app.get("/search")
+    @cache.cached(params=("q",))
+    def search():
+        return f"results for {request.args.get('q', '')}"
+
+    return app, cache
+
+
+def test_undeclared_query_parameters_share_one_entry():
+    app, cache = make_app()
+    client = app.test_client()
+    for url in ("/about", "/about?utm_source=mail", "/about?_=1", "/about?_=2"):
+        assert client.get(url).data == b"about"
+    assert cache.backend.stats()["entries"] == 1
+    assert cache.hits == 3
+
+
+def test_declared_query_parameters_are_part_of_the_key():
+    app, cache = make_app()
+    client = app.test_client()
+    assert client.get("/search?q=soup").data == b"results for soup"
+    assert client.get("/search?q=stew&_=1").data == b"results for stew"
+    assert client.get("/search?_=2&q=soup").data == b"results for soup"
+    assert cache.backend.stats()["entries"] == 2
+    assert cache.hits == 1
@@ -0,0 +1,61 @@
+"""Tests for ``claim_table``: one table and time can only be booked once."""
+
+import threading
+
+import pytest
+
+from api.v1.reservations import reservation_model
+from api.v1.reservations.reservation_model import TableSchedule, claim_table, load_day, new_reservation
+
+DATE = "2030-06-01"
+
+
+@pytest.fixture
+def schedules(database, monkeypatch):
+    # Every test gets a new mongomock client: build the unique index again.
+    monkeypatch.setattr(reservation_model, "_indexes_ready", False)
+    TableSchedule._get_collection().delete_many({})
+
+
+def booking(start, name="Ada"):
+    return new_reservation({"name": name, "email": "ada@example.com",
+                            "guests": 2, "start": start, "note": None})
+
+
+def test_overlapping_claim_is_rejected(schedules):
+    assert claim_table(DATE, "T1", booking(76))
+    assert not claim_table(DATE, "T1", booking(80, name="Bob"))
+    raw = TableSchedule._get_collection().find_one({"date": DATE, "table": "T1"})
+    assert [r["name"] for r in raw["reservations"]] == ["Ada"]
+    assert raw["slots"] == list(range(76, 82))
+
+
+def test_free_slots_and_other_tables_can_be_claimed(schedules):
+    first = booking(76)
+    assert claim_table(DATE, "T1", first)
+    assert claim_table(DATE, "T1", booking(first["end"], name="Bob"))
+    assert claim_table(DATE, "T2", booking(76, name="Cy"))
+    assert claim_table("2030-06-02", "T1", booking(76, name="Di"))
+    assert load_day(DATE) == {
+        "T1": sum(1 << slot for slot in range(76, 88)),
+        "T2": sum(1 << slot for slot in range(76, 82)),
+    }
+
+
+def test_concurrent_claims_book_the_table_once(schedules):
+    barrier = threading.Barrier(8)
+    results = []
+
+    def claim(n):
+        reservation = booking(76 + n % 3, name=f"guest {n}")
+        barrier.wait()
+        results.append(claim_table(DATE, "T1", reservation))
+
+    threads = [threading.Thread(target=claim, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+    raw = TableSchedule._get_collection().find_one({"date": DATE, "table": "T1"})
+    assert len(raw["reservations"]) == 1
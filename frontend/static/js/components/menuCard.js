@@ -14,7 +14,7 @@
  * @returns {HTMLElement} A DOM node representing the card.
  */
 import {addToCart} from "../cart.js"
-import { resolveImageUrl } from "../utils/image-resolver.js";   
+import { resolveImageUrl, resolveImageSrcset } from "../utils/image-resolver.js";   
 
 export function createMenuCard(item) {
   // Create the root container for the card: <div class="menu-card">
@@ -25,10 +25,14 @@ export function createMenuCard(item) {
   // Access in JS via el.dataset.id
   
   el.dataset.id = item.id;
+  // The card wires its own buttons below; hydrateCards() in menu.js leaves it alone.
+  el.dataset.bound = "1";
 
   // resolve image source similar to menuRenderer: prefer image_url, then image filename, then fallback
-  const imgSrc = resolveImageUrl(item);
+  const imgSrc = resolveImageUrl(item, 640);
   el.dataset.img = imgSrc; // store resolved image URL for potential reuse
+  // Let the browser pick a resized variant for the card width and screen density.
+  const srcset = resolveImageSrcset(item);
 
   // Insert the card's inner structure.
  
@@ -36,6 +40,9 @@ export function createMenuCard(item) {
     <img
       class="menu-card__image"
       src="${imgSrc}"
+      ${srcset ? `srcset="${srcset}" sizes="(max-width: 40rem) 100vw, 25rem"` : ''}
+      loading="lazy"
+      decoding="async"
       alt="${item.name}"
     >
     <div class="menu-info">
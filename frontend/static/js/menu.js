@@ -3,13 +3,65 @@
 // - load the menu list from the service
 // - render menu cards
 // - respond to card events (open detail modal)
+// - keep the cards current with live changes from the menu stream
 
-import { getAllMenu, getMenuById } from "./services/menuService.js";
+import { getAllMenu, getMenuById, subscribeMenuChanges } from "./services/menuService.js";
 import { createMenuCard } from "./components/menuCard.js";
 import { renderItemDetail } from './ui/modalRenderer.js';
-import { renderMenuPage } from './ui/menuRenderer.js';
+import { renderMenuPage, renderMenuFragment, renderHighlights, patchMenuCard } from './ui/menuRenderer.js';
 import { createModal } from './components/modal.js';
-import { initCartUI } from "./cart.js";
+import { initCartUI, addToCart } from "./cart.js";
+
+/**
+ * Items of the current page keyed by id (filled from the embedded
+ * server-rendered data or from the API), so details open without a fetch.
+ * @type {Object<string, Object>}
+ */
+const itemsById = {};
+
+/** Options shared by the first render and later re-renders. */
+const MENU_OPTIONS = {
+  highlightOptions: { preferCategoryOrder: ['Main','Dessert','Starter'] },
+  menuOptions: { order: ['Starter','Main','Dessert','Side','Drink'], uppercase: false }
+};
+
+/**
+ * Read the menu JSON the server embedded in <script id="menu-data">.
+ *
+ * @returns {Object[]|null} The items, or null when the page was not server-rendered.
+ */
+function readEmbeddedMenu() {
+  const el = document.getElementById("menu-data");
+  if (!el) return null;
+  try {
+    return JSON.parse(el.textContent);
+  } catch (err) {
+    console.error("Invalid embedded menu data", err);
+    return null;
+  }
+}
+
+/**
+ * Wire the server-rendered cards in #menuList (one delegated listener
+ * instead of per-card listeners): "Details" dispatches the same
+ * 'show-detail' event as createMenuCard, "Add to cart" adds the item.
+ *
+ * @param {HTMLElement} container
+ */
+function hydrateCards(container) {
+  container.addEventListener("click", (e) => {
+    const card = e.target.closest(".menu-card");
+    // Cards added later by patchMenuCard wire their own buttons.
+    if (!card || !container.contains(card) || card.dataset.bound) return;
+    const id = card.dataset.id;
+    if (e.target.closest(".btn-detail")) {
+      card.dispatchEvent(new CustomEvent("show-detail", { bubbles: true, detail: { id } }));
+    } else if (e.target.closest(".btn-add") && itemsById[id]) {
+      e.stopPropagation();
+      addToCart(itemsById[id]);
+    }
+  });
+}
 /**
  * Load the menu list into the #menuList container.
  * 
@@ -19,6 +71,10 @@ import { initCartUI } from "./cart.js";
  *  3) Render cards efficiently using DocumentFragment
  *  4) Handle empty results and errors gracefully
  *
+ * When the server already rendered the grid (data-ssr), the embedded menu
+ * data is used instead: no fetch, the cards are hydrated and only the
+ * highlights are rendered here.
+ *
  * @async
  * @function loadMenu
  * @returns {Promise<void>}
@@ -32,10 +88,13 @@ async function loadMenu() {
   const el = document.getElementById("menuList");
   if (!el) return;
 
-  el.textContent = "Loading...";
+  const embedded = readEmbeddedMenu();
+  const serverRendered = Boolean(embedded) && el.dataset.ssr === "1";
+  if (!serverRendered) el.textContent = "Loading...";
 
   try {
-    const items = await getAllMenu();
+    const items = embedded || await getAllMenu();
+    items.forEach((item) => { itemsById[String(item.id || item._id)] = item; });
 
     // pick today's weekday name
     const todayName = new Date().toLocaleString(undefined, { weekday: 'long' }).toLowerCase();
@@ -47,10 +106,7 @@ async function loadMenu() {
     const highlight = today[0] || items.find(i => i.featured) || items[0];
 
     // Let the renderer build both highlights and the categorized menu fragment
-    const { highlightsNode, menuFragment } = renderMenuPage(items, {
-      highlightOptions: { preferCategoryOrder: ['Main','Dessert','Starter'] },
-      menuOptions: { order: ['Starter','Main','Dessert','Side','Drink'], uppercase: false }
-    });
+    const { highlightsNode, menuFragment } = renderMenuPage(items, MENU_OPTIONS);
 
     const highlightRoot = document.getElementById('highlight-root');
     if (highlightRoot) {
@@ -58,6 +114,11 @@ async function loadMenu() {
       highlightRoot.appendChild(highlightsNode);
     }
 
+    if (serverRendered) {
+      hydrateCards(el);
+      return;
+    }
+
     el.innerHTML = '';
     if (menuFragment) {
       el.appendChild(menuFragment);
@@ -70,6 +131,76 @@ async function loadMenu() {
   }
 }
 
+/**
+ * Items still on the menu: dishes taken off (active: false) are not shown
+ * once a live change or a reload has told us about them.
+ *
+ * @returns {Object[]}
+ */
+function visibleItems() {
+  return Object.values(itemsById).filter((item) => item.active !== false);
+}
+
+/**
+ * Re-render the highlights and, when `grid` is true, the whole card grid
+ * from itemsById.
+ *
+ * @param {boolean} grid
+ */
+function rerender(grid) {
+  const items = visibleItems();
+  const highlightRoot = document.getElementById('highlight-root');
+  if (highlightRoot) {
+    highlightRoot.innerHTML = '';
+    highlightRoot.appendChild(renderHighlights(items, MENU_OPTIONS.highlightOptions));
+  }
+  const el = document.getElementById("menuList");
+  if (grid && el) {
+    el.innerHTML = '';
+    el.appendChild(renderMenuFragment(items, MENU_OPTIONS.menuOptions));
+  }
+}
+
+/**
+ * Apply one change from the menu stream: merge the changed fields into the
+ * item and patch only its card. Changes the page already has (same or
+ * older version) are ignored.
+ *
+ * @param {Object} change - { op, id, version, fields }
+ */
+function applyMenuChange(change) {
+  const el = document.getElementById("menuList");
+  const id = String(change.id);
+  const known = itemsById[id];
+  if (change.op === "delete") {
+    delete itemsById[id];
+  } else {
+    if (known && change.version != null && known.version >= change.version) return;
+    itemsById[id] = { ...known, ...change.fields, id, version: change.version };
+  }
+
+  const item = itemsById[id];
+  const shown = item && item.active !== false ? item : null;
+  const patched = el ? patchMenuCard(el, id, shown) : true;
+  // The highlights are three cards: re-render them when one of them changed.
+  const inHighlights = document.querySelector(`#highlight-root .menu-card[data-id="${CSS.escape(id)}"]`);
+  if (!patched || inHighlights || change.op === "create") rerender(!patched);
+}
+
+/**
+ * The stream could not replay what this page missed: fetch the menu again.
+ */
+async function reloadMenu() {
+  try {
+    const items = await getAllMenu();
+    Object.keys(itemsById).forEach((id) => { delete itemsById[id]; });
+    items.forEach((item) => { itemsById[String(item.id || item._id)] = item; });
+    rerender(true);
+  } catch (err) {
+    console.error("Menu reload error:", err);
+  }
+}
+
 const modal = createModal();
 
 /**
@@ -93,7 +224,7 @@ const modal = createModal();
  */
 async function showDetail(id) {
   try {
-    const item = await getMenuById(id);
+    const item = itemsById[String(id)] || await getMenuById(id);
     modal.setContent(renderItemDetail(item));
     modal.open();
     // The modal factory also wires the element with id="modal-close" if present
@@ -114,10 +245,18 @@ async function showDetail(id) {
  * @listens DOMContentLoaded
  */
 document.addEventListener("DOMContentLoaded", () => {
-  loadMenu();
+  const menuListEl = document.getElementById('menuList');
+  loadMenu().then(() => {
+    // Deep link (/menu/<id>): open that item's details.
+    const openId = menuListEl?.dataset.openItem;
+    if (openId) showDetail(openId);
+    // Live changes only when the server holds streams cheaply (asgi.py).
+    if (menuListEl?.dataset.live && window.EventSource) {
+      subscribeMenuChanges({ onChange: applyMenuChange, onReset: reloadMenu });
+    }
+  });
   initCartUI();
 
-  const menuListEl = document.getElementById('menuList');
   if (menuListEl) {
     // Listen for custom 'show-detail' events dispatched by cards.
     menuListEl.addEventListener('show-detail', (e) => {
@@ -10,12 +10,128 @@ import fetchData from "../utils/fetchData.js";
  */
 
 /**
- * Fetch all menu items from the backend API.
+ * IndexedDB database holding the local copy of the menu: the "items"
+ * store (keyed by item id) and, in "meta", the menu revision it is at.
+ * @constant {string}
+ */
+const MENU_DB = "menu";
+const MENU_DB_VERSION = 1;
+
+/**
+ * Wrap an IDBRequest (or the completion of an IDBTransaction) in a Promise.
+ *
+ * @param {IDBRequest|IDBTransaction} request
+ * @returns {Promise<any>}
+ */
+function idb(request) {
+    return new Promise((resolve, reject) => {
+        if (request instanceof IDBTransaction) {
+            request.oncomplete = () => resolve();
+            request.onabort = request.onerror = () => reject(request.error);
+        } else {
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        }
+    });
+}
+
+/**
+ * Open (creating on first use) the local menu database.
+ *
+ * @returns {Promise<IDBDatabase|null>} null when IndexedDB is unavailable
+ *   (old browser, some private modes).
+ */
+async function openMenuDb() {
+    if (!window.indexedDB) return null;
+    try {
+        const request = indexedDB.open(MENU_DB, MENU_DB_VERSION);
+        request.onupgradeneeded = () => {
+            request.result.createObjectStore("items", { keyPath: "id" });
+            request.result.createObjectStore("meta");
+        };
+        return await idb(request);
+    } catch (err) {
+        console.warn("menuService: IndexedDB unavailable, fetching the full menu", err);
+        return null;
+    }
+}
+
+/**
+ * Apply a GET /menu/changes answer to the local copy in one transaction.
+ * Skipped when another tab already brought the copy further.
+ *
+ * @param {IDBDatabase} db
+ * @param {Object} delta - { rev, full, items } or { rev, full, upserted, deleted }
+ */
+async function applyDelta(db, delta) {
+    const tx = db.transaction(["items", "meta"], "readwrite");
+    const items = tx.objectStore("items");
+    const meta = tx.objectStore("meta");
+    const localRev = await idb(meta.get("rev"));
+    if (localRev != null && localRev > delta.rev && !delta.full) return idb(tx);
+    if (delta.full) items.clear();
+    (delta.full ? delta.items : delta.upserted).forEach((item) => items.put(item));
+    (delta.deleted || []).forEach((id) => items.delete(id));
+    meta.put(delta.rev, "rev");
+    return idb(tx);
+}
+
+/**
+ * Bring the local copy of the menu up to date and return it.
+ *
+ * Asks GET /menu/changes?since=<local revision> for what changed since the
+ * last sync (the whole menu on the first visit, or when the server can no
+ * longer give a delta) and applies it to IndexedDB, so a price change
+ * costs one item instead of the whole menu.
+ *
+ * @returns {Promise<Array<Object>>} All menu items.
+ */
+export async function syncMenu() {
+    const db = await openMenuDb();
+    if (!db) return fetchData(apiUrl("menu"));
+
+    const since = (await idb(db.transaction("meta").objectStore("meta").get("rev"))) || 0;
+    // Plain fetch: IndexedDB is the cache here, fetchData would keep a
+    // second copy of every delta in localStorage.
+    const response = await fetch(apiUrl(`menu/changes?since=${since}`));
+    if (!response.ok) {
+        throw new Error(`Error from the server: ${response.status} when fetching menu changes`);
+    }
+    await applyDelta(db, await response.json());
+    return idb(db.transaction("items").objectStore("items").getAll());
+}
+
+/**
+ * Fetch all menu items from the backend API (through the IndexedDB copy,
+ * see syncMenu).
  *
  * @returns {Promise<Array<Object>>} Promise that resolves to an array of menu item objects.
  */
 export function getAllMenu() {
-    return fetchData(apiUrl("menu"));
+    return syncMenu();
+}
+
+
+/**
+ * Fetch menu items filtered on the server.
+ *
+ * Supported params: category, day, dietary, exclude_allergens, active,
+ * fields, after, limit. Array values are sent comma-separated.
+ *
+ * Example:
+ *   getMenu({ day: 'friday', dietary: ['vegan'], exclude_allergens: ['nuts'] })
+ *
+ * @param {Object} [params={}] - Query parameters for GET /menu.
+ * @returns {Promise<Array<Object>>} Promise that resolves to the matching items.
+ */
+export function getMenu(params = {}) {
+    const query = new URLSearchParams();
+    for (const [key, value] of Object.entries(params)) {
+        if (value === undefined || value === null) continue;
+        query.set(key, Array.isArray(value) ? value.join(",") : String(value));
+    }
+    const qs = query.toString();
+    return fetchData(apiUrl(qs ? `menu/?${qs}` : "menu"));
 }
 
 
@@ -28,3 +144,24 @@ export function getAllMenu() {
 export function getMenuById(id) {
     return fetchData(apiUrl(`menu/${id}`));
 }
+
+
+/**
+ * Subscribe to live menu changes (GET /menu/stream, Server-Sent Events).
+ *
+ * Each change is { op: "create"|"update"|"delete", id, version, fields }
+ * where `fields` holds only what the write changed. The browser reconnects
+ * by itself and the server replays what it missed; when it cannot,
+ * `onReset` is called and the caller should reload the menu.
+ *
+ * @param {Object} handlers
+ * @param {function(Object): void} handlers.onChange - Called for every change.
+ * @param {function(): void} [handlers.onReset] - Called when the menu must be reloaded.
+ * @returns {EventSource} The open stream; call `.close()` to stop.
+ */
+export function subscribeMenuChanges({ onChange, onReset }) {
+    const source = new EventSource(apiUrl("menu/stream"));
+    source.addEventListener("change", (e) => onChange(JSON.parse(e.data)));
+    if (onReset) source.addEventListener("reset", () => onReset());
+    return source;
+}
@@ -4,6 +4,8 @@
  * - Uses a plain object (no Map) for grouping and a tiny schema validator.
  * - Exports renderHighlights(items, options), renderMenuFragment(items, options)
  *   and renderMenuPage(items, options) which returns both nodes.
+ * - patchMenuCard(container, id, item, options) updates one card of a
+ *   rendered grid in place (live menu changes).
  */
 
 import { createMenuCard } from "../components/menuCard.js";
@@ -124,7 +126,8 @@ export function renderHighlights(items = [], options = {}) {
       card.classList.add('highlight-card-inner');
       slot.appendChild(card);
 
-      const resolved = card.dataset.img || resolveImageUrl(item);
+      // Highlight slots are wider than a card: use a larger resized variant.
+      const resolved = resolveImageUrl(item, 960);
       if (resolved) {
         slot.style.backgroundImage = `url('${resolved}')`;
         slot.style.backgroundRepeat = 'no-repeat';
@@ -208,4 +211,45 @@ export function renderMenuPage(items = [], options = {}) {
   return { highlightsNode, menuFragment };
 }
 
-	
\ No newline at end of file
+	
+
+function removeCard(card) {
+  const section = card.closest('.menu-category');
+  card.remove();
+  if (section && !section.querySelector('.menu-card')) section.remove();
+}
+
+/**
+ * Patch the card of one item in a grid built by renderMenuFragment (or the
+ * server-rendered one): replace it, remove it, or add it to its category
+ * row. Every other card is left untouched.
+ *
+ * @param {HTMLElement} container - The grid (#menuList).
+ * @param {string} id - Id of the changed item.
+ * @param {Object|null} item - The item after the change, or null to remove its card.
+ * @param {Object} [options] - { createCard }
+ * @returns {boolean} false when the item belongs to a category the grid
+ *   does not have yet; the caller then re-renders the grid.
+ */
+export function patchMenuCard(container, id, item, options = {}) {
+  const { createCard = createMenuCard } = options;
+  const existing = container.querySelector(`.menu-card[data-id="${CSS.escape(String(id))}"]`);
+  if (!item || !validateItem(item)) {
+    if (existing) removeCard(existing);
+    return true;
+  }
+
+  const card = createCard(item);
+  card.classList.add('menu-row__card');
+  const key = normalizedKey(normalizeCategoryName(item.category));
+  if (existing && existing.closest('.menu-category')?.dataset.category === key) {
+    existing.replaceWith(card);
+    return true;
+  }
+
+  const row = container.querySelector(`.menu-category[data-category="${CSS.escape(key)}"] .menu-row`);
+  if (!row) return false;
+  if (existing) removeCard(existing);
+  row.appendChild(card);
+  return true;
+}
@@ -8,7 +8,7 @@
  * @param {Object} item - Menu item object from the API.
  * @returns {string} HTML string representing the item details.
  */
-import { resolveImageUrl } from "../utils/image-resolver.js";
+import { resolveImageUrl, resolveImageSrcset } from "../utils/image-resolver.js";
 
 export function renderItemDetail(item) {
 	// Return minimal, well-formed HTML for the modal content.
@@ -16,8 +16,10 @@ export function renderItemDetail(item) {
 	// dietary may be array or single string; render as badges below
 	const dietaryArr = Array.isArray(item.dietary) ? item.dietary : (item.dietary ? [item.dietary] : []);
 	
-	const imgSrc = resolveImageUrl(item);
-	const img =`<img src="${imgSrc}" alt="${item.name}" onerror="this.onerror=null;this.src='/static/assets/fallback-image.jpeg'" />`
+	const imgSrc = resolveImageUrl(item, 640);
+	const srcset = resolveImageSrcset(item);
+	const srcsetAttr = srcset ? ` srcset="${srcset}" sizes="(max-width: 48rem) 100vw, 20rem"` : '';
+	const img =`<img src="${imgSrc}"${srcsetAttr} alt="${item.name}" onerror="this.onerror=null;this.removeAttribute('srcset');this.src='/static/assets/fallback-image.jpeg'" />`
 
 	// Ingredients: support either an array of strings or array of objects {name, description}
 	let ingredientsHTML = '';
@@ -1,6 +1,47 @@
+/**
+ * Storage key prefix for cached GET responses and their HTTP validators.
+ * @constant {string}
+ */
+const CACHE_PREFIX = "fetchData:";
+
+/**
+ * Read a cached response entry ({ etag, lastModified, data }) for a URL.
+ *
+ * @param {string} url
+ * @returns {Object|null} The cached entry, or null when missing/unreadable.
+ */
+function readCache(url) {
+    try {
+        const raw = localStorage.getItem(CACHE_PREFIX + url);
+        return raw ? JSON.parse(raw) : null;
+    } catch (err) {
+        return null;
+    }
+}
+
+/**
+ * Store a response body together with its ETag / Last-Modified validators.
+ * Failures (quota, private mode) are ignored: the cache is an optimisation.
+ *
+ * @param {string} url
+ * @param {Object} entry - { etag, lastModified, data }
+ */
+function writeCache(url, entry) {
+    try {
+        localStorage.setItem(CACHE_PREFIX + url, JSON.stringify(entry));
+    } catch (err) {
+        console.warn("fetchData: could not cache response for", url, err);
+    }
+}
+
 /**
  * A tiny fetch wrapper that throws on non-OK responses and returns parsed JSON.
  *
+ * GET requests are revalidated: when a previous response for the same URL
+ * carried an ETag or Last-Modified header, it is sent back as
+ * If-None-Match / If-Modified-Since. A `304 Not Modified` answer then
+ * returns the locally cached body without downloading it again.
+ *
  * Usage:
  *   const data = await fetchData('/api/v1/menu')
  *
@@ -10,11 +51,30 @@
  * @throws {Error} If the network request fails or the HTTP status is not ok (2xx).
  */
 export default async function fetchData(url, options = {}) {
-    const response = await fetch(url, options);
+    const method = (options.method || "GET").toUpperCase();
+    const cacheable = method === "GET";
+    const cached = cacheable ? readCache(url) : null;
+
+    const headers = new Headers(options.headers || {});
+    if (cached) {
+        if (cached.etag) headers.set("If-None-Match", cached.etag);
+        if (cached.lastModified) headers.set("If-Modified-Since", cached.lastModified);
+    }
+
+    const response = await fetch(url, { ...options, headers });
+    if (response.status === 304 && cached) {
+        return cached.data;
+    }
     if (!response.ok) {
         // Provide a helpful error message including the URL and status code.
         throw new Error(`Error from the server: ${response.status} when fetching ${url}`);
     }
     const data = await response.json();
+
+    if (cacheable) {
+        const etag = response.headers.get("ETag");
+        const lastModified = response.headers.get("Last-Modified");
+        if (etag || lastModified) writeCache(url, { etag, lastModified, data });
+    }
     return data;
 }
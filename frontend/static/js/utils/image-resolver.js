@@ -1,12 +1,29 @@
 // frontend/static/js/utils/image-resolver.js
 // Single place to resolve a menu item's image URL.
 // Prefer `image_url`, then common filename fields, otherwise return hero fallback.
+//
+// Photos stored under /static/assets/ are also available resized from
+// /media/<name>?w=<width> (WebP/AVIF/JPEG, picked by the server from the
+// Accept header). Use resolveImageSrcset() to let the browser choose a width.
 
-export function resolveImageUrl(item = {}) {
+/**
+ * Widths served by /media (keep in sync with WIDTHS in
+ * backend/api/media/image_pipeline.py).
+ * @constant {number[]}
+ */
+export const MEDIA_WIDTHS = [320, 480, 640, 960, 1280];
 
-  const FALLBACK_IMAGE = '/static/assets/fallback-image.jpeg';
-  if (!item || typeof item !== 'object') return FALLBACK_IMAGE;
+const FALLBACK_IMAGE = '/static/assets/fallback-image.jpeg';
+const ASSETS_PREFIX = '/static/assets/';
 
+/**
+ * Find the photo reference of an item: a filename, a path or a full URL.
+ *
+ * @param {Object} item
+ * @returns {string|null}
+ */
+function findImageValue(item) {
+  if (!item || typeof item !== 'object') return null;
 
   // 1) Backend-provided full URL
   if (typeof item.image_url === 'string' && item.image_url.trim()) {
@@ -17,15 +34,55 @@ export function resolveImageUrl(item = {}) {
   const candidates = ['image', 'filename', 'img', 'imageName', 'photo', 'imgUrl', 'imagePath'];
   for (const key of candidates) {
     const value = item[key];
-    if (!value) continue;
-    if (typeof value === 'string') {
-      // Already an absolute path or remote URL?
-      if (value.startsWith('/') || value.startsWith('http')) return value;
-      // Otherwise treat it as a filename stored under /static/assets/
-      return `/static/assets/${encodeURIComponent(value)}`;
-    }
+    if (value && typeof value === 'string') return value;
   }
+  return null;
+}
 
+/**
+ * Return the (decoded) asset filename when the photo lives in /static/assets/,
+ * otherwise null (remote URLs and other paths cannot be resized).
+ *
+ * @param {string} value
+ * @returns {string|null}
+ */
+function assetName(value) {
+  if (value.startsWith(ASSETS_PREFIX)) return decodeURIComponent(value.slice(ASSETS_PREFIX.length));
+  if (value.startsWith('/') || value.startsWith('http')) return null;
+  return value;
+}
+
+/**
+ * Resolve the image URL of a menu item.
+ *
+ * @param {Object} item - Menu item object from the API.
+ * @param {number} [width] - When given, return a resized /media variant at
+ *   (at least) this width for local photos.
+ * @returns {string}
+ */
+export function resolveImageUrl(item = {}, width) {
+  const value = findImageValue(item);
   // 3) Nothing found: return the same hero fallback used by the renderer
-  return FALLBACK_IMAGE;
-}
\ No newline at end of file
+  if (!value) return FALLBACK_IMAGE;
+
+  const name = assetName(value);
+  if (name === null) return value;
+  if (width) return `/media/${encodeURIComponent(name)}?w=${width}`;
+  // Otherwise treat it as a filename stored under /static/assets/
+  return `${ASSETS_PREFIX}${encodeURIComponent(name)}`;
+}
+
+/**
+ * Build a `srcset` value listing every /media width of a local photo.
+ *
+ * @param {Object} item - Menu item object from the API.
+ * @returns {string} e.g. "/media/a.jpg?w=320 320w, ..." or "" for remote images.
+ */
+export function resolveImageSrcset(item = {}) {
+  const value = findImageValue(item);
+  const name = value ? assetName(value) : null;
+  if (name === null) return '';
+  return MEDIA_WIDTHS
+    .map((width) => `/media/${encodeURIComponent(name)}?w=${width} ${width}w`)
+    .join(', ');
+}